@@ -1,21 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, and_
+from sqlalchemy import func, extract, and_, select
 from typing import List, Optional
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from collections import defaultdict
 import json
 
+from app.core.database import pool_status
 from app.core.dependencies import get_db
+from app.core.pagination import PageParams, paginate
 from app.core.security import require_admin
 from app.models.appointment import Appointment
 from app.models.order import Order, OrderItem
-from app.models.medicine import Medicine
-from app.models.offline_sale import OfflineSale
+from app.models.medicine import Medicine, StockBatch
+from app.models.offline_sale import OfflineSale, OfflineSaleItem
 from app.models.user import User
 from app.schemas.appointment import AppointmentResponse, AppointmentStatusUpdate
 from app.schemas.order import OrderResponse, OrderStatusUpdate
-from app.schemas.medicine import MedicineCreate, MedicineUpdate, MedicineResponse
+from app.schemas.medicine import (
+    ExpiringBatchResponse, MedicineCreate, MedicineUpdate, MedicineResponse, StockBatchCreate, StockBatchResponse
+)
 from app.schemas.offline_sale import OfflineSaleCreate, OfflineSaleResponse
+from app.services.analytics_service import (
+    online_orders_for_day,
+    record_offline_sale,
+    record_order_status_change,
+    sales_summary,
+)
+from app.services.catalogue_cache import catalogue_cache, invalidate_catalogue
+from app.services.email_service import outbox
+from app.services.export_service import date_range, export_response
+from app.services.id_service import next_invoice_number
+from app.services.import_service import MEDICINE_FIELDS, import_format, import_medicines
+from app.services.inventory_service import (
+    IN_STOCK, expiring_batches, load_medicines, notify_low_stock, opening_batch, receive_batch, reserve_stock, trim_batches
+)
+from app.services.job_service import job_stats
+from app.services.slot_service import availability
 
 router = APIRouter()
 
@@ -23,9 +45,11 @@ router = APIRouter()
 
 @router.get("/appointments", response_model=List[AppointmentResponse])
 def get_all_appointments(
+    response: Response,
     status: Optional[str] = None,
     doctor: Optional[str] = None,
     date: Optional[str] = None,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _: dict = Depends(require_admin)
 ):
@@ -40,8 +64,7 @@ def get_all_appointments(
         target_date = datetime.fromisoformat(date)
         query = query.filter(func.date(Appointment.appointment_date) == target_date.date())
     
-    appointments = query.order_by(Appointment.appointment_date.desc()).all()
-    return appointments
+    return paginate(query, page, response, Appointment.appointment_date, Appointment.id, descending=True)
 
 @router.put("/appointments/{appointment_id}/status")
 def update_appointment_status(
@@ -56,16 +79,46 @@ def update_appointment_status(
         raise HTTPException(status_code=404, detail="Appointment not found")
     
     appointment.status = data.status
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Reinstating a rejected booking whose slot has since been taken
+        db.rollback()
+        raise HTTPException(status_code=409, detail="The appointment's slot has been booked by someone else")
+    availability.changed(appointment.doctor_id, appointment.appointment_date)
     db.refresh(appointment)
     
     return {"message": f"Appointment {data.status.lower()} successfully", "appointment": appointment}
 
+@router.get("/appointments/export")
+def export_appointments(
+    format: str = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    compress: bool = False,
+    _: dict = Depends(require_admin)
+):
+    """Stream appointments in the appointment-date range as CSV or NDJSON"""
+    statement = select(
+        Appointment.id,
+        Appointment.user_id,
+        Appointment.doctor_name,
+        Appointment.specialization,
+        Appointment.appointment_date,
+        Appointment.appointment_time,
+        Appointment.status,
+        Appointment.notes,
+        Appointment.created_at
+    ).where(*date_range(Appointment.appointment_date, start_date, end_date)).order_by(Appointment.id)
+    return export_response(statement, format, "appointments", compress=compress)
+
 # ============== ORDERS MANAGEMENT ==============
 
 @router.get("/orders", response_model=List[OrderResponse])
 def get_all_orders(
+    response: Response,
     status: Optional[str] = None,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _: dict = Depends(require_admin)
 ):
@@ -75,8 +128,7 @@ def get_all_orders(
     if status:
         query = query.filter(Order.status == status)
     
-    orders = query.order_by(Order.created_at.desc()).all()
-    return orders
+    return paginate(query, page, response, Order.created_at, Order.id, descending=True)
 
 @router.put("/orders/{order_id}/status")
 def update_order_status(
@@ -90,17 +142,50 @@ def update_order_status(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    old_status = order.status
     order.status = data.status
+    record_order_status_change(db, order, old_status)
     db.commit()
     db.refresh(order)
     
     return {"message": f"Order status updated to {data.status}", "order": order}
 
+@router.get("/orders/export")
+def export_orders(
+    format: str = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    compress: bool = False,
+    _: dict = Depends(require_admin)
+):
+    """Stream orders placed in the date range as CSV or NDJSON, one row per order item"""
+    statement = select(
+        Order.id.label("order_id"),
+        Order.order_number,
+        Order.user_id,
+        Order.created_at,
+        Order.status,
+        Order.payment_mode,
+        Order.payment_status,
+        Order.total_amount,
+        Order.shipping_address,
+        OrderItem.medicine_id,
+        OrderItem.medicine_name,
+        OrderItem.quantity,
+        OrderItem.price,
+        OrderItem.subtotal
+    ).outerjoin(OrderItem).where(
+        *date_range(Order.created_at, start_date, end_date)
+    ).order_by(Order.id, OrderItem.id)
+    return export_response(statement, format, "orders", compress=compress)
+
 # ============== INVENTORY MANAGEMENT ==============
 
 @router.get("/medicines", response_model=List[MedicineResponse])
 def get_all_medicines(
+    response: Response,
     low_stock: bool = False,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _: dict = Depends(require_admin)
 ):
@@ -110,8 +195,7 @@ def get_all_medicines(
     if low_stock:
         query = query.filter(Medicine.stock <= Medicine.low_stock_threshold)
     
-    medicines = query.order_by(Medicine.name).all()
-    return medicines
+    return paginate(query, page, response, Medicine.name, Medicine.id)
 
 @router.post("/medicines", response_model=MedicineResponse, status_code=status.HTTP_201_CREATED)
 def create_medicine(
@@ -121,8 +205,11 @@ def create_medicine(
 ):
     """Add new medicine to inventory"""
     medicine = Medicine(**data.dict())
+    if medicine.stock:
+        medicine.batches.append(opening_batch(medicine))
     db.add(medicine)
     db.commit()
+    invalidate_catalogue()
     db.refresh(medicine)
     return medicine
 
@@ -141,8 +228,11 @@ def update_medicine(
     update_data = data.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(medicine, key, value)
+    if "stock" in update_data:
+        trim_batches(db, {medicine.id: medicine.stock})
     
     db.commit()
+    invalidate_catalogue()
     db.refresh(medicine)
     return medicine
 
@@ -159,8 +249,72 @@ def delete_medicine(
     
     db.delete(medicine)
     db.commit()
+    invalidate_catalogue()
     return {"message": "Medicine deleted successfully"}
 
+@router.post("/medicines/bulk")
+async def bulk_import_medicines(
+    request: Request,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_admin)
+):
+    """Create or update medicines from a streamed CSV or NDJSON body, matched by name + manufacturer"""
+    report = await import_medicines(db, request.stream(), import_format(request.headers.get("content-type")))
+    invalidate_catalogue()
+    return report
+
+@router.get("/medicines/export")
+def export_medicines(
+    format: str = "csv",
+    compress: bool = False,
+    _: dict = Depends(require_admin)
+):
+    """Stream the whole catalogue as CSV or NDJSON, in the same columns the bulk import accepts"""
+    statement = select(*[getattr(Medicine, field) for field in MEDICINE_FIELDS]).order_by(Medicine.id)
+    return export_response(statement, format, "medicines", compress=compress)
+
+# ============== STOCK BATCHES ==============
+
+@router.get("/medicines/{medicine_id}/batches", response_model=List[StockBatchResponse])
+def get_medicine_batches(
+    medicine_id: int,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_admin)
+):
+    """Batches of a medicine still in stock, in the order sales draw from them"""
+    return db.query(StockBatch).filter(StockBatch.medicine_id == medicine_id, IN_STOCK).order_by(
+        StockBatch.expiry_date.asc().nulls_last(), StockBatch.id
+    ).all()
+
+@router.post("/medicines/{medicine_id}/batches", response_model=StockBatchResponse, status_code=status.HTTP_201_CREATED)
+def create_medicine_batch(
+    medicine_id: int,
+    data: StockBatchCreate,
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_admin)
+):
+    """Receive a lot: adds it (or more of an existing lot) to the medicine's batches and stock"""
+    medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
+    if not medicine:
+        raise HTTPException(status_code=404, detail="Medicine not found")
+    
+    batch = receive_batch(db, medicine, data.lot_number, data.quantity, data.expiry_date)
+    db.commit()
+    invalidate_catalogue()
+    db.refresh(batch)
+    return batch
+
+@router.get("/batches/expiring", response_model=List[ExpiringBatchResponse])
+def get_expiring_batches(
+    response: Response,
+    days: int = Query(30, ge=0),
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db),
+    _: dict = Depends(require_admin)
+):
+    """In-stock batches that expire within `days` (or already have), soonest first"""
+    return paginate(expiring_batches(db, days), page, response, StockBatch.expiry_date, StockBatch.id)
+
 # ============== OFFLINE SALES & BILLING ==============
 
 @router.post("/offline-sales", response_model=OfflineSaleResponse, status_code=status.HTTP_201_CREATED)
@@ -175,20 +329,23 @@ def create_offline_sale(
     tax = subtotal * 0.05  # 5% tax
     total_amount = subtotal + tax
     
-    # Generate invoice number
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-    invoice_number = f"INV-{timestamp}"
+    # Validate all lines against one stock query, then reduce stock in one statement
+    quantities = defaultdict(int)
+    for item in data.items:
+        quantities[item.medicine_id] += item.quantity
     
-    # Reduce stock for each medicine
+    medicines = load_medicines(db, quantities)
     for item in data.items:
-        medicine = db.query(Medicine).filter(Medicine.id == item.medicine_id).first()
+        medicine = medicines.get(item.medicine_id)
         if not medicine:
             raise HTTPException(status_code=404, detail=f"Medicine {item.medicine_name} not found")
         
-        if medicine.stock < item.quantity:
+        if medicine.stock < quantities[item.medicine_id]:
             raise HTTPException(status_code=400, detail=f"Insufficient stock for {medicine.name}")
-        
-        medicine.stock -= item.quantity
+    
+    # Allocated before this session writes, see place_order
+    invoice_number = next_invoice_number()
+    low_stock = reserve_stock(db, quantities)
     
     # Create sale record
     offline_sale = OfflineSale(
@@ -199,96 +356,97 @@ def create_offline_sale(
         subtotal=subtotal,
         tax=tax,
         total_amount=total_amount,
-        payment_mode=data.payment_mode
+        payment_mode=data.payment_mode,
+        line_items=[
+            OfflineSaleItem(
+                medicine_id=item.medicine_id,
+                medicine_name=item.medicine_name,
+                quantity=item.quantity,
+                price=item.price,
+                subtotal=item.subtotal
+            )
+            for item in data.items
+        ]
     )
     
     db.add(offline_sale)
+    db.flush()
+    record_offline_sale(db, offline_sale)
+    notify_low_stock(db, low_stock)
     db.commit()
+    invalidate_catalogue()
     db.refresh(offline_sale)
     
     return offline_sale
 
 @router.get("/offline-sales", response_model=List[OfflineSaleResponse])
 def get_offline_sales(
-    limit: int = 100,
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
     _: dict = Depends(require_admin)
 ):
     """Get offline sales history"""
-    sales = db.query(OfflineSale).order_by(OfflineSale.created_at.desc()).limit(limit).all()
-    return sales
+    return paginate(db.query(OfflineSale), page, response, OfflineSale.created_at, OfflineSale.id, descending=True)
+
+@router.get("/offline-sales/export")
+def export_offline_sales(
+    format: str = "csv",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    compress: bool = False,
+    _: dict = Depends(require_admin)
+):
+    """Stream counter sales in the date range as CSV or NDJSON, one row per sold item"""
+    statement = select(
+        OfflineSale.id.label("sale_id"),
+        OfflineSale.invoice_number,
+        OfflineSale.created_at,
+        OfflineSale.customer_name,
+        OfflineSale.customer_phone,
+        OfflineSale.payment_mode,
+        OfflineSale.subtotal.label("sale_subtotal"),
+        OfflineSale.tax,
+        OfflineSale.total_amount,
+        OfflineSaleItem.medicine_id,
+        OfflineSaleItem.medicine_name,
+        OfflineSaleItem.quantity,
+        OfflineSaleItem.price,
+        OfflineSaleItem.subtotal
+    ).outerjoin(OfflineSaleItem).where(
+        *date_range(OfflineSale.created_at, start_date, end_date)
+    ).order_by(OfflineSale.id, OfflineSaleItem.id)
+    return export_response(statement, format, "offline_sales", compress=compress)
 
 # ============== SALES ANALYTICS ==============
 
 @router.get("/analytics/sales")
 def get_sales_analytics(
     period: str = "daily",  # daily, weekly, monthly
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
     db: Session = Depends(get_db),
     _: dict = Depends(require_admin)
 ):
-    """Get sales analytics for specified period"""
-    now = datetime.now(timezone.utc)
+    """Get sales analytics for a period, or for an explicit start_date/end_date range"""
+    today = datetime.now(timezone.utc).date()
     
-    if period == "daily":
-        start_date = now - timedelta(days=1)
-    elif period == "weekly":
-        start_date = now - timedelta(days=7)
-    elif period == "monthly":
-        start_date = now - timedelta(days=30)
+    if start_date:
+        end_date = end_date or today
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must not be after end_date")
     else:
-        start_date = now - timedelta(days=1)
+        end_date = today
+        days = {"daily": 1, "weekly": 7, "monthly": 30}.get(period, 1)
+        start_date = today - timedelta(days=days - 1)
     
-    # Online orders analytics
-    online_orders = db.query(
-        func.count(Order.id).label("total_orders"),
-        func.sum(Order.total_amount).label("total_revenue"),
-        Order.payment_mode
-    ).filter(
-        Order.created_at >= start_date,
-        Order.status != "Cancelled"
-    ).group_by(Order.payment_mode).all()
-    
-    # Offline sales analytics
-    offline_sales = db.query(
-        func.count(OfflineSale.id).label("total_sales"),
-        func.sum(OfflineSale.total_amount).label("total_revenue")
-    ).filter(OfflineSale.created_at >= start_date).first()
-    
-    # Top selling medicines (online)
-    top_medicines = db.query(
-        OrderItem.medicine_name,
-        func.sum(OrderItem.quantity).label("total_quantity"),
-        func.sum(OrderItem.subtotal).label("total_revenue")
-    ).join(Order).filter(
-        Order.created_at >= start_date,
-        Order.status != "Cancelled"
-    ).group_by(OrderItem.medicine_name).order_by(func.sum(OrderItem.quantity).desc()).limit(10).all()
-    
-    # Calculate totals
-    total_online_revenue = sum(order.total_revenue or 0 for order in online_orders)
-    total_offline_revenue = offline_sales.total_revenue or 0 if offline_sales else 0
-    
-    payment_split = {}
-    for order in online_orders:
-        payment_split[order.payment_mode] = {
-            "orders": order.total_orders,
-            "revenue": float(order.total_revenue or 0)
-        }
+    summary = sales_summary(db, start_date, end_date)
     
     return {
         "period": period,
-        "total_revenue": total_online_revenue + total_offline_revenue,
-        "online_revenue": total_online_revenue,
-        "offline_revenue": total_offline_revenue,
-        "payment_split": payment_split,
-        "top_medicines": [
-            {
-                "name": med.medicine_name,
-                "quantity_sold": med.total_quantity,
-                "revenue": float(med.total_revenue)
-            }
-            for med in top_medicines
-        ]
+        "start_date": start_date,
+        "end_date": end_date,
+        **summary
     }
 
 @router.get("/analytics/dashboard")
@@ -307,19 +465,34 @@ def get_dashboard_stats(
     ).scalar()
     
     today = datetime.now(timezone.utc).date()
-    today_orders = db.query(func.count(Order.id)).filter(
-        func.date(Order.created_at) == today
-    ).scalar()
-    
-    today_revenue = db.query(func.sum(Order.total_amount)).filter(
-        func.date(Order.created_at) == today,
-        Order.status != "Cancelled"
-    ).scalar() or 0
+    today_orders, today_revenue = online_orders_for_day(db, today)
     
     return {
         "total_medicines": total_medicines,
         "low_stock_items": low_stock_count,
         "pending_appointments": pending_appointments,
         "today_orders": today_orders,
-        "today_revenue": float(today_revenue)
+        "today_revenue": today_revenue
     }
+
+# ============== SYSTEM ==============
+
+@router.get("/system/cache")
+def get_cache_stats(_: dict = Depends(require_admin)):
+    """Catalogue cache hit/miss counters for this worker"""
+    return catalogue_cache.stats()
+
+@router.get("/system/db-pool")
+def get_db_pool_stats(_: dict = Depends(require_admin)):
+    """Database connection pool occupancy and checkout wait times for this worker"""
+    return pool_status()
+
+@router.get("/system/email")
+def get_email_stats(_: dict = Depends(require_admin)):
+    """OTP email outbox depth, delivery counts and queue-to-send latency for this worker"""
+    return outbox.stats()
+
+@router.get("/system/jobs")
+def get_job_stats(db: Session = Depends(get_db), _: dict = Depends(require_admin)):
+    """Background job counts by kind and status, and how long the oldest due job has waited"""
+    return job_stats(db)
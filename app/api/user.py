@@ -1,58 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from datetime import date
 from typing import List, Optional
-from datetime import datetime, timezone
+import json
 import random
 
-from app.core.dependencies import get_db
-from app.core.security import require_user
+from app.core.config import settings
+from app.core.dependencies import CurrentUser, get_current_user, get_db
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, PageParams, paginate
 from app.models.medicine import Medicine
-from app.models.order import Order, OrderItem
+from app.models.order import Order
 from app.models.appointment import Appointment
 from app.models.doctor import Doctor
-from app.models.user import User
 from app.schemas.medicine import MedicineResponse
 from app.schemas.order import OrderCreate, OrderResponse
-from app.schemas.appointment import AppointmentCreate, AppointmentResponse, DoctorResponse
+from app.schemas.appointment import AppointmentCreate, AppointmentResponse, DoctorResponse, DoctorSlotsResponse
+from app.services.catalogue_cache import cached_json_response
+from app.services.order_service import place_order
+from app.services.search_service import search_medicines
+from app.services.slot_service import TIME_FORMAT, availability
 
 router = APIRouter()
 
+_medicine_list = TypeAdapter(List[MedicineResponse])
+
 # ============== BROWSE MEDICINES ==============
 
 @router.get("/medicines", response_model=List[MedicineResponse])
 def browse_medicines(
+    request: Request,
     category: Optional[str] = None,
     search: Optional[str] = None,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db)
 ):
-    """Browse all available medicines"""
-    query = db.query(Medicine).filter(Medicine.stock > 0)
-    
-    if category:
-        query = query.filter(Medicine.category == category)
-    
-    if search:
-        query = query.filter(Medicine.name.contains(search))
-    
-    medicines = query.order_by(Medicine.name).all()
-    return medicines
+    """Browse all available medicines; with `search`, returns the best `limit` matches by relevance"""
+    def build():
+        if search:
+            medicines = search_medicines(db, search, category=category, limit=page.limit)
+            return _medicine_list.dump_json(_medicine_list.validate_python(medicines)), {}
+        
+        query = db.query(Medicine).filter(Medicine.stock > 0)
+        
+        if category:
+            query = query.filter(Medicine.category == category)
+        
+        response = Response()
+        medicines = paginate(query, page, response, Medicine.name, Medicine.id)
+        headers = {
+            name: response.headers[name]
+            for name in (NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER)
+            if name in response.headers
+        }
+        return _medicine_list.dump_json(_medicine_list.validate_python(medicines)), headers
+    
+    key = ("medicines", category, search, page.cursor, page.limit, page.include_total)
+    return cached_json_response(request, key, build)
 
 @router.get("/medicines/categories")
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, db: Session = Depends(get_db)):
     """Get all medicine categories"""
-    categories = db.query(Medicine.category).distinct().all()
-    return {"categories": [cat[0] for cat in categories]}
+    def build():
+        categories = db.query(Medicine.category).distinct().all()
+        return json.dumps({"categories": [cat[0] for cat in categories]}).encode(), {}
+    
+    return cached_json_response(request, ("categories",), build)
 
 @router.get("/medicines/{medicine_id}", response_model=MedicineResponse)
 def get_medicine_detail(
+    request: Request,
     medicine_id: int,
     db: Session = Depends(get_db)
 ):
     """Get medicine details"""
-    medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
-    if not medicine:
-        raise HTTPException(status_code=404, detail="Medicine not found")
-    return medicine
+    def build():
+        medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
+        if not medicine:
+            raise HTTPException(status_code=404, detail="Medicine not found")
+        return MedicineResponse.model_validate(medicine).model_dump_json().encode(), {}
+    
+    return cached_json_response(request, ("medicine", medicine_id), build)
 
 # ============== ORDERS & CHECKOUT ==============
 
@@ -60,106 +89,32 @@ def get_medicine_detail(
 def create_order(
     data: OrderCreate,
     db: Session = Depends(get_db),
-    user: dict = Depends(require_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create new order and checkout"""
-    # Get user
-    user_email = user.get("sub")
-    user_obj = db.query(User).filter(User.email == user_email).first()
-    
-    if not user_obj:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    # Validate items and calculate total
-    total_amount = 0
-    order_items = []
-    
-    for item in data.items:
-        medicine = db.query(Medicine).filter(Medicine.id == item.medicine_id).first()
-        if not medicine:
-            raise HTTPException(status_code=404, detail=f"Medicine ID {item.medicine_id} not found")
-        
-        if medicine.stock < item.quantity:
-            raise HTTPException(status_code=400, detail=f"Insufficient stock for {medicine.name}")
-        
-        subtotal = medicine.price * item.quantity
-        total_amount += subtotal
-        
-        order_items.append({
-            "medicine_id": medicine.id,
-            "medicine_name": medicine.name,
-            "quantity": item.quantity,
-            "price": medicine.price,
-            "subtotal": subtotal
-        })
-    
-    # Generate order number
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-    random_suffix = random.randint(1000, 9999)
-    order_number = f"ORD-{timestamp}-{random_suffix}"
-    
-    # Determine payment status based on payment mode
-    payment_status = "Pending" if data.payment_mode == "COD" else "Pending"
-    
-    # Create order
-    order = Order(
-        user_id=user_obj.id,
-        order_number=order_number,
-        status="Placed",
-        total_amount=total_amount,
-        payment_mode=data.payment_mode,
-        payment_status=payment_status,
-        shipping_address=data.shipping_address
-    )
-    
-    db.add(order)
-    db.flush()  # Get order ID
-    
-    # Create order items and reduce stock
-    for item_data in order_items:
-        order_item = OrderItem(
-            order_id=order.id,
-            **item_data
-        )
-        db.add(order_item)
-        
-        # Reduce medicine stock
-        medicine = db.query(Medicine).filter(Medicine.id == item_data["medicine_id"]).first()
-        medicine.stock -= item_data["quantity"]
-    
-    db.commit()
-    db.refresh(order)
-    
-    return order
+    return place_order(db, user.id, data)
 
 @router.get("/orders", response_model=List[OrderResponse])
 def get_my_orders(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    user: dict = Depends(require_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get user's order history"""
-    user_email = user.get("sub")
-    user_obj = db.query(User).filter(User.email == user_email).first()
-    
-    if not user_obj:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    orders = db.query(Order).filter(Order.user_id == user_obj.id).order_by(Order.created_at.desc()).all()
-    return orders
+    query = db.query(Order).filter(Order.user_id == user.id)
+    return paginate(query, page, response, Order.created_at, Order.id, descending=True)
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 def get_order_detail(
     order_id: int,
     db: Session = Depends(get_db),
-    user: dict = Depends(require_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get order details"""
-    user_email = user.get("sub")
-    user_obj = db.query(User).filter(User.email == user_email).first()
-    
     order = db.query(Order).filter(
         Order.id == order_id,
-        Order.user_id == user_obj.id
+        Order.user_id == user.id
     ).first()
     
     if not order:
@@ -174,15 +129,12 @@ def process_payment(
     order_id: int,
     payment_mode: str,
     db: Session = Depends(get_db),
-    user: dict = Depends(require_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Process payment for order (UPI mock or COD)"""
-    user_email = user.get("sub")
-    user_obj = db.query(User).filter(User.email == user_email).first()
-    
     order = db.query(Order).filter(
         Order.id == order_id,
-        Order.user_id == user_obj.id
+        Order.user_id == user.id
     ).first()
     
     if not order:
@@ -217,49 +169,65 @@ def get_doctors(db: Session = Depends(get_db)):
     doctors = db.query(Doctor).all()
     return doctors
 
+@router.get("/doctors/{doctor_id}/slots", response_model=DoctorSlotsResponse)
+def get_doctor_slots(
+    doctor_id: int,
+    date: date,
+    db: Session = Depends(get_db)
+):
+    """The doctor's bookable slots on a day, each marked available or taken"""
+    return {
+        "doctor_id": doctor_id,
+        "date": date,
+        "slot_minutes": settings.APPOINTMENT_SLOT_MINUTES,
+        "slots": availability.slots(db, doctor_id, date),
+    }
+
 @router.post("/appointments", response_model=AppointmentResponse, status_code=status.HTTP_201_CREATED)
 def book_appointment(
     data: AppointmentCreate,
     db: Session = Depends(get_db),
-    user: dict = Depends(require_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
-    """Book doctor appointment"""
-    user_email = user.get("sub")
-    user_obj = db.query(User).filter(User.email == user_email).first()
-    
-    if not user_obj:
-        raise HTTPException(status_code=404, detail="User not found")
-    
+    """Book one of a doctor's free slots; 409 if someone else holds it"""
+    doctor_id = data.doctor_id
+    if doctor_id is None and data.doctor_name:
+        doctor_id = db.query(Doctor.id).filter(Doctor.name == data.doctor_name).order_by(Doctor.id).limit(1).scalar()
+    if doctor_id is None:
+        raise HTTPException(status_code=404, detail="Doctor not found")
+    
+    doctor = availability.doctor(db, doctor_id)
+    slot = availability.slot_for(db, doctor_id, data.appointment_date.date(), data.appointment_time)
     appointment = Appointment(
-        user_id=user_obj.id,
-        doctor_name=data.doctor_name,
-        specialization=data.specialization,
-        appointment_date=data.appointment_date,
-        appointment_time=data.appointment_time,
+        user_id=user.id,
+        doctor_id=doctor_id,
+        doctor_name=doctor.name,
+        specialization=doctor.specialization,
+        appointment_date=slot,
+        appointment_time=slot.strftime(TIME_FORMAT),
         notes=data.notes,
         status="Pending"
     )
     
+    # The unique (doctor_id, appointment_date) index settles concurrent bookings of the same slot
     db.add(appointment)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="That slot has just been booked, please pick another")
+    availability.changed(doctor_id, slot)
     db.refresh(appointment)
     
     return appointment
 
 @router.get("/appointments", response_model=List[AppointmentResponse])
 def get_my_appointments(
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    user: dict = Depends(require_user)
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get user's appointment history"""
-    user_email = user.get("sub")
-    user_obj = db.query(User).filter(User.email == user_email).first()
-    
-    if not user_obj:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    appointments = db.query(Appointment).filter(
-        Appointment.user_id == user_obj.id
-    ).order_by(Appointment.appointment_date.desc()).all()
-    
-    return appointments
+    query = db.query(Appointment).filter(Appointment.user_id == user.id)
+    return paginate(query, page, response, Appointment.appointment_date, Appointment.id, descending=True)
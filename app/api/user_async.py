@@ -0,0 +1,58 @@
+"""
+Async versions of every /user route, used instead of app.api.user when ASYNC_DB is on.
+
+Each route keeps the sync handler's path, parameters and response model, but
+runs on the event loop with an AsyncSession: the handler body executes through
+`AsyncSession.run_sync`, so catalogue, order and appointment logic is shared
+with the sync app rather than duplicated.
+"""
+from functools import lru_cache
+from fastapi import APIRouter, Depends, Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+import inspect
+
+from app.api import user
+from app.core.async_database import get_async_db
+
+@lru_cache(maxsize=None)
+def _adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+def _async_endpoint(route: APIRoute):
+    endpoint = route.endpoint
+    signature = inspect.signature(endpoint)
+    parameters = [
+        param.replace(annotation=AsyncSession, default=Depends(get_async_db)) if param.name == "db" else param
+        for param in signature.parameters.values()
+    ]
+
+    def call(session, kwargs):
+        result = endpoint(db=session, **kwargs)
+        if route.response_model is None or isinstance(result, Response):
+            return result
+        # Serialize inside the greenlet so no lazy load is attempted on the event loop
+        return _adapter(route.response_model).validate_python(result, from_attributes=True)
+
+    async def async_endpoint(db: AsyncSession, **kwargs):
+        return await db.run_sync(call, kwargs)
+
+    async_endpoint.__signature__ = signature.replace(parameters=parameters)
+    async_endpoint.__name__ = endpoint.__name__
+    async_endpoint.__doc__ = endpoint.__doc__
+    return async_endpoint
+
+router = APIRouter()
+
+for route in user.router.routes:
+    router.add_api_route(
+        route.path,
+        _async_endpoint(route),
+        methods=list(route.methods),
+        response_model=route.response_model,
+        status_code=route.status_code,
+        name=route.name,
+        summary=route.summary,
+        description=route.description,
+    )
@@ -0,0 +1,83 @@
+import ipaddress
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.security import decode_token
+
+async def buffer_body(receive):
+    """Reads the whole request body and returns it with a `receive` that replays it"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+def bearer_identity(scope) -> Optional[str]:
+    """User id (or email, for older tokens) of a valid bearer token on the request"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            payload = decode_token(token) if scheme.lower() == "bearer" else None
+            if payload:
+                return str(payload.get("uid") or payload.get("sub"))
+    return None
+
+def header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def trusted_networks(spec: str) -> List:
+    """Parses TRUSTED_PROXIES: comma-separated addresses or CIDR ranges, or "*" for any peer"""
+    return [
+        item if item == "*" else ipaddress.ip_network(item, strict=False)
+        for item in (part.strip() for part in spec.split(","))
+        if item
+    ]
+
+_trusted_proxies = trusted_networks(settings.TRUSTED_PROXIES)
+
+def _is_proxy(address: str, allow_any: bool) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(
+        allow_any if network == "*" else ip.version == network.version and ip in network
+        for network in _trusted_proxies
+    )
+
+def client_ip(scope) -> str:
+    """
+    The address of the client that sent the request. When the connection
+    comes from a trusted proxy, that is the nearest X-Forwarded-For entry
+    that is not itself a trusted proxy; otherwise the header is ignored,
+    since clients can set it to anything.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    forwarded = header(scope, b"x-forwarded-for")
+    if not forwarded or not _is_proxy(peer, allow_any=True):
+        return peer
+
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    # Each proxy appends the address it received the request from, so read from the right
+    for hop in reversed(hops):
+        if not _is_proxy(hop, allow_any=False):
+            return hop
+    return hops[0] if hops else peer
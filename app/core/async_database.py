@@ -0,0 +1,55 @@
+"""
+Opt-in async database layer, enabled with ASYNC_DB=true.
+
+Requires an async driver for the configured database: `aiosqlite` for SQLite,
+`asyncpg` for Postgres.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import set_sqlite_pragmas, normalize_database_url
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def async_database_url(database_url: str):
+    url = make_url(normalize_database_url(database_url))
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise RuntimeError(f"ASYNC_DB is not supported for {backend} databases")
+    return url.set(drivername=_ASYNC_DRIVERS[backend])
+
+def create_async_database_engine(database_url: str):
+    url = async_database_url(database_url)
+
+    if url.get_backend_name() == "sqlite":
+        engine = create_async_engine(url)
+        if url.database not in (None, "", ":memory:"):
+            event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+        return engine
+
+    return create_async_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+async_engine = create_async_database_engine(settings.DATABASE_URL)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+async def get_async_db() -> AsyncSession: # type: ignore
+    async with AsyncSessionLocal() as db:
+        yield db
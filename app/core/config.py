@@ -1,25 +1,112 @@
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
+# Local development reads a .env next to the project; deployments set real environment variables
+_ENV_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env")
+if os.path.exists(_ENV_FILE):
+    from dotenv import load_dotenv
+    load_dotenv(_ENV_FILE)
 
 class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./pharmacy.db")
+    # Serve the user routes as async endpoints on an AsyncSession (needs aiosqlite / asyncpg)
+    ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() == "true"
+    # Connection pool (server databases, and file-backed SQLite)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # SQLite connection pragmas
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 30
+    TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+    IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "60"))
 
     EMAIL_FROM = os.getenv("EMAIL_FROM")
     EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-    ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "admin@example.com")  # Default fallback
+    # "smtp" delivers through SMTP_HOST; "memory" keeps messages in-process (development, tests)
+    EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "smtp").lower()
+    SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+    SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "true").lower() == "true"
+    EMAIL_QUEUE_SIZE = int(os.getenv("EMAIL_QUEUE_SIZE", "1000"))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "20"))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "3"))
+    ADMIN_EMAIL = os.getenv("ADMIN_EMAIL") or "admin@example.com"  # Default fallback for development
 
+    # "sql" stores codes in the otps table; "memory" keeps them in-process (single worker only)
+    OTP_BACKEND = os.getenv("OTP_BACKEND", "sql").lower()
+    OTP_TTL_SECONDS = float(os.getenv("OTP_TTL_SECONDS", "60"))
+    OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+    OTP_SWEEP_INTERVAL_SECONDS = float(os.getenv("OTP_SWEEP_INTERVAL_SECONDS", "300"))
 
-settings = Settings()
+    CATALOGUE_CACHE_TTL_SECONDS = float(os.getenv("CATALOGUE_CACHE_TTL_SECONDS", "30"))
+    CATALOGUE_CACHE_SIZE = int(os.getenv("CATALOGUE_CACHE_SIZE", "512"))
+
+    # Token-bucket limits ("count/second|minute|hour|day"); "redis" shares buckets across workers
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Proxies whose X-Forwarded-For is believed for per-IP limits: addresses or CIDR ranges, or "*"
+    # for any peer (when the app is only reachable through the proxy, as on Render)
+    TRUSTED_PROXIES = os.getenv("TRUSTED_PROXIES", "127.0.0.1")
+    RATE_LIMIT_OTP_PER_IP = os.getenv("RATE_LIMIT_OTP_PER_IP", "10/minute")
+    RATE_LIMIT_OTP_PER_EMAIL = os.getenv("RATE_LIMIT_OTP_PER_EMAIL", "3/minute")
+    RATE_LIMIT_VERIFY_PER_IP = os.getenv("RATE_LIMIT_VERIFY_PER_IP", "20/minute")
+    RATE_LIMIT_ORDERS_PER_USER = os.getenv("RATE_LIMIT_ORDERS_PER_USER", "10/minute")
+
+    # Stored responses for retried checkout/payment requests (per worker)
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+
+    # Per-route latency and SQL metrics at /metrics (Prometheus text format, per worker process)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Bearer token for the scraper; without it, /metrics is only served to admins
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    # SQL statements slower than this are logged with their parameters
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+    # Logs go to stdout from a background thread; "json" (one object per line) or "text"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # Share of requests whose DEBUG records are kept (0-1)
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+    DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+    # Max SQL statements any order endpoint may run in DEBUG mode, independent of row count
+    ORDER_QUERY_BUDGET = int(os.getenv("ORDER_QUERY_BUDGET", "10"))
 
-# Debug: Print admin email on startup
-if settings.ADMIN_EMAIL:
-    print(f"[CONFIG] Admin email loaded: {settings.ADMIN_EMAIL}")
-else:
-    print("[CONFIG] Admin email not set! Please set ADMIN_EMAIL environment variable")
-    # Use a default email for development if not set
-    settings.ADMIN_EMAIL = "admin@example.com"
+    # Appointment slot length, and the per-process cache of schedules and booked slots behind slot listings
+    APPOINTMENT_SLOT_MINUTES = int(os.getenv("APPOINTMENT_SLOT_MINUTES", "30"))
+    # Doctors' hours and slot times are wall-clock times in this zone (the server may run in UTC)
+    CLINIC_TIMEZONE = os.getenv("CLINIC_TIMEZONE", "Asia/Kolkata")
+    AVAILABILITY_CACHE_TTL_SECONDS = float(os.getenv("AVAILABILITY_CACHE_TTL_SECONDS", "30"))
+    AVAILABILITY_CACHE_SIZE = int(os.getenv("AVAILABILITY_CACHE_SIZE", "2048"))
+
+    # Order/invoice sequence values each worker reserves per database round trip
+    ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "100"))
+
+    # Background jobs (low-stock alerts), stored in the jobs table and run by in-process worker threads
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "5"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+    JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "10"))
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+    JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+    # How often expired stock batches are written off
+    STOCK_EXPIRY_SWEEP_INTERVAL_SECONDS = float(os.getenv("STOCK_EXPIRY_SWEEP_INTERVAL_SECONDS", "3600"))
+
+    # Create/upgrade the schema and add the sample data to an empty database when the app starts.
+    # Workers sharing a database take turns through a lock row; one held longer than INIT_DB_LOCK_SECONDS is taken over
+    INIT_DB_ON_STARTUP = os.getenv("INIT_DB_ON_STARTUP", "true").lower() == "true"
+    INIT_DB_LOCK_SECONDS = float(os.getenv("INIT_DB_LOCK_SECONDS", "300"))
+    SEED_SAMPLE_DATA = os.getenv("SEED_SAMPLE_DATA", "true").lower() == "true"
+
+
+settings = Settings()
@@ -1,10 +1,163 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from threading import Lock
+from typing import Optional
+import time
+
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite
+class PoolStats:
+    """
+    Process-wide connection pool counters, including how long checkouts waited.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "invalidations": self.invalidations,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+
+pool_stats = PoolStats()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - start)
+
+def normalize_database_url(database_url: str) -> str:
+    # Render and Heroku hand out postgres://, which SQLAlchemy no longer accepts
+    if database_url.startswith("postgres://"):
+        return "postgresql://" + database_url[len("postgres://"):]
+    return database_url
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}")
+    # WAL lets readers run alongside a writer; NORMAL sync is durable in WAL mode except on power loss
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.close()
+
+def create_database_engine(database_url: str, pool_size: Optional[int] = None) -> Engine:
+    """
+    Builds an engine tuned for the URL's dialect.
+
+    SQLite gets WAL mode, a busy timeout and cache/mmap pragmas on every new
+    connection; server databases get a sized QueuePool with pre-ping and
+    recycling. Both record pool metrics in `pool_stats`, unless `pool_size`
+    asks for a private pool of that many connections (no overflow).
+    """
+    url = make_url(normalize_database_url(database_url))
+    pool_options = {
+        "poolclass": InstrumentedQueuePool if pool_size is None else QueuePool,
+        "pool_size": settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW if pool_size is None else 0,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+    if url.get_backend_name() == "sqlite":
+        in_memory = url.database in (None, "", ":memory:")
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},  # Required for SQLite
+            **({} if in_memory else pool_options)
+        )
+        if not in_memory:
+            event.listen(engine, "connect", set_sqlite_pragmas)
+    else:
+        engine = create_engine(
+            url,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            **pool_options
+        )
+
+    if pool_size is not None:
+        return engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_stats.record_connect()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_stats.record_checkout()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        pool_stats.record_checkin()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_stats.record_invalidation()
+
+    return engine
+
+def pool_status() -> dict:
+    """Current pool occupancy plus cumulative checkout/wait counters"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__, **pool_stats.snapshot()}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    return status
+
+engine = create_database_engine(settings.DATABASE_URL)
+
+# Id blocks (see id_service) are reserved on a connection of their own, so a refill never waits
+# behind request sessions for the shared pool. An in-memory SQLite database cannot be shared that way
+sequence_engine = engine if engine.url.database in (None, "", ":memory:") else create_database_engine(
+    settings.DATABASE_URL, pool_size=1
 )
 
 SessionLocal = sessionmaker(
@@ -1,9 +1,63 @@
-from app.core.database import SessionLocal
+from typing import NamedTuple, Union
+from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import require_user
+from app.models.user import User
+
 def get_db() -> Session: # type: ignore
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+class CurrentUser(NamedTuple):
+    id: int
+    email: str
+    role: str
+    is_active: bool
+
+# Keyed by user id (or email for tokens issued before ids were included)
+_identity_cache = TTLCache(
+    maxsize=settings.IDENTITY_CACHE_SIZE,
+    ttl=settings.IDENTITY_CACHE_TTL_SECONDS
+)
+
+def invalidate_identity(user_id: int, email: str) -> None:
+    """Call after changing a user's row so the next request reloads it"""
+    _identity_cache.discard(user_id)
+    _identity_cache.discard(email)
+
+def _load_user(key: Union[int, str]):
+    db = SessionLocal()
+    try:
+        condition = User.id == key if isinstance(key, int) else User.email == key
+        return db.query(User).filter(condition).first()
+    finally:
+        db.close()
+
+async def get_current_user(payload: dict = Depends(require_user)) -> CurrentUser:
+    """
+    Returns the authenticated user, from the identity cache when possible.
+
+    Cache hits cost no database round trip and no threadpool hop; misses load
+    the row on a worker thread.
+    """
+    key = payload.get("uid") or payload.get("sub")
+    current = _identity_cache.get(key)
+    if current is not None:
+        return current
+
+    generation = _identity_cache.generation
+    user = await run_in_threadpool(_load_user, key)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    current = CurrentUser(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+    _identity_cache.set(key, current, generation)
+    return current
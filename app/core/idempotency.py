@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import re
+from typing import Dict, Iterable, NamedTuple, Tuple
+from starlette.responses import JSONResponse
+
+from app.core.asgi import bearer_identity, buffer_body, header
+from app.core.cache import TTLCache
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+class StoredResponse(NamedTuple):
+    fingerprint: bytes
+    status: int
+    headers: list
+    body: bytes
+
+class IdempotencyMiddleware:
+    """
+    Makes POSTs to the given routes safe to retry when the client sends an
+    Idempotency-Key header.
+
+    The first request with a key (per user and route) runs normally and, if
+    it succeeded (2xx), its response is stored for `ttl` seconds; repeats get
+    the stored response without reaching the route. A repeat that arrives
+    while the first is still running waits for it instead of running
+    alongside it. Reusing a key for a different body or query string is
+    rejected with 422. Errors are not stored: a 400 for missing stock, a 409
+    conflict or a 429 may well succeed when the request is retried for real.
+    """
+    def __init__(self, app, paths: Iterable[str], store: TTLCache):
+        self.app = app
+        self.paths = [re.compile(f"^{path}$") for path in paths]
+        self.store = store
+        self._in_flight: Dict[Tuple[str, str, str], asyncio.Event] = {}
+
+    async def __call__(self, scope, receive, send):
+        key = header(scope, b"idempotency-key") if scope["type"] == "http" and scope["method"] == "POST" else None
+        if key is None or not any(path.match(scope["path"]) for path in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        identity = bearer_identity(scope)
+        if identity is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await JSONResponse(
+                {"detail": f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"}, status_code=400
+            )(scope, receive, send)
+            return
+
+        body, receive = await buffer_body(receive)
+        fingerprint = hashlib.blake2b(digest_size=16)
+        for part in (scope["method"].encode(), scope["query_string"], body):
+            fingerprint.update(len(part).to_bytes(8, "big") + part)
+        fingerprint = fingerprint.digest()
+        store_key = (identity, scope["path"], key)
+
+        while True:
+            stored = self.store.get(store_key)
+            if stored is not None:
+                await self._replay(stored, fingerprint, scope, receive, send)
+                return
+            in_flight = self._in_flight.get(store_key)
+            if in_flight is None:
+                break
+            await in_flight.wait()
+
+        done = self._in_flight[store_key] = asyncio.Event()
+        try:
+            await self._run_and_store(store_key, fingerprint, scope, receive, send)
+        finally:
+            del self._in_flight[store_key]
+            done.set()
+
+    async def _run_and_store(self, store_key, fingerprint, scope, receive, send):
+        start = {}
+        chunks = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body") and 200 <= start["status"] < 300:
+                    self.store.set(store_key, StoredResponse(
+                        fingerprint, start["status"], list(start.get("headers", [])), b"".join(chunks)
+                    ))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    async def _replay(self, stored: StoredResponse, fingerprint, scope, receive, send):
+        if stored.fingerprint != fingerprint:
+            await JSONResponse(
+                {"detail": f"{IDEMPOTENCY_HEADER} was already used for a different request"}, status_code=422
+            )(scope, receive, send)
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(REPLAYED_HEADER.lower().encode(), b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
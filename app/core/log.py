@@ -0,0 +1,182 @@
+import json
+import logging
+import logging.handlers
+import queue
+import re
+import sys
+import time
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.asgi import header
+from app.core.config import settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+logger = logging.getLogger(__name__)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request_id and any `extra=` fields"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.request_id = getattr(record, "request_id", None) or "-"
+        return super().format(record)
+
+class RequestContextFilter(logging.Filter):
+    """
+    Tags records with the current request id, and keeps only a sample of
+    DEBUG records. Sampling is decided per request, so a sampled request
+    keeps all of its debug lines.
+    """
+    def __init__(self, debug_sample_rate: float):
+        super().__init__()
+        self.threshold = int(debug_sample_rate * 10000)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        record.request_id = request_id
+        if record.levelno >= logging.INFO or self.threshold >= 10000:
+            return True
+        key = request_id or f"{record.name}:{record.created}"
+        return zlib.crc32(key.encode()) % 10000 < self.threshold
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread without ever waiting: when the
+    queue is full the record is dropped and counted instead.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback here, where the arguments are still
+        # valid, but leave the layout (JSON or text) to the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging() -> None:
+    """
+    Routes the root logger through a bounded queue to a background thread
+    that writes to stdout, so request threads never block on log I/O.
+    Idempotent; `shutdown_logging()` flushes and stops the thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RequestContextFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, NonBlockingQueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    # LOG_LEVEL=DEBUG applies to this app's loggers only; libraries stay at INFO
+    level = logging.getLevelName(settings.LOG_LEVEL)
+    if not isinstance(level, int):
+        # getLevelName returns "Level X" for names it does not know
+        logger.warning("Unknown LOG_LEVEL %r, using INFO", settings.LOG_LEVEL)
+        level = logging.INFO
+    root.setLevel(max(level, logging.INFO))
+    logging.getLogger("app").setLevel(level)
+    # SQLAlchemy logs every pool checkout under our pool subclass's module name
+    logging.getLogger("app.core.database").setLevel(max(level, logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, output)
+    _listener.start()
+
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def dropped_records() -> dict:
+    handlers = [h for h in logging.getLogger().handlers if isinstance(h, NonBlockingQueueHandler)]
+    return {"dropped": sum(handler.dropped for handler in handlers)}
+
+class RequestContextMiddleware:
+    """
+    Gives every request an id, taken from a well-formed incoming X-Request-ID
+    or generated, that is attached to all of its log records and echoed in
+    the response. Completed requests are logged at DEBUG (and so sampled).
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = header(scope, b"x-request-id")
+        request_id = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status = 500
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode())
+                ]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s %s", scope["method"], scope["path"], status, extra={
+                    "status": status, "duration_ms": round((time.perf_counter() - start) * 1000, 3)
+                })
+            request_id_var.reset(token)
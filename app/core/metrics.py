@@ -0,0 +1,191 @@
+import logging
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.query_counter import QueryCounter, add_query_time
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Longest parameter repr written to the slow-query log
+MAX_LOGGED_PARAMETERS = 1000
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    """A Prometheus histogram with fixed buckets, one series per label combination"""
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = 'le="%s"' % (bound if bound == "+Inf" else _number(bound))
+                lines.append(f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {_number(self.value)}"]
+
+class MetricsRegistry:
+    """
+    Process-wide request and database metrics, rendered in the Prometheus
+    text format. Collectors add gauges read at scrape time, such as the
+    connection pool or email outbox counters.
+    """
+    def __init__(self, slow_query_seconds: float):
+        self.slow_query_seconds = slow_query_seconds
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time to handle a request, including streaming the body",
+            ("method", "route", "status")
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries", "SQL statements executed per request",
+            ("method", "route"), QUERY_COUNT_BUCKETS
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Time spent in SQL statements per request", ("method", "route")
+        )
+        self.query_duration = Histogram("db_query_duration_seconds", "Duration of each SQL statement")
+        self.slow_queries = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS")
+        self._collectors: List[Tuple[str, Callable[[], dict]]] = []
+
+    def add_collector(self, prefix: str, collect: Callable[[], dict]) -> None:
+        """`collect()` returns a flat dict; its numeric values are exported as `<prefix>_<key>` gauges"""
+        self._collectors.append((prefix, collect))
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, queries: QueryCounter) -> None:
+        self.request_duration.observe(seconds, method, route, status)
+        self.request_queries.observe(queries.count, method, route)
+        self.request_db_time.observe(queries.seconds, method, route)
+
+    def observe_query(self, seconds: float, statement: str, parameters) -> None:
+        self.query_duration.observe(seconds)
+        add_query_time(seconds)
+        if seconds >= self.slow_query_seconds:
+            self.slow_queries.inc()
+            logger.warning(
+                "Slow query (%.1f ms): %s | parameters: %.*r",
+                seconds * 1000, " ".join(statement.split()), MAX_LOGGED_PARAMETERS, parameters
+            )
+
+    def render(self) -> str:
+        lines = []
+        for metric in (self.request_duration, self.request_queries, self.request_db_time, self.query_duration, self.slow_queries):
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+# ============== SQL HOOKS ==============
+
+# The start time lives on the execution context, so a statement that fails leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started_at = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started_at", None)
+    if started is not None:
+        metrics.observe_query(time.perf_counter() - started, statement, parameters)
+
+def install_query_hooks() -> None:
+    """Times every SQL statement on every engine (sync and async)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+def remove_query_hooks() -> None:
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+# ============== MIDDLEWARE ==============
+
+class MetricsMiddleware:
+    """
+    Records each request's latency, status and SQL statement count and time,
+    labelled by route template (`/user/orders/{order_id}`) rather than raw
+    path so that series stay bounded. Requests no route matched share the
+    `unmatched` label.
+    """
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        queries = QueryCounter()
+        try:
+            with queries:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.registry.observe_request(scope["method"], route, status, elapsed, queries)
+
+metrics = MetricsRegistry(slow_query_seconds=settings.SLOW_QUERY_MS / 1000)
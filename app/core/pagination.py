@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query as SAQuery
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+class PageParams:
+    """
+    Query parameters shared by every paginated list endpoint.
+    """
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        include_total: bool = False
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.include_total = include_total
+
+def encode_cursor(values) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError
+        return tuple(
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(columns, payload)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(
+    query: SAQuery,
+    page: PageParams,
+    response: Response,
+    *columns,
+    descending: bool = False
+) -> list:
+    """
+    Applies keyset pagination to `query`, ordered by `columns`.
+
+    The last column must be unique (normally the primary key) so the cursor
+    identifies an exact position. The next page's cursor is returned in the
+    X-Next-Cursor header, and X-Total-Count is only computed when the client
+    asks for it with `include_total=true`.
+    """
+    if page.include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(query.order_by(None).count())
+
+    if page.cursor:
+        key = tuple_(*columns)
+        position = tuple_(*decode_cursor(page.cursor, columns))
+        query = query.filter(key < position if descending else key > position)
+
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*ordering).limit(page.limit + 1).all()
+
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+
+    return rows
@@ -0,0 +1,83 @@
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current_counter: ContextVar[Optional["QueryCounter"]] = ContextVar("query_counter", default=None)
+
+class QueryCounter:
+    """
+    Counts SQL statements executed while the counter is active, and their
+    time when the metrics SQL hooks are installed.
+
+    Used as a context manager; the count is shared with worker threads that
+    inherit the current context, such as FastAPI's threadpool for sync routes.
+    Counters nest: a statement counts towards every active counter, so the
+    metrics middleware, the query budget and a test can all count one request.
+    """
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._parent: Optional["QueryCounter"] = None
+        self._token = None
+
+    def __enter__(self):
+        self._parent = _current_counter.get()
+        self._token = _current_counter.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current_counter.reset(self._token)
+
+def active_counters() -> Iterator[QueryCounter]:
+    counter = _current_counter.get()
+    while counter is not None:
+        yield counter
+        counter = counter._parent
+
+def add_query_time(seconds: float) -> None:
+    """Adds a finished statement's duration to every active counter"""
+    for counter in active_counters():
+        counter.seconds += seconds
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    for counter in active_counters():
+        counter.count += 1
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+class QueryBudgetMiddleware:
+    """
+    Debug-only guard that fails any request whose path starts with a budgeted
+    prefix and issues more SQL statements than allowed.
+
+    The check runs before the response starts, so the request errors out with
+    a 500 (and TestClient re-raises it) instead of silently returning data.
+    """
+    def __init__(self, app, budgets: Dict[str, int]):
+        self.app = app
+        self.budgets = budgets
+
+    def _budget_for(self, path: str) -> Optional[int]:
+        for prefix, budget in self.budgets.items():
+            if path.startswith(prefix):
+                return budget
+        return None
+
+    async def __call__(self, scope, receive, send):
+        budget = self._budget_for(scope["path"]) if scope["type"] == "http" else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        with QueryCounter() as counter:
+            async def send_checked(message):
+                if message["type"] == "http.response.start" and counter.count > budget:
+                    raise QueryBudgetExceeded(
+                        f"{scope['method']} {scope['path']} ran {counter.count} queries (budget {budget})"
+                    )
+                await send(message)
+
+            await self.app(scope, receive, send_checked)
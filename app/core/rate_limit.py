@@ -0,0 +1,157 @@
+import json
+import math
+import time
+from threading import Lock
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from starlette.responses import JSONResponse
+
+from app.core.asgi import bearer_identity, buffer_body, client_ip
+from app.core.config import settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+def parse_rate(rate: str) -> Tuple[int, float]:
+    """"10/minute" -> (10, 60.0)"""
+    count, _, period = rate.partition("/")
+    return int(count), float(_PERIODS[period.strip().rstrip("s")])
+
+class RateLimitRule(NamedTuple):
+    method: str
+    path: str
+    rate: str
+    key: str  # "ip", "email" (from the JSON body) or "user" (from the bearer token)
+
+# ============== STORES ==============
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "evicted_at")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.buckets: Dict[str, list] = {}  # key -> [tokens, updated_at, full_at]
+        self.evicted_at = time.monotonic()
+
+class MemoryBucketStore:
+    """
+    Token buckets for this process, split across independently locked shards.
+
+    Each check touches one bucket. A shard drops buckets that have refilled
+    completely (and so behave like new ones) at most every `evict_interval`
+    seconds, which keeps memory bounded by recently active keys.
+    """
+    def __init__(self, shards: int = 16, evict_interval: float = 60.0):
+        self._shards = [_Shard() for _ in range(shards)]
+        self.evict_interval = evict_interval
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        """Takes one token; returns 0 if allowed, else seconds until a token is available"""
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            shard.buckets[key] = [tokens, now, now + (capacity - tokens) / rate]
+
+            if now - shard.evicted_at >= self.evict_interval:
+                shard.evicted_at = now
+                for stale in [k for k, b in shard.buckets.items() if b[2] <= now]:
+                    del shard.buckets[stale]
+        return wait
+
+# Same algorithm as MemoryBucketStore.take, run atomically inside Redis
+_REDIS_TAKE = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through Redis (requires the `redis` package)"""
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(_REDIS_TAKE)
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        return float(await self._take(keys=[self.prefix + key], args=[rate, capacity, time.time()]))
+
+def create_bucket_store():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBucketStore(settings.REDIS_URL)
+    return MemoryBucketStore()
+
+# ============== MIDDLEWARE ==============
+
+class RateLimitMiddleware:
+    """
+    Applies token-bucket limits to exact (method, path) routes.
+
+    A request is checked against every rule for its route and rejected with
+    429 and Retry-After by the first bucket that is empty. Requests whose key
+    cannot be determined (no token, no email in the body) are passed through
+    and left to the route's own validation.
+    """
+    def __init__(self, app, rules: Iterable[RateLimitRule], store):
+        self.app = app
+        self.store = store
+        self.rules: Dict[Tuple[str, str], List[tuple]] = {}
+        for rule in rules:
+            limit, period = parse_rate(rule.rate)
+            self.rules.setdefault((rule.method, rule.path), []).append((rule.key, limit, limit / period))
+
+    async def __call__(self, scope, receive, send):
+        rules = self.rules.get((scope["method"], scope["path"])) if scope["type"] == "http" else None
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        body = None
+        if any(key == "email" for key, _, _ in rules):
+            body, receive = await buffer_body(receive)
+
+        for key, limit, rate in rules:
+            identity = _identity(key, scope, body)
+            if identity is None:
+                continue
+            wait = await self.store.take(f"{key}:{identity}:{scope['method']} {scope['path']}", rate, limit)
+            if wait > 0:
+                retry_after = math.ceil(wait)
+                response = JSONResponse(
+                    {"detail": f"Too many requests, retry in {retry_after} seconds"},
+                    status_code=429,
+                    headers={"Retry-After": str(retry_after)}
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+def _identity(key: str, scope, body: Optional[bytes]) -> Optional[str]:
+    if key == "ip":
+        return client_ip(scope)
+
+    if key == "user":
+        return bearer_identity(scope)
+
+    if key == "email":
+        try:
+            email = json.loads(body).get("email")
+        except (ValueError, AttributeError):
+            return None
+        return email.strip().lower() if isinstance(email, str) else None
+
+    raise ValueError(f"Unknown rate limit key: {key}")
@@ -2,10 +2,21 @@ from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from typing import Optional
+import secrets
+import time
+
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 security = HTTPBearer()
 
+# Decoded payloads of recently seen tokens; entries never outlive the token's own `exp`
+_verified_tokens = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
 def create_access_token(data: dict) -> str:
     """
     Creates a JWT access token with expiry.
@@ -25,25 +36,40 @@ def create_access_token(data: dict) -> str:
 
     return token
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def decode_token(token: str) -> Optional[dict]:
     """
-    Verifies JWT token and returns payload.
+    Returns the token's payload, or None if it is invalid or expired.
     """
-    token = credentials.credentials
+    payload = _verified_tokens.get(token)
+    if payload is not None and payload["exp"] > time.time():
+        return payload
+
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
+        return None
+
+    if "exp" in payload:
+        _verified_tokens.set(token, payload)
+    return payload
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Verifies JWT token and returns payload.
+    """
+    payload = decode_token(credentials.credentials)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
+    return payload
 
-def require_admin(payload: dict = Depends(verify_token)):
+async def require_admin(payload: dict = Depends(verify_token)):
     """
     Ensures user is admin.
     """
@@ -54,7 +80,16 @@ def require_admin(payload: dict = Depends(verify_token)):
         )
     return payload
 
-def require_user(payload: dict = Depends(verify_token)):
+async def require_metrics_access(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Lets the metrics scraper in with METRICS_TOKEN, and admins with their JWT.
+    """
+    token = settings.METRICS_TOKEN
+    if token and secrets.compare_digest(credentials.credentials.encode(), token.encode()):
+        return
+    await require_admin(await verify_token(credentials))
+
+async def require_user(payload: dict = Depends(verify_token)):
     """
     Ensures user is authenticated.
     """
@@ -1,10 +1,106 @@
-from fastapi import FastAPI
+import time
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+import logging
+import os
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.api import auth, admin, user
+from app.api import auth, admin
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, pool_status
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyMiddleware
+from app.core.log import REQUEST_ID_HEADER, RequestContextMiddleware, dropped_records, setup_logging, shutdown_logging
+from app.core.metrics import MetricsMiddleware, install_query_hooks, metrics
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.core.query_counter import QueryBudgetMiddleware
+from app.core.rate_limit import RateLimitMiddleware, RateLimitRule, create_bucket_store
+from app.core.security import require_metrics_access
+from app.services.catalogue_cache import catalogue_cache
+from app.services.email_service import outbox
+from app.services.inventory_service import expiry_sweeper
+from app.services.job_service import job_runner
+from app.services.otp_service import otp_sweeper
+
+logger = logging.getLogger(__name__)
+
+def init_database() -> dict:
+    """
+    Schema check and sample seeding, in-process instead of separate scripts;
+    returns phase timings in ms. Runs under a database lock, so workers
+    starting together never upgrade or seed concurrently.
+    """
+    from app.services.schema_service import init_schema, startup_lock
+    from app.services.seed_service import seed_sample_data
+
+    timings = {}
+    started = time.perf_counter()
+    with startup_lock(engine, "init_database", settings.INIT_DB_LOCK_SECONDS):
+        timings["lock_wait_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        started = time.perf_counter()
+        init_schema(engine)
+        timings["schema_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if settings.SEED_SAMPLE_DATA:
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                added = seed_sample_data(db)
+            finally:
+                db.close()
+            if any(added.values()):
+                logger.info("Seeded sample data", extra=added)
+            timings["seed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return timings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    setup_logging()
+    if not os.getenv("ADMIN_EMAIL"):
+        logger.warning("ADMIN_EMAIL is not set, using %s", settings.ADMIN_EMAIL)
+    timings = init_database() if settings.INIT_DB_ON_STARTUP else {}
+    outbox.start()
+    otp_sweeper.start()
+    expiry_sweeper.start()
+    job_runner.start()
+    logger.info("Startup complete", extra={
+        "import_ms": _import_ms, **timings, "lifespan_ms": round((time.perf_counter() - started) * 1000, 1)
+    })
+    yield
+    job_runner.stop()
+    expiry_sweeper.stop()
+    otp_sweeper.stop()
+    # Flush queued OTP emails before the worker exits
+    outbox.stop()
+    shutdown_logging()
+
+app = FastAPI(title="Pharmacy Management System", lifespan=lifespan)
+
+# ---------------- Rate Limiting ----------------
+# Registered before CORS so that 429 responses still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=[
+            RateLimitRule("POST", "/auth/request-otp", settings.RATE_LIMIT_OTP_PER_IP, "ip"),
+            RateLimitRule("POST", "/auth/request-otp", settings.RATE_LIMIT_OTP_PER_EMAIL, "email"),
+            RateLimitRule("POST", "/auth/verify-otp", settings.RATE_LIMIT_VERIFY_PER_IP, "ip"),
+            RateLimitRule("POST", "/user/orders", settings.RATE_LIMIT_ORDERS_PER_USER, "user"),
+        ],
+        store=create_bucket_store(),
+    )
 
-app = FastAPI(title="Pharmacy Management System")
+# ---------------- Idempotency ----------------
+# Outside the rate limiter so that replayed retries do not use up the client's budget
+app.add_middleware(
+    IdempotencyMiddleware,
+    paths=[r"/user/orders", r"/user/orders/\d+/payment"],
+    store=TTLCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS),
+)
 
 # ---------------- CORS (needed for frontend ↔ backend if deployed separately) ----------------
 app.add_middleware(
@@ -13,8 +109,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, "ETag", "Retry-After", REPLAYED_HEADER, REQUEST_ID_HEADER],
 )
 
+# ---------------- Query Budget (debug only) ----------------
+# Catches N+1 regressions: order endpoints must run a fixed number of queries regardless of row count
+if settings.DEBUG:
+    app.add_middleware(
+        QueryBudgetMiddleware,
+        budgets={
+            "/user/orders": settings.ORDER_QUERY_BUDGET,
+            "/admin/orders": settings.ORDER_QUERY_BUDGET,
+        },
+    )
+
+# ---------------- Metrics ----------------
+# Outside everything but the request-id middleware, so latency covers the others and rejected requests are counted too
+if settings.METRICS_ENABLED:
+    install_query_hooks()
+    metrics.add_collector("db_pool", pool_status)
+    metrics.add_collector("email_outbox", outbox.stats)
+    metrics.add_collector("catalogue_cache", catalogue_cache.stats)
+    metrics.add_collector("log_records", dropped_records)
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+    def get_metrics(_: None = Depends(require_metrics_access)):
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# ---------------- Request IDs ----------------
+# Outermost, so every log record of a request (metrics, rate limiting included) carries its id
+app.add_middleware(RequestContextMiddleware)
+
 # ---------------- Static Files (Frontend) ----------------
 # This serves HTML, CSS, JS from app/static
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -22,9 +148,17 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 # ---------------- API Routers ----------------
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(admin.router, prefix="/admin", tags=["Admin"])
-app.include_router(user.router, prefix="/user", tags=["User"])
+if settings.ASYNC_DB:
+    from app.api import user_async
+    app.include_router(user_async.router, prefix="/user", tags=["User"])
+else:
+    from app.api import user
+    app.include_router(user.router, prefix="/user", tags=["User"])
 
 # ---------------- Health Check ----------------
 @app.get("/")
 def root():
     return {"status": "Pharmacy backend running"}
+
+# Reported with the startup timings; covers importing this module and everything it pulls in, not interpreter start-up
+_import_ms = round((time.perf_counter() - _import_started) * 1000, 1)
@@ -1,16 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
 
+# Statuses that give the slot back to other patients
+FREES_SLOT = ("Rejected", "Cancelled")
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # No double booking: one live appointment per doctor and start time,
+        # enforced by the INSERT itself so concurrent bookings cannot both win
+        Index(
+            "uq_appointments_doctor_slot", "doctor_id", "appointment_date", unique=True,
+            sqlite_where=text("status NOT IN ('Rejected', 'Cancelled')"),
+            postgresql_where=text("status NOT IN ('Rejected', 'Cancelled')")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    doctor_id = Column(Integer, ForeignKey("doctors.id"))  # NULL for bookings made before slots
     doctor_name = Column(String, nullable=False)
     specialization = Column(String, nullable=False)
-    appointment_date = Column(DateTime, nullable=False, index=True)
+    appointment_date = Column(DateTime, nullable=False, index=True)  # Slot start (clinic local time)
     appointment_time = Column(String, nullable=False)
     status = Column(String, default="Pending", index=True)  # Pending, Approved, Rejected, Completed
     notes = Column(Text)
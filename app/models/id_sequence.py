@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+class IdSequence(Base):
+    """Next unallocated value of a named counter; processes reserve values from it in blocks"""
+    __tablename__ = "id_sequences"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class Job(Base):
+    """A unit of deferred work, claimed and run by the in-process job runner"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # The runner's claim query: next pending job that is due
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON
+    status = Column(String, nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime)
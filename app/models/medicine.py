@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
 
@@ -10,9 +11,40 @@ class Medicine(Base):
     category = Column(String, nullable=False, index=True)
     description = Column(String)
     price = Column(Float, nullable=False)
-    stock = Column(Integer, nullable=False, default=0)
+    stock = Column(Integer, nullable=False, default=0)  # Total across all batches (plus any untracked stock)
     low_stock_threshold = Column(Integer, default=10)
     manufacturer = Column(String)
-    expiry_date = Column(DateTime)
+    expiry_date = Column(DateTime)  # Earliest expiry among batches still in stock
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    batches = relationship("StockBatch", back_populates="medicine", cascade="all, delete-orphan")
+
+class StockBatch(Base):
+    """One received lot of a medicine; sales draw from the earliest-expiring lot first"""
+    __tablename__ = "stock_batches"
+    __table_args__ = (
+        UniqueConstraint("medicine_id", "lot_number", name="uq_stock_batches_medicine_lot"),
+        # Both only cover lots still in stock, so sold-out lots cost nothing to skip
+        # FEFO allocation: a medicine's lots in expiry order
+        Index(
+            "ix_stock_batches_fefo", "medicine_id", "expiry_date",
+            sqlite_where=text("quantity > 0"), postgresql_where=text("quantity > 0")
+        ),
+        # Admin "expiring within N days" report
+        Index(
+            "ix_stock_batches_expiry", "expiry_date",
+            sqlite_where=text("quantity > 0"), postgresql_where=text("quantity > 0")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
+    lot_number = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    expiry_date = Column(DateTime)  # NULL: does not expire, allocated last
+    received_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    medicine = relationship("Medicine", back_populates="batches")
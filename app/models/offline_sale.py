@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.core.database import Base
 
@@ -9,9 +10,27 @@ class OfflineSale(Base):
     invoice_number = Column(String, unique=True, nullable=False, index=True)
     customer_name = Column(String)
     customer_phone = Column(String)
-    items = Column(Text, nullable=False)  # JSON string of items
+    items = Column(Text, nullable=False)  # JSON string of items, kept for older readers; query line_items instead
     subtotal = Column(Float, nullable=False)
     tax = Column(Float, default=0)
     total_amount = Column(Float, nullable=False)
     payment_mode = Column(String, nullable=False)  # Cash, Card, UPI
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
+
+    # Relationships
+    line_items = relationship("OfflineSaleItem", back_populates="sale", cascade="all, delete-orphan")
+
+class OfflineSaleItem(Base):
+    __tablename__ = "offline_sale_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sale_id = Column(Integer, ForeignKey("offline_sales.id"), nullable=False, index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False, index=True)
+    medicine_name = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False)
+    subtotal = Column(Float, nullable=False)
+
+    # Relationships
+    sale = relationship("OfflineSale", back_populates="line_items")
+    medicine = relationship("Medicine")
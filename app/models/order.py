@@ -19,7 +19,8 @@ class Order(Base):
 
     # Relationships
     user = relationship("User", backref="orders")
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    # selectin: any batch of orders loads all of its items with one extra IN (...) query
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan", lazy="selectin")
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from datetime import datetime, timezone
 from app.core.database import Base
 
 class OTP(Base):
     __tablename__ = "otps"
+    __table_args__ = (
+        # Verification is a single lookup on (email, otp); the leading column also serves per-email deletes
+        Index("ix_otps_email_otp", "email", "otp"),
+        Index("ix_otps_expires_at", "expires_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, index=True, nullable=False)
+    email = Column(String, nullable=False)
     otp = Column(String, nullable=False)
     expires_at = Column(DateTime, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
 
     def is_expired(self):
         expires_at = self.expires_at
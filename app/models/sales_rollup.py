@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, Date, UniqueConstraint
+from app.core.database import Base
+
+class DailySales(Base):
+    """Per-day, per-channel, per-payment-mode sales totals maintained on write"""
+    __tablename__ = "daily_sales"
+    __table_args__ = (UniqueConstraint("day", "channel", "payment_mode", name="uq_daily_sales_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    channel = Column(String, nullable=False)  # online, offline
+    payment_mode = Column(String, nullable=False)
+    order_count = Column(Integer, nullable=False, default=0)  # excludes cancelled orders
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)  # excludes cancelled orders
+
+class DailyMedicineSales(Base):
+    """Per-day, per-channel quantity and revenue for each medicine sold"""
+    __tablename__ = "daily_medicine_sales"
+    __table_args__ = (UniqueConstraint("day", "channel", "medicine_name", name="uq_daily_medicine_sales_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    channel = Column(String, nullable=False)  # online, offline
+    medicine_name = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, DateTime, String
+from app.core.database import Base
+
+class StartupLock(Base):
+    """A named lock held by the worker initialising the database; the row exists only while it is held"""
+    __tablename__ = "startup_locks"
+
+    name = Column(String, primary_key=True)
+    locked_at = Column(DateTime, nullable=False)
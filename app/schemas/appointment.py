@@ -1,17 +1,19 @@
 from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 class AppointmentCreate(BaseModel):
-    doctor_name: str
-    specialization: str
+    doctor_id: Optional[int] = None
+    doctor_name: Optional[str] = None  # Used to find the doctor when doctor_id is not sent
+    specialization: Optional[str] = None
     appointment_date: datetime
-    appointment_time: str
+    appointment_time: str  # A slot start from /user/doctors/{id}/slots, e.g. "09:30 AM"
     notes: Optional[str] = None
 
 class AppointmentResponse(BaseModel):
     id: int
     user_id: int
+    doctor_id: Optional[int] = None
     doctor_name: str
     specialization: str
     appointment_date: datetime
@@ -38,3 +40,14 @@ class DoctorResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+class SlotResponse(BaseModel):
+    start: datetime
+    time: str
+    available: bool
+
+class DoctorSlotsResponse(BaseModel):
+    doctor_id: int
+    date: date
+    slot_minutes: int
+    slots: List[SlotResponse]
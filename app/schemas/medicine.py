@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -38,3 +38,23 @@ class MedicineResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Stock Batch Schemas
+class StockBatchCreate(BaseModel):
+    lot_number: str
+    quantity: int = Field(gt=0)
+    expiry_date: Optional[datetime] = None
+
+class StockBatchResponse(BaseModel):
+    id: int
+    medicine_id: int
+    lot_number: str
+    quantity: int
+    expiry_date: Optional[datetime]
+    received_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ExpiringBatchResponse(StockBatchResponse):
+    medicine_name: str
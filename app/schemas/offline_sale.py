@@ -1,18 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
 from datetime import datetime
 
 class OfflineSaleItem(BaseModel):
     medicine_id: int
     medicine_name: str
-    quantity: int
+    quantity: int = Field(gt=0)
     price: float
     subtotal: float
 
 class OfflineSaleCreate(BaseModel):
     customer_name: Optional[str] = None
     customer_phone: Optional[str] = None
-    items: List[OfflineSaleItem]
+    items: List[OfflineSaleItem] = Field(min_length=1)
     payment_mode: str  # Cash, Card, UPI
 
 class OfflineSaleResponse(BaseModel):
@@ -1,11 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
 # Order Item Schemas
 class OrderItemCreate(BaseModel):
     medicine_id: int
-    quantity: int
+    quantity: int = Field(gt=0)
 
 class OrderItemResponse(BaseModel):
     id: int
@@ -20,7 +20,7 @@ class OrderItemResponse(BaseModel):
 
 # Order Schemas
 class OrderCreate(BaseModel):
-    items: List[OrderItemCreate]
+    items: List[OrderItemCreate] = Field(min_length=1)
     shipping_address: str
     payment_mode: str  # UPI, COD
 
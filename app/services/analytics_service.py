@@ -0,0 +1,222 @@
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Optional
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.offline_sale import OfflineSale, OfflineSaleItem
+from app.models.order import Order, OrderItem
+from app.models.sales_rollup import DailySales, DailyMedicineSales
+
+ONLINE = "online"
+OFFLINE = "offline"
+CANCELLED = "Cancelled"
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def _day(timestamp: Optional[datetime]) -> date:
+    if timestamp is None:
+        return datetime.now(timezone.utc).date()
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+def _bump(db: Session, model, rows: Dict[tuple, Dict[str, float]], key_columns: tuple) -> None:
+    """
+    Adds each row's deltas to the rollup row with the same key, creating it if needed.
+    """
+    if not rows:
+        return
+
+    values = [dict(zip(key_columns, key), **deltas) for key, deltas in rows.items()]
+    upsert_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+
+    if upsert_insert is not None:
+        stmt = upsert_insert(model).values(values)
+        delta_columns = [column for column in values[0] if column not in key_columns]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: getattr(model, column) + stmt.excluded[column] for column in delta_columns}
+        )
+        db.execute(stmt)
+        return
+
+    # Portable fallback: update the existing row, insert when there was none
+    for row in values:
+        deltas = {column: value for column, value in row.items() if column not in key_columns}
+        result = db.execute(
+            update(model)
+            .where(*[getattr(model, column) == row[column] for column in key_columns])
+            .values({getattr(model, column): getattr(model, column) + value for column, value in deltas.items()})
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            db.execute(insert(model).values(row))
+
+def _bump_order(db: Session, order: Order, sign: int, cancelled_delta: int) -> None:
+    day = _day(order.created_at)
+    _bump(db, DailySales, {
+        (day, ONLINE, order.payment_mode): {
+            "order_count": sign,
+            "cancelled_count": cancelled_delta,
+            "revenue": sign * order.total_amount,
+        }
+    }, ("day", "channel", "payment_mode"))
+
+    medicine_rows = defaultdict(lambda: {"quantity": 0, "revenue": 0.0})
+    for item in order.items:
+        row = medicine_rows[(day, ONLINE, item.medicine_name)]
+        row["quantity"] += sign * item.quantity
+        row["revenue"] += sign * item.subtotal
+    _bump(db, DailyMedicineSales, medicine_rows, ("day", "channel", "medicine_name"))
+
+# ============== WRITE PATH ==============
+
+def record_order(db: Session, order: Order) -> None:
+    """Adds a newly placed (flushed, not yet committed) order to the rollups"""
+    _bump_order(db, order, 1, 0)
+
+def record_order_status_change(db: Session, order: Order, old_status: str) -> None:
+    """Moves an order's totals in or out of the rollups when it is cancelled or reinstated"""
+    was_cancelled = old_status == CANCELLED
+    is_cancelled = order.status == CANCELLED
+    if was_cancelled == is_cancelled:
+        return
+    sign = 1 if was_cancelled else -1
+    _bump_order(db, order, sign, -sign)
+
+def record_offline_sale(db: Session, sale: OfflineSale) -> None:
+    """Adds a counter sale (flushed, with its line items) to the rollups"""
+    day = _day(sale.created_at)
+    _bump(db, DailySales, {
+        (day, OFFLINE, sale.payment_mode): {
+            "order_count": 1,
+            "cancelled_count": 0,
+            "revenue": sale.total_amount,
+        }
+    }, ("day", "channel", "payment_mode"))
+
+    medicine_rows = defaultdict(lambda: {"quantity": 0, "revenue": 0.0})
+    for item in sale.line_items:
+        row = medicine_rows[(day, OFFLINE, item.medicine_name)]
+        row["quantity"] += item.quantity
+        row["revenue"] += item.subtotal
+    _bump(db, DailyMedicineSales, medicine_rows, ("day", "channel", "medicine_name"))
+
+# ============== READ PATH ==============
+
+def sales_summary(db: Session, start_day: date, end_day: date) -> dict:
+    """Revenue, payment split and top medicines (online and counter sales combined) for the inclusive day range"""
+    in_range = (DailySales.day >= start_day, DailySales.day <= end_day)
+
+    by_channel = db.query(
+        DailySales.channel,
+        DailySales.payment_mode,
+        func.sum(DailySales.order_count).label("total_orders"),
+        func.sum(DailySales.revenue).label("total_revenue")
+    ).filter(*in_range).group_by(DailySales.channel, DailySales.payment_mode).all()
+
+    top_medicines = db.query(
+        DailyMedicineSales.medicine_name,
+        func.sum(DailyMedicineSales.quantity).label("total_quantity"),
+        func.sum(DailyMedicineSales.revenue).label("total_revenue")
+    ).filter(
+        DailyMedicineSales.day >= start_day,
+        DailyMedicineSales.day <= end_day
+    ).group_by(DailyMedicineSales.medicine_name).having(
+        func.sum(DailyMedicineSales.quantity) > 0
+    ).order_by(func.sum(DailyMedicineSales.quantity).desc()).limit(10).all()
+
+    online_revenue = 0.0
+    offline_revenue = 0.0
+    payment_split = {}
+    for row in by_channel:
+        revenue = float(row.total_revenue or 0)
+        if row.channel == ONLINE:
+            online_revenue += revenue
+            payment_split[row.payment_mode] = {"orders": row.total_orders, "revenue": revenue}
+        else:
+            offline_revenue += revenue
+
+    return {
+        "total_revenue": online_revenue + offline_revenue,
+        "online_revenue": online_revenue,
+        "offline_revenue": offline_revenue,
+        "payment_split": payment_split,
+        "top_medicines": [
+            {
+                "name": med.medicine_name,
+                "quantity_sold": med.total_quantity,
+                "revenue": float(med.total_revenue)
+            }
+            for med in top_medicines
+        ]
+    }
+
+def online_orders_for_day(db: Session, day: date) -> tuple:
+    """(orders placed including cancelled, revenue excluding cancelled) for one day"""
+    row = db.query(
+        func.sum(DailySales.order_count + DailySales.cancelled_count),
+        func.sum(DailySales.revenue)
+    ).filter(DailySales.day == day, DailySales.channel == ONLINE).one()
+    return row[0] or 0, float(row[1] or 0)
+
+# ============== BACKFILL ==============
+
+def rebuild_rollups(db: Session) -> None:
+    """Recomputes every rollup row from orders and offline sales with set-based INSERT ... SELECT"""
+    db.query(DailySales).delete(synchronize_session=False)
+    db.query(DailyMedicineSales).delete(synchronize_session=False)
+
+    is_cancelled = Order.status == CANCELLED
+    order_day = func.date(Order.created_at)
+    db.execute(insert(DailySales).from_select(
+        ["day", "channel", "payment_mode", "order_count", "cancelled_count", "revenue"],
+        select(
+            order_day,
+            literal(ONLINE),
+            Order.payment_mode,
+            func.sum(case((is_cancelled, 0), else_=1)),
+            func.sum(case((is_cancelled, 1), else_=0)),
+            func.sum(case((is_cancelled, 0), else_=Order.total_amount))
+        ).group_by(order_day, Order.payment_mode)
+    ))
+
+    sale_day = func.date(OfflineSale.created_at)
+    db.execute(insert(DailySales).from_select(
+        ["day", "channel", "payment_mode", "order_count", "cancelled_count", "revenue"],
+        select(
+            sale_day,
+            literal(OFFLINE),
+            OfflineSale.payment_mode,
+            func.count(OfflineSale.id),
+            literal(0),
+            func.sum(OfflineSale.total_amount)
+        ).group_by(sale_day, OfflineSale.payment_mode)
+    ))
+
+    db.execute(insert(DailyMedicineSales).from_select(
+        ["day", "channel", "medicine_name", "quantity", "revenue"],
+        select(
+            order_day,
+            literal(ONLINE),
+            OrderItem.medicine_name,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.subtotal)
+        ).join(Order).filter(~is_cancelled).group_by(order_day, OrderItem.medicine_name)
+    ))
+
+    db.execute(insert(DailyMedicineSales).from_select(
+        ["day", "channel", "medicine_name", "quantity", "revenue"],
+        select(
+            sale_day,
+            literal(OFFLINE),
+            OfflineSaleItem.medicine_name,
+            func.sum(OfflineSaleItem.quantity),
+            func.sum(OfflineSaleItem.subtotal)
+        ).join(OfflineSale).group_by(sale_day, OfflineSaleItem.medicine_name)
+    ))
+
+    db.commit()
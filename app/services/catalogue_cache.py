@@ -0,0 +1,53 @@
+from typing import Callable, Dict, Hashable, NamedTuple, Tuple
+from fastapi import Request, Response
+import hashlib
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+    etag: str
+
+# Per-process; other workers pick up changes within CATALOGUE_CACHE_TTL_SECONDS
+catalogue_cache = TTLCache(
+    maxsize=settings.CATALOGUE_CACHE_SIZE,
+    ttl=settings.CATALOGUE_CACHE_TTL_SECONDS
+)
+
+def invalidate_catalogue() -> None:
+    """Call after committing any change to medicines or their stock"""
+    catalogue_cache.invalidate()
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def cached_json_response(
+    request: Request,
+    key: Hashable,
+    build: Callable[[], Tuple[bytes, Dict[str, str]]]
+) -> Response:
+    """
+    Serves a JSON body from the catalogue cache, calling `build` on a miss.
+
+    `build` returns the serialized body plus any extra headers (e.g. pagination
+    cursors). Responses carry a content-hash ETag and a matching If-None-Match
+    gets an empty 304.
+    """
+    entry = catalogue_cache.get(key)
+    if entry is None:
+        generation = catalogue_cache.generation
+        body, headers = build()
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        entry = CachedResponse(body, headers, etag)
+        catalogue_cache.set(key, entry, generation)
+
+    headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
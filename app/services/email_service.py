@@ -1,14 +1,291 @@
+import abc
+import heapq
+import itertools
+import logging
+import queue
 import smtplib
+import threading
+import time
 from email.message import EmailMessage
+from typing import List, NamedTuple, Optional
+
 from app.core.config import settings
 
-def send_otp_email(to_email: str, otp: str):
+logger = logging.getLogger(__name__)
+
+# ============== TRANSPORTS ==============
+
+class EmailTransport(abc.ABC):
+    """
+    Delivers messages. `send` raises on failure; the outbox decides whether to retry.
+    """
+    @abc.abstractmethod
+    def send(self, message: EmailMessage) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+class SMTPTransport(EmailTransport):
+    """
+    Keeps one SMTP connection open across messages and reconnects when the
+    server drops it (Gmail closes idle sessions after a few minutes).
+    """
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = True,
+        timeout: float = 10
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.connects = 0
+        self._server: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        self.connects += 1
+        return server
+
+    def send(self, message: EmailMessage) -> None:
+        if self._server is None:
+            self._server = self._connect()
+        try:
+            self._server.send_message(message)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # Stale connection: reconnect once and resend, anything else is the caller's retry
+            self.close()
+            self._server = self._connect()
+            self._server.send_message(message)
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+class MemoryTransport(EmailTransport):
+    """Keeps sent messages in a list; for local development and tests"""
+    def __init__(self):
+        self.sent: List[EmailMessage] = []
+
+    def send(self, message: EmailMessage) -> None:
+        self.sent.append(message)
+
+def create_transport() -> EmailTransport:
+    if settings.EMAIL_TRANSPORT == "memory":
+        return MemoryTransport()
+    return SMTPTransport(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        settings.EMAIL_FROM,
+        settings.EMAIL_PASSWORD,
+        use_ssl=settings.SMTP_USE_SSL
+    )
+
+# ============== OUTBOX ==============
+
+class QueuedEmail(NamedTuple):
+    queued_at: float
+    message: EmailMessage
+    attempt: int
+
+class EmailOutbox:
+    """
+    In-process queue drained by a background thread.
+
+    `enqueue` returns immediately. The worker sends up to `batch_size` queued
+    messages per wake-up over the transport's persistent connection. A failed
+    message is set aside and retried after an exponential backoff, up to
+    `max_attempts` in all, while the rest of the queue keeps moving.
+    """
+    def __init__(
+        self,
+        transport: EmailTransport,
+        maxsize: int = 1000,
+        batch_size: int = 20,
+        max_attempts: int = 3,
+        retry_backoff: float = 1.0,
+        idle_close: float = 60.0
+    ):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.idle_close = idle_close
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        # (not before, tie-breaker, QueuedEmail); only touched by the worker thread
+        self._retries: list = []
+        self._retry_order = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.dropped = 0
+        self.latency_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Sends what is already queued (within `timeout`), then stops the worker"""
+        self._stopping.set()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(None)  # wakes an idle worker now rather than after `idle_close`
+            except queue.Full:
+                pass  # a busy worker checks _stopping once the queue drains
+            self._thread.join(timeout)
+            self._thread = None
+        self.transport.close()
+
+    def enqueue(self, message: EmailMessage) -> bool:
+        """Queues a message for delivery; returns False when the outbox is full"""
+        self.start()
+        try:
+            self._queue.put_nowait(QueuedEmail(time.monotonic(), message, 1))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            logger.error("Email outbox full, dropped message to %s", message["To"])
+            return False
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def _due_retries(self) -> list:
+        """Retries whose backoff has passed; all of them once stopping"""
+        now = time.monotonic()
+        due = []
+        while self._retries and len(due) < self.batch_size and (self._retries[0][0] <= now or self._stopping.is_set()):
+            due.append(heapq.heappop(self._retries)[2])
+        return due
+
+    def _wait_time(self) -> float:
+        """How long to block for new mail: until the next retry is due, at most `idle_close`"""
+        if self._stopping.is_set():
+            return 0.1
+        if self._retries:
+            return max(0.0, min(self.idle_close, self._retries[0][0] - time.monotonic()))
+        return self.idle_close
+
+    def _next_batch(self) -> list:
+        batch = self._due_retries()
+        if not batch:
+            try:
+                batch.append(self._queue.get(timeout=self._wait_time()))
+            except queue.Empty:
+                return self._due_retries()
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return [item for item in batch if item is not None]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                if self._retries:
+                    continue
+                if self._stopping.is_set():
+                    return
+                # Idle: release the connection rather than let the server time it out
+                self.transport.close()
+                continue
+
+            for item in batch:
+                self._deliver(item)
+
+    def _deliver(self, item: QueuedEmail) -> None:
+        try:
+            self.transport.send(item.message)
+        except Exception:
+            self.transport.close()
+            if item.attempt >= self.max_attempts:
+                with self._stats_lock:
+                    self.failed += 1
+                logger.exception("Giving up on email to %s after %d attempts", item.message["To"], item.attempt)
+                return
+            with self._stats_lock:
+                self.retries += 1
+            not_before = time.monotonic() + self.retry_backoff * 2 ** (item.attempt - 1)
+            heapq.heappush(self._retries, (not_before, next(self._retry_order), item._replace(attempt=item.attempt + 1)))
+            return
+
+        latency = time.monotonic() - item.queued_at
+        with self._stats_lock:
+            self.sent += 1
+            self.latency_seconds_total += latency
+            self.latency_seconds_max = max(self.latency_seconds_max, latency)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "transport": type(self.transport).__name__,
+                "queue_depth": self._queue.qsize(),
+                "retry_pending": len(self._retries),
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "dropped": self.dropped,
+                "latency_seconds_avg": round(self.latency_seconds_total / self.sent, 6) if self.sent else 0.0,
+                "latency_seconds_max": round(self.latency_seconds_max, 6),
+            }
+
+outbox = EmailOutbox(
+    create_transport(),
+    maxsize=settings.EMAIL_QUEUE_SIZE,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS
+)
+
+def send_otp_email(to_email: str, otp: str) -> bool:
+    """Queues the OTP email; delivery happens on the outbox worker"""
     msg = EmailMessage()
     msg["Subject"] = "Your Pharmacy Login OTP"
     msg["From"] = settings.EMAIL_FROM
     msg["To"] = to_email
     msg.set_content(f"Your OTP is: {otp}\nThis OTP is valid for 1 minute.")
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-        server.login(settings.EMAIL_FROM, settings.EMAIL_PASSWORD)
-        server.send_message(msg)
+    return outbox.enqueue(msg)
+
+def send_low_stock_alert(medicines: list) -> bool:
+    """Queues one email to the admin listing medicines at or below their low-stock threshold"""
+    msg = EmailMessage()
+    msg["Subject"] = f"Low stock: {len(medicines)} medicine(s) need restocking"
+    msg["From"] = settings.EMAIL_FROM
+    msg["To"] = settings.ADMIN_EMAIL
+    msg.set_content("\n".join(
+        f"{medicine.name} ({medicine.manufacturer or 'unknown manufacturer'}): "
+        f"{medicine.stock} left, threshold {medicine.low_stock_threshold}"
+        for medicine in medicines
+    ))
+
+    return outbox.enqueue(msg)
@@ -0,0 +1,94 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+import csv
+import io
+import json
+import zlib
+
+from app.core.database import SessionLocal
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+MEDIA_TYPES = {CSV: "text/csv", NDJSON: "application/x-ndjson"}
+
+# Rows fetched from the cursor, and written to the client, per step
+EXPORT_BATCH_SIZE = 1000
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def date_range(column, start_date: Optional[date], end_date: Optional[date]) -> list:
+    """Filters on a datetime column for the inclusive day range; either end may be open"""
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    conditions = []
+    if start_date:
+        conditions.append(column >= datetime.combine(start_date, time.min))
+    if end_date:
+        conditions.append(column < datetime.combine(end_date + timedelta(days=1), time.min))
+    return conditions
+
+def iter_export(statement: Select, export_format: str) -> Iterator[bytes]:
+    """
+    Runs `statement` on its own session and yields it encoded as CSV or NDJSON,
+    one batch of rows at a time, so the result is never held in memory.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        fields = list(result.keys())
+
+        if export_format == CSV:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(fields, row)), default=_json_default) + "\n"
+                    for row in rows
+                ).encode()
+    finally:
+        db.close()
+
+def _gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def export_response(
+    statement: Select,
+    export_format: str,
+    filename: str,
+    compress: bool = False
+) -> StreamingResponse:
+    if export_format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {export_format}")
+
+    body = iter_export(statement, export_format)
+    media_type = MEDIA_TYPES[export_format]
+    filename = f"{filename}.{export_format}"
+    if compress:
+        body, media_type, filename = _gzip(body), "application/gzip", f"{filename}.gz"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from threading import Lock
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.database import sequence_engine
+from app.models.id_sequence import IdSequence
+
+_UPSERT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+class HiLoSequence:
+    """
+    Hands out unique, increasing integers for one named sequence.
+
+    Each process reserves a block of `block_size` values with a single atomic
+    increment of its `id_sequences` row (in its own short transaction) and
+    then serves the block from memory, so values never collide across
+    workers and no caller ever retries. Values reserved but not used before a
+    restart are skipped, leaving gaps. Reservations use `sequence_engine`, so
+    a refill never queues for a connection behind the request sessions.
+
+    Call `next()` before the caller's session writes anything: on SQLite the
+    block reservation is a second writer and would wait on the caller's lock.
+    """
+    def __init__(self, name: str, block_size: int, bind: Engine = sequence_engine):
+        self.name = name
+        self.block_size = block_size
+        self.bind = bind
+        self._next = 0
+        self._limit = 0
+        self._lock = Lock()
+
+    def _reserve_block(self) -> int:
+        """Advances the stored counter by one block and returns the block's first value"""
+        with self.bind.begin() as conn:
+            upsert_insert = _UPSERT_INSERTS.get(conn.dialect.name)
+            if upsert_insert is not None:
+                stmt = upsert_insert(IdSequence).values(name=self.name, next_value=1 + self.block_size)
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[IdSequence.name],
+                    set_={"next_value": IdSequence.next_value + self.block_size}
+                ))
+            else:
+                result = conn.execute(
+                    update(IdSequence)
+                    .where(IdSequence.name == self.name)
+                    .values(next_value=IdSequence.next_value + self.block_size)
+                )
+                if result.rowcount == 0:
+                    conn.execute(IdSequence.__table__.insert().values(name=self.name, next_value=1 + self.block_size))
+
+            # The increment above holds the row's write lock until commit, so this read is ours
+            end = conn.execute(select(IdSequence.next_value).where(IdSequence.name == self.name)).scalar_one()
+        return end - self.block_size
+
+    def next(self) -> int:
+        with self._lock:
+            if self._next >= self._limit:
+                self._next = self._reserve_block()
+                self._limit = self._next + self.block_size
+            value = self._next
+            self._next += 1
+            return value
+
+order_sequence = HiLoSequence("orders", settings.ID_BLOCK_SIZE)
+invoice_sequence = HiLoSequence("invoices", settings.ID_BLOCK_SIZE)
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+def next_order_number() -> str:
+    return f"ORD-{_today()}-{order_sequence.next():08d}"
+
+def next_invoice_number() -> str:
+    return f"INV-{_today()}-{invoice_sequence.next():08d}"
@@ -0,0 +1,208 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+import codecs
+import csv
+import json
+
+from app.models.medicine import Medicine, StockBatch
+from app.schemas.medicine import MedicineCreate, MedicineUpdate
+from app.services.export_service import CSV, NDJSON
+from app.services.inventory_service import OPENING_LOT, trim_batches
+
+MEDICINE_FIELDS = (
+    "name", "manufacturer", "category", "description",
+    "price", "stock", "low_stock_threshold", "expiry_date",
+)
+
+# Rows validated and written per database round trip
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+def import_format(content_type: Optional[str]) -> str:
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return CSV
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return NDJSON
+    raise HTTPException(
+        status_code=415,
+        detail="Send the file as text/csv or application/x-ndjson"
+    )
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits an upload into text lines as the bytes arrive"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+async def _csv_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, dict]]:
+    header = None
+    record, start = "", 0
+    line_number = 0
+    async for line in _lines(stream):
+        line_number += 1
+        record = f"{record}\n{line}" if record else line
+        start = start or line_number
+        # A quoted field containing a newline continues on the next line
+        if record.count('"') % 2:
+            continue
+
+        values = next(csv.reader([record]), [])
+        if header is None:
+            header = [value.strip().lower() for value in values]
+        elif any(value.strip() for value in values):
+            yield start, {
+                field: value.strip()
+                for field, value in zip(header, values)
+                if field in MEDICINE_FIELDS and value.strip()
+            }
+        record, start = "", 0
+
+async def _ndjson_records(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, dict]]:
+    line_number = 0
+    async for line in _lines(stream):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None
+            continue
+        yield line_number, {
+            field: value for field, value in row.items()
+            if field in MEDICINE_FIELDS and value is not None
+        }
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+class ImportReport:
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+def _upsert_chunk(db: Session, rows: List[Tuple[int, dict]], report: ImportReport) -> None:
+    """
+    Matches a chunk against existing medicines by (name, manufacturer) with one
+    query, then applies all updates and all inserts as two executemany batches.
+    Stock goes through batches as in the admin editor: new medicines get an
+    opening batch, and lowered stock writes off batches to fit.
+    """
+    names = {fields["name"] for _, fields in rows}
+    existing = {}
+    # Oldest row wins when the catalogue already holds duplicates
+    for medicine_id, name, manufacturer in db.query(
+        Medicine.id, Medicine.name, Medicine.manufacturer
+    ).filter(Medicine.name.in_(names)).order_by(Medicine.id.desc()):
+        existing[(name, manufacturer or "")] = medicine_id
+
+    updates: Dict[int, dict] = {}
+    inserts: Dict[tuple, Tuple[int, dict]] = {}
+    for line, fields in rows:
+        key = (fields["name"], fields.get("manufacturer") or "")
+        if key in existing:
+            updates.setdefault(existing[key], {"id": existing[key]}).update(fields)
+        elif key in inserts:
+            inserts[key][1].update(fields)
+        else:
+            inserts[key] = (line, dict(fields))
+
+    new_rows = []
+    for line, fields in inserts.values():
+        try:
+            new_rows.append(MedicineCreate.model_validate(fields).model_dump())
+        except ValidationError as error:
+            report.error(line, _describe(error))
+
+    if updates:
+        db.execute(update(Medicine), list(updates.values()))
+        restocked = {medicine_id: row["stock"] for medicine_id, row in updates.items() if "stock" in row}
+        if restocked:
+            trim_batches(db, restocked)
+    if new_rows:
+        created = db.execute(
+            insert(Medicine).returning(Medicine.id, Medicine.stock, Medicine.expiry_date), new_rows
+        ).all()
+        opening = [
+            {"medicine_id": medicine_id, "lot_number": OPENING_LOT, "quantity": stock, "expiry_date": expiry_date}
+            for medicine_id, stock, expiry_date in created
+            if stock
+        ]
+        if opening:
+            db.execute(insert(StockBatch), opening)
+    db.commit()
+
+    report.updated += len(updates)
+    report.inserted += len(new_rows)
+
+async def import_medicines(db: Session, stream: AsyncIterator[bytes], import_format: str) -> dict:
+    """
+    Creates or updates medicines from a streamed CSV or NDJSON upload.
+
+    Rows are matched on name + manufacturer; columns a row leaves empty keep
+    their current value. Each chunk is committed on its own, so valid rows are
+    kept even when others fail, and every failure is reported by line number.
+    """
+    report = ImportReport()
+    records = _csv_records(stream) if import_format == CSV else _ndjson_records(stream)
+    chunk: List[Tuple[int, dict]] = []
+
+    async for line, raw in records:
+        report.processed += 1
+        if raw is None:
+            report.error(line, "Not a JSON object")
+            continue
+        try:
+            fields = MedicineUpdate.model_validate(raw).model_dump(exclude_unset=True)
+        except ValidationError as error:
+            report.error(line, _describe(error))
+            continue
+        if not fields.get("name"):
+            report.error(line, "name: Field required")
+            continue
+
+        chunk.append((line, fields))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            await run_in_threadpool(_upsert_chunk, db, chunk, report)
+            chunk = []
+
+    if chunk:
+        await run_in_threadpool(_upsert_chunk, db, chunk, report)
+
+    return report.as_dict()
@@ -0,0 +1,289 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, insert, literal, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.medicine import Medicine, StockBatch
+from app.services.catalogue_cache import invalidate_catalogue
+from app.services.email_service import send_low_stock_alert
+from app.services.job_service import PeriodicTask, enqueue, job_handler
+
+logger = logging.getLogger(__name__)
+
+def load_medicines(db: Session, medicine_ids: Iterable[int]) -> Dict[int, Medicine]:
+    """Fetch all requested medicines with a single IN (...) query"""
+    ids = set(medicine_ids)
+    if not ids:
+        return {}
+    medicines = db.query(Medicine).filter(Medicine.id.in_(ids)).all()
+    return {medicine.id: medicine for medicine in medicines}
+
+def reserve_stock(db: Session, quantities: Dict[int, int]) -> List[int]:
+    """
+    Decrements stock for every medicine in one guarded UPDATE statement.
+
+    Each row is only touched while `stock >= quantity`, so concurrent checkouts
+    can never drive stock negative. If any row fails the guard, nothing is
+    decremented and the caller gets a 409 to retry against fresh stock.
+
+    The quantities are then drawn from the medicines' stock batches, first
+    expiry first out (see `allocate_batches`).
+
+    Returns the ids of medicines this decrement took to or below their
+    low-stock threshold.
+    """
+    if not quantities:
+        return []
+
+    delta = case(quantities, value=Medicine.id)
+    stmt = (
+        update(Medicine)
+        .where(Medicine.id.in_(list(quantities)), Medicine.stock >= delta)
+        .values(stock=Medicine.stock - delta)
+        .execution_options(synchronize_session=False)
+    )
+
+    if db.get_bind().dialect.update_returning:
+        rows = db.execute(stmt.returning(Medicine.id, Medicine.stock, Medicine.low_stock_threshold)).all()
+        updated = len(rows)
+    else:
+        updated = db.execute(stmt).rowcount
+        # Our UPDATE holds the rows' write locks, so these are the values we just wrote
+        rows = db.query(Medicine.id, Medicine.stock, Medicine.low_stock_threshold).filter(
+            Medicine.id.in_(list(quantities))
+        ).all()
+
+    if updated != len(quantities):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Stock changed while processing the request, please retry"
+        )
+
+    allocate_batches(db, quantities, {medicine_id: stock for medicine_id, stock, _ in rows})
+
+    return [
+        medicine_id
+        for medicine_id, stock, threshold in rows
+        if threshold is not None and stock <= threshold < stock + quantities[medicine_id]
+    ]
+
+# ============== STOCK BATCHES ==============
+
+# A literal (not a bound parameter) so SQLite can match the batch indexes' `quantity > 0` condition
+IN_STOCK = StockBatch.quantity > literal_column("0")
+
+# Lot number for stock that was on hand before it was received as batches
+OPENING_LOT = "OPENING"
+
+def _utcnow() -> datetime:
+    # Batch expiry dates are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _fefo_batches(db: Session, medicine_ids: Iterable[int]) -> Dict[int, list]:
+    """In-stock batches per medicine, earliest expiry first and non-expiring last"""
+    batches = {}
+    for batch in db.query(
+        StockBatch.id, StockBatch.medicine_id, StockBatch.quantity, StockBatch.expiry_date
+    ).filter(StockBatch.medicine_id.in_(list(medicine_ids)), IN_STOCK).order_by(
+        StockBatch.medicine_id, StockBatch.expiry_date.asc().nulls_last(), StockBatch.id
+    ):
+        batches.setdefault(batch.medicine_id, []).append(batch)
+    return batches
+
+def _consume(batches: list, quantity: int, updates: list) -> int:
+    """Takes `quantity` from `batches` in order; returns what they could not cover"""
+    for batch in batches:
+        if not quantity:
+            break
+        taken = min(batch.quantity, quantity)
+        updates.append({"id": batch.id, "quantity": batch.quantity - taken})
+        quantity -= taken
+    return quantity
+
+def _apply(db: Session, updates: list, medicine_ids: Iterable[int]) -> None:
+    if not updates:
+        return
+    db.execute(update(StockBatch), updates)
+    if any(not row["quantity"] for row in updates):
+        refresh_expiry(db, medicine_ids)
+
+def refresh_expiry(db: Session, medicine_ids: Iterable[int]) -> None:
+    """Sets each medicine's expiry_date to its earliest in-stock batch (kept as-is when it has none)"""
+    earliest = select(func.min(StockBatch.expiry_date)).where(
+        StockBatch.medicine_id == Medicine.id, IN_STOCK
+    ).scalar_subquery()
+    db.execute(
+        update(Medicine)
+        .where(Medicine.id.in_(list(medicine_ids)))
+        .values(expiry_date=func.coalesce(earliest, Medicine.expiry_date))
+        .execution_options(synchronize_session=False)
+    )
+
+def allocate_batches(db: Session, quantities: Dict[int, int], remaining: Dict[int, int]) -> None:
+    """
+    Draws sold quantities from stock batches, first expiry first out.
+
+    Must run after `reserve_stock`'s UPDATE: the medicine rows it locked keep
+    concurrent sales of the same medicine from allocating the same batches.
+    Expired batches are never sold. Stock that no batch accounts for (stock
+    entered before batches, or edited by hand) is used after the batches;
+    when neither covers the sale, nothing is changed and the caller gets a
+    400 (expired stock not yet written off; retrying will not help).
+    `remaining` is each medicine's stock after the sale.
+    """
+    now = _utcnow()
+    batches = _fefo_batches(db, quantities)
+    updates = []
+    for medicine_id, quantity in quantities.items():
+        lots = batches.get(medicine_id, [])
+        untracked = max(0, remaining[medicine_id] + quantity - sum(lot.quantity for lot in lots))
+        sellable = [lot for lot in lots if lot.expiry_date is None or lot.expiry_date > now]
+        if _consume(sellable, quantity, updates) > untracked:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Not enough unexpired stock for medicine {medicine_id}"
+            )
+    _apply(db, updates, quantities)
+
+def trim_batches(db: Session, stock: Dict[int, int]) -> None:
+    """After manual stock decreases, writes off batches (earliest expiry first) until they fit each medicine's new stock"""
+    updates = []
+    for medicine_id, lots in _fefo_batches(db, stock).items():
+        excess = sum(lot.quantity for lot in lots) - stock[medicine_id]
+        if excess > 0:
+            _consume(lots, excess, updates)
+    _apply(db, updates, stock)
+
+def write_off_expired(db: Session) -> Dict[int, int]:
+    """
+    Empties in-stock batches past their expiry and takes their quantity off
+    the medicines' stock, so the catalogue and checkout only count stock that
+    can be sold. Returns the units written off per medicine; the caller commits.
+    """
+    written_off = defaultdict(int)
+    for batch in db.query(StockBatch.id, StockBatch.medicine_id, StockBatch.quantity).filter(
+        IN_STOCK, StockBatch.expiry_date <= _utcnow()
+    ).all():
+        # Guarded on the quantity read: a batch a sale is drawing from right now waits for the next sweep
+        if db.execute(
+            update(StockBatch)
+            .where(StockBatch.id == batch.id, StockBatch.quantity == batch.quantity)
+            .values(quantity=0)
+            .execution_options(synchronize_session=False)
+        ).rowcount:
+            written_off[batch.medicine_id] += batch.quantity
+
+    if written_off:
+        delta = case(written_off, value=Medicine.id)
+        db.execute(
+            update(Medicine)
+            .where(Medicine.id.in_(list(written_off)))
+            .values(stock=Medicine.stock - delta)
+            .execution_options(synchronize_session=False)
+        )
+        refresh_expiry(db, written_off)
+    return dict(written_off)
+
+def sweep_expired_stock() -> int:
+    """Writes off expired stock in its own transaction; returns the units written off"""
+    db = SessionLocal()
+    try:
+        written_off = write_off_expired(db)
+        db.commit()
+    finally:
+        db.close()
+
+    if written_off:
+        invalidate_catalogue()
+        logger.info("Wrote off expired stock", extra={"medicines": len(written_off), "units": sum(written_off.values())})
+    return sum(written_off.values())
+
+# Every worker sweeps; the guarded updates make concurrent sweeps write each batch off once
+expiry_sweeper = PeriodicTask(
+    "stock-expiry-sweeper", sweep_expired_stock, settings.STOCK_EXPIRY_SWEEP_INTERVAL_SECONDS, run_at_start=True
+)
+
+def receive_batch(
+    db: Session,
+    medicine: Medicine,
+    lot_number: str,
+    quantity: int,
+    expiry_date: Optional[datetime]
+) -> StockBatch:
+    """Adds a delivered lot (or more of an existing one) and the same quantity to the medicine's stock"""
+    if expiry_date is not None and expiry_date.tzinfo is not None:
+        expiry_date = expiry_date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    batch = db.query(StockBatch).filter(
+        StockBatch.medicine_id == medicine.id, StockBatch.lot_number == lot_number
+    ).first()
+    if batch is None:
+        batch = StockBatch(medicine_id=medicine.id, lot_number=lot_number, quantity=quantity, expiry_date=expiry_date)
+        db.add(batch)
+    elif batch.expiry_date != expiry_date:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Lot {lot_number} is already recorded with expiry {batch.expiry_date}"
+        )
+    else:
+        batch.quantity = StockBatch.quantity + quantity
+
+    medicine.stock = Medicine.stock + quantity
+    db.flush()
+    refresh_expiry(db, [medicine.id])
+    return batch
+
+def opening_batch(medicine: Medicine) -> StockBatch:
+    """The batch holding a new medicine's initial stock"""
+    return StockBatch(lot_number=OPENING_LOT, quantity=medicine.stock, expiry_date=medicine.expiry_date)
+
+def backfill_opening_batches(db: Session) -> int:
+    """Gives every medicine with stock but no batches an opening batch for that stock; returns how many"""
+    has_batches = select(StockBatch.id).where(StockBatch.medicine_id == Medicine.id).exists()
+    result = db.execute(
+        insert(StockBatch).from_select(
+            ["medicine_id", "lot_number", "quantity", "expiry_date", "received_at"],
+            select(Medicine.id, literal(OPENING_LOT), Medicine.stock, Medicine.expiry_date, literal(_utcnow()))
+            .where(Medicine.stock > 0, ~has_batches)
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+def expiring_batches(db: Session, days: int):
+    """In-stock batches expiring within `days` (already expired ones included), as a query ordered by the caller"""
+    return db.query(
+        StockBatch.id,
+        StockBatch.medicine_id,
+        Medicine.name.label("medicine_name"),
+        StockBatch.lot_number,
+        StockBatch.quantity,
+        StockBatch.expiry_date,
+        StockBatch.received_at
+    ).join(Medicine, Medicine.id == StockBatch.medicine_id).filter(
+        IN_STOCK, StockBatch.expiry_date < _utcnow() + timedelta(days=days)
+    )
+
+# ============== LOW-STOCK ALERTS ==============
+
+LOW_STOCK_ALERT = "low_stock_alert"
+
+def notify_low_stock(db: Session, medicine_ids: List[int]) -> None:
+    """Enqueues a low-stock alert in the caller's transaction; sent once it commits"""
+    if medicine_ids:
+        enqueue(db, LOW_STOCK_ALERT, {"medicine_ids": medicine_ids})
+
+@job_handler(LOW_STOCK_ALERT)
+def send_low_stock_alerts(db: Session, payload: dict) -> None:
+    medicines = db.query(Medicine).filter(Medicine.id.in_(payload["medicine_ids"])).order_by(Medicine.name).all()
+    # Restocked before the job ran: nothing to report
+    medicines = [medicine for medicine in medicines if medicine.stock <= (medicine.low_stock_threshold or 0)]
+    if medicines and not send_low_stock_alert(medicines):
+        raise RuntimeError("Email outbox is full")
@@ -0,0 +1,222 @@
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from sqlalchemy import event, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JobHandler = Callable[[Session, dict], None]
+
+_handlers: Dict[str, JobHandler] = {}
+
+def _utcnow() -> datetime:
+    # Job timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def job_handler(kind: str):
+    """Registers the decorated function as the handler for jobs of `kind`"""
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+def enqueue(db: Session, kind: str, payload: Optional[dict] = None, delay: float = 0) -> Job:
+    """
+    Adds a job to the caller's transaction.
+
+    The job becomes visible to the runner only if the caller commits, so side
+    effects never fire for work that was rolled back; the runner is woken as
+    soon as the commit lands.
+    """
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        status=PENDING,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        run_at=_utcnow() + timedelta(seconds=delay)
+    )
+    db.add(job)
+    event.listen(db, "after_commit", lambda session: job_runner.wake(), once=True)
+    return job
+
+class JobRunner:
+    """
+    Worker threads that claim due jobs from the `jobs` table and run them.
+
+    A job is claimed with a conditional UPDATE, so several workers (or
+    processes) never run the same job. Failures are retried with exponential
+    backoff until `max_attempts`, then marked failed. Jobs left running by a
+    crashed worker are handed out again once their lease expires.
+    """
+    def __init__(self, workers: int, poll_interval: float, lease_seconds: float, retry_backoff: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_backoff = retry_backoff
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"job-runner-{index}", daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Lets running jobs finish (within `timeout`) and stops the workers"""
+        self._stopping.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _claim(self, db: Session) -> Optional[Job]:
+        now = _utcnow()
+        stale = now - timedelta(seconds=self.lease_seconds)
+        claimable = or_(
+            (Job.status == PENDING) & (Job.run_at <= now),
+            (Job.status == RUNNING) & (Job.locked_at < stale),
+        )
+        while True:
+            candidate = db.query(Job.id).filter(claimable).order_by(Job.run_at).limit(1).scalar()
+            if candidate is None:
+                return None
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == candidate, claimable)
+                .values(status=RUNNING, locked_at=now, attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if claimed:
+                return db.get(Job, candidate)
+
+    def run_once(self) -> bool:
+        """Claims and runs one due job; returns False when none was due"""
+        db = SessionLocal()
+        try:
+            job = self._claim(db)
+            if job is None:
+                return False
+
+            handler = _handlers.get(job.kind)
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler registered for job kind {job.kind!r}")
+                handler(db, json.loads(job.payload))
+            except Exception as error:
+                db.rollback()
+                job.last_error = f"{type(error).__name__}: {error}"
+                if job.attempts >= job.max_attempts:
+                    job.status = FAILED
+                    job.finished_at = _utcnow()
+                    logger.exception("Job %s (%s) failed permanently", job.id, job.kind)
+                else:
+                    job.status = PENDING
+                    job.run_at = _utcnow() + timedelta(seconds=self.retry_backoff * 2 ** (job.attempts - 1))
+                    logger.warning("Job %s (%s) failed, retrying: %s", job.id, job.kind, error)
+            else:
+                job.status = DONE
+                job.finished_at = _utcnow()
+            job.locked_at = None
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                while not self._stopping.is_set() and self.run_once():
+                    pass
+            except Exception:
+                logger.exception("Job runner poll failed")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+class PeriodicTask:
+    """
+    Background thread that calls `task()` every `interval` seconds (and once
+    on start with `run_at_start`). Failures are logged and retried next time.
+    """
+    def __init__(self, name: str, task: Callable[[], object], interval: float, run_at_start: bool = False):
+        self.name = name
+        self.task = task
+        self.interval = interval
+        self.run_at_start = run_at_start
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        if self.run_at_start:
+            self._run_task()
+        while not self._stopping.wait(self.interval):
+            self._run_task()
+
+    def _run_task(self) -> None:
+        try:
+            self.task()
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
+
+def job_stats(db: Session) -> dict:
+    """Job counts by kind and status, plus the oldest due pending job's wait"""
+    counts = {}
+    for kind, status, count in db.query(Job.kind, Job.status, func.count(Job.id)).group_by(Job.kind, Job.status):
+        counts.setdefault(kind, {})[status] = count
+
+    oldest_due = db.query(func.min(Job.run_at)).filter(Job.status == PENDING, Job.run_at <= _utcnow()).scalar()
+    return {
+        "jobs": counts,
+        "oldest_due_seconds": round((_utcnow() - oldest_due).total_seconds(), 3) if oldest_due else 0.0,
+    }
+
+def purge_finished_jobs(db: Session, older_than_days: int) -> int:
+    """Deletes done and failed jobs that finished more than `older_than_days` ago"""
+    removed = db.query(Job).filter(
+        Job.status.in_([DONE, FAILED]),
+        Job.finished_at < _utcnow() - timedelta(days=older_than_days)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+job_runner = JobRunner(
+    workers=settings.JOB_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS
+)
@@ -0,0 +1,48 @@
+from sqlalchemy import exists, insert, select
+from sqlalchemy.orm import Session
+import json
+
+from app.models.offline_sale import OfflineSale, OfflineSaleItem
+
+BACKFILL_BATCH_SIZE = 1000
+
+def backfill_line_items(db: Session) -> int:
+    """
+    Copies the legacy `items` JSON of every sale that has no line items yet
+    into offline_sale_items, one bulk insert and commit per batch of sales.
+
+    Returns the number of sales backfilled; safe to run again.
+    """
+    backfilled = 0
+    last_id = 0
+    while True:
+        sales = db.execute(
+            select(OfflineSale.id, OfflineSale.items)
+            .where(
+                OfflineSale.id > last_id,
+                ~exists().where(OfflineSaleItem.sale_id == OfflineSale.id)
+            )
+            .order_by(OfflineSale.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not sales:
+            return backfilled
+
+        rows = [
+            {
+                "sale_id": sale_id,
+                "medicine_id": item["medicine_id"],
+                "medicine_name": item["medicine_name"],
+                "quantity": item["quantity"],
+                "price": item["price"],
+                "subtotal": item["subtotal"],
+            }
+            for sale_id, items in sales
+            for item in json.loads(items or "[]")
+        ]
+        if rows:
+            db.execute(insert(OfflineSaleItem), rows)
+        db.commit()
+
+        backfilled += len(sales)
+        last_id = sales[-1].id
@@ -0,0 +1,75 @@
+from collections import defaultdict
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.models.order import Order, OrderItem
+from app.schemas.order import OrderCreate
+from app.services.analytics_service import record_order
+from app.services.catalogue_cache import invalidate_catalogue
+from app.services.id_service import next_order_number
+from app.services.inventory_service import load_medicines, notify_low_stock, reserve_stock
+
+def place_order(db: Session, user_id: int, data: OrderCreate) -> Order:
+    """
+    Validates the whole cart against one stock query, then creates the order
+    and decrements stock for every line in a single guarded UPDATE.
+    """
+    quantities = defaultdict(int)
+    for item in data.items:
+        quantities[item.medicine_id] += item.quantity
+
+    medicines = load_medicines(db, quantities)
+
+    missing = [str(medicine_id) for medicine_id in quantities if medicine_id not in medicines]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Medicine ID {', '.join(missing)} not found")
+
+    insufficient = [
+        medicines[medicine_id].name
+        for medicine_id, quantity in quantities.items()
+        if medicines[medicine_id].stock < quantity
+    ]
+    if insufficient:
+        raise HTTPException(status_code=400, detail=f"Insufficient stock for {', '.join(insufficient)}")
+
+    # Calculate total
+    total_amount = 0
+    order_items = []
+
+    for item in data.items:
+        medicine = medicines[item.medicine_id]
+        subtotal = medicine.price * item.quantity
+        total_amount += subtotal
+
+        order_items.append(OrderItem(
+            medicine_id=medicine.id,
+            medicine_name=medicine.name,
+            quantity=item.quantity,
+            price=medicine.price,
+            subtotal=subtotal
+        ))
+
+    # Before this session writes: on SQLite the sequence's own transaction would wait on our lock
+    order_number = next_order_number()
+    low_stock = reserve_stock(db, quantities)
+
+    order = Order(
+        user_id=user_id,
+        order_number=order_number,
+        status="Placed",
+        total_amount=total_amount,
+        payment_mode=data.payment_mode,
+        payment_status="Pending",
+        shipping_address=data.shipping_address,
+        items=order_items
+    )
+
+    db.add(order)
+    db.flush()
+    record_order(db, order)
+    notify_low_stock(db, low_stock)
+    db.commit()
+    invalidate_catalogue()
+    db.refresh(order)
+
+    return order
@@ -0,0 +1,139 @@
+import abc
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.otp import OTP
+from app.services.job_service import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+def _utcnow() -> datetime:
+    # expires_at is stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class OTPStore(abc.ABC):
+    """
+    Issues and verifies one-time codes.
+
+    `verify` consumes a matching, unexpired code in one step. Each wrong guess
+    counts against the email's current code, which stops verifying after
+    `max_attempts` failures even if the right code is then supplied.
+    """
+    def __init__(self, ttl_seconds: float, max_attempts: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+
+    @abc.abstractmethod
+    def issue(self, db: Session, email: str, code: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def verify(self, db: Session, email: str, code: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def sweep(self) -> int:
+        """Removes expired codes, returning how many were removed"""
+
+class SQLOTPStore(OTPStore):
+    """Codes live in the `otps` table; expiry and attempt limits are checked in the query"""
+    def issue(self, db: Session, email: str, code: str) -> None:
+        db.query(OTP).filter(OTP.email == email).delete(synchronize_session=False)
+        db.add(OTP(
+            email=email,
+            otp=code,
+            expires_at=_utcnow() + timedelta(seconds=self.ttl_seconds),
+            attempts=0
+        ))
+        db.commit()
+
+    def verify(self, db: Session, email: str, code: str) -> bool:
+        now = _utcnow()
+        consumed = db.query(OTP).filter(
+            OTP.email == email,
+            OTP.otp == code,
+            OTP.expires_at > now,
+            OTP.attempts < self.max_attempts
+        ).delete(synchronize_session=False)
+
+        if not consumed:
+            db.query(OTP).filter(
+                OTP.email == email,
+                OTP.expires_at > now
+            ).update({OTP.attempts: OTP.attempts + 1}, synchronize_session=False)
+
+        db.commit()
+        return bool(consumed)
+
+    def sweep(self) -> int:
+        db = SessionLocal()
+        try:
+            removed = db.query(OTP).filter(OTP.expires_at <= _utcnow()).delete(synchronize_session=False)
+            db.commit()
+            return removed
+        finally:
+            db.close()
+
+class MemoryOTPStore(OTPStore):
+    """Codes live in this process only; for single-worker deployments"""
+    def __init__(self, ttl_seconds: float, max_attempts: int):
+        super().__init__(ttl_seconds, max_attempts)
+        self._codes = {}  # email -> [code, expires_at (monotonic), attempts]
+        self._lock = threading.Lock()
+
+    def issue(self, db: Session, email: str, code: str) -> None:
+        with self._lock:
+            self._codes[email] = [code, time.monotonic() + self.ttl_seconds, 0]
+
+    def verify(self, db: Session, email: str, code: str) -> bool:
+        with self._lock:
+            entry = self._codes.get(email)
+            if entry is None or entry[1] <= time.monotonic():
+                return False
+            if entry[0] == code and entry[2] < self.max_attempts:
+                del self._codes[email]
+                return True
+            entry[2] += 1
+            return False
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [email for email, entry in self._codes.items() if entry[1] <= now]
+            for email in expired:
+                del self._codes[email]
+        return len(expired)
+
+def upgrade_otp_table(engine: Engine) -> None:
+    """
+    Brings an `otps` table created before attempt counting up to date.
+
+    Codes only live for a minute, so an old-layout table is simply recreated;
+    missing indexes are added in place.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(OTP.__tablename__):
+        return
+
+    columns = {column["name"] for column in inspector.get_columns(OTP.__tablename__)}
+    if "attempts" not in columns:
+        OTP.__table__.drop(bind=engine)
+        OTP.__table__.create(bind=engine)
+        return
+
+    for index in OTP.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+def create_otp_store() -> OTPStore:
+    store_class = MemoryOTPStore if settings.OTP_BACKEND == "memory" else SQLOTPStore
+    return store_class(settings.OTP_TTL_SECONDS, settings.OTP_MAX_ATTEMPTS)
+
+otp_store = create_otp_store()
+otp_sweeper = PeriodicTask("otp-sweeper", otp_store.sweep, settings.OTP_SWEEP_INTERVAL_SECONDS)
@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.schema import CreateTable
+
+from app.core.database import Base
+# Register every model on Base.metadata before creating tables
+from app.models import appointment, doctor, id_sequence, job, medicine, offline_sale, order, otp, sales_rollup, startup_lock, user  # noqa: F401
+from app.models.startup_lock import StartupLock
+from app.services.otp_service import upgrade_otp_table
+from app.services.search_service import ensure_search_index
+from app.services.slot_service import upgrade_appointments_table
+
+_INSERT_IGNORING_CONFLICTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+def init_schema(engine: Engine) -> None:
+    """
+    Creates missing tables and indexes, upgrading older layouts first, and
+    the search index. Idempotent and cheap on an up-to-date database.
+    """
+    upgrade_otp_table(engine)
+    upgrade_appointments_table(engine)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+
+def _utcnow() -> datetime:
+    # Lock timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _try_lock(engine: Engine, name: str, lease_seconds: float) -> bool:
+    """Takes the lock if it is free, or if its holder has kept it past the lease (a crashed worker)"""
+    now = _utcnow()
+    with engine.begin() as conn:
+        insert_ignoring = _INSERT_IGNORING_CONFLICTS.get(conn.dialect.name)
+        if insert_ignoring is not None:
+            stmt = insert_ignoring(StartupLock).values(name=name, locked_at=now).on_conflict_do_nothing()
+            if conn.execute(stmt).rowcount:
+                return True
+        else:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(StartupLock).values(name=name, locked_at=now))
+                return True
+            except IntegrityError:
+                pass
+
+        return bool(conn.execute(
+            update(StartupLock)
+            .where(StartupLock.name == name, StartupLock.locked_at < now - timedelta(seconds=lease_seconds))
+            .values(locked_at=now)
+        ).rowcount)
+
+@contextmanager
+def startup_lock(engine: Engine, name: str, lease_seconds: float, poll_interval: float = 0.2) -> Iterator[None]:
+    """
+    Holds the named lock row in `startup_locks` for the duration of the block.
+
+    Workers that start together on one database take turns: the first one
+    upgrades and seeds it, the rest wait and then find it up to date. A lock
+    older than `lease_seconds` is taken over.
+    """
+    with engine.begin() as conn:
+        conn.execute(CreateTable(StartupLock.__table__, if_not_exists=True))
+
+    deadline = time.monotonic() + lease_seconds
+    while True:
+        try:
+            if _try_lock(engine, name, lease_seconds):
+                break
+        except OperationalError:
+            # SQLite: the lock holder's writes outlasted the busy timeout
+            if time.monotonic() > deadline:
+                raise
+        time.sleep(poll_interval)
+
+    try:
+        yield
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(StartupLock).where(StartupLock.name == name))
@@ -0,0 +1,154 @@
+from difflib import SequenceMatcher
+from typing import List, Optional
+from sqlalchemy import or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+import re
+
+from app.models.medicine import Medicine
+
+# Word index for ranked prefix search, trigram index for substring and typo-tolerant matching.
+# Both are external-content FTS5 tables over `medicines`, kept in sync by triggers.
+_SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS medicines_fts USING fts5(
+        name, description, manufacturer, category,
+        content='medicines', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS medicines_trgm USING fts5(
+        name, content='medicines', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS medicines_search_ai AFTER INSERT ON medicines BEGIN
+        INSERT INTO medicines_fts(rowid, name, description, manufacturer, category)
+        VALUES (new.id, new.name, new.description, new.manufacturer, new.category);
+        INSERT INTO medicines_trgm(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS medicines_search_ad AFTER DELETE ON medicines BEGIN
+        INSERT INTO medicines_fts(medicines_fts, rowid, name, description, manufacturer, category)
+        VALUES ('delete', old.id, old.name, old.description, old.manufacturer, old.category);
+        INSERT INTO medicines_trgm(medicines_trgm, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS medicines_search_au
+    AFTER UPDATE OF name, description, manufacturer, category ON medicines BEGIN
+        INSERT INTO medicines_fts(medicines_fts, rowid, name, description, manufacturer, category)
+        VALUES ('delete', old.id, old.name, old.description, old.manufacturer, old.category);
+        INSERT INTO medicines_trgm(medicines_trgm, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO medicines_fts(rowid, name, description, manufacturer, category)
+        VALUES (new.id, new.name, new.description, new.manufacturer, new.category);
+        INSERT INTO medicines_trgm(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+# bm25 column weights for medicines_fts: name, description, manufacturer, category
+_FTS_RANK = "bm25(medicines_fts, 10.0, 1.0, 2.0, 4.0)"
+_TRGM_RANK = "bm25(medicines_trgm)"
+
+# Minimum similarity between a query word and a name word for a fuzzy match
+FUZZY_THRESHOLD = 0.6
+
+def ensure_search_index(engine: Engine) -> None:
+    """Creates the FTS5 search tables and sync triggers, building them from existing rows on first run"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'medicines_fts'")
+        ).first()
+        for statement in _SEARCH_SCHEMA:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text("INSERT INTO medicines_fts(medicines_fts) VALUES ('rebuild')"))
+            conn.execute(text("INSERT INTO medicines_trgm(medicines_trgm) VALUES ('rebuild')"))
+
+def _tokens(term: str) -> List[str]:
+    return re.findall(r"\w+", term.lower())
+
+def _trigrams(token: str) -> List[str]:
+    return [token[i:i + 3] for i in range(len(token) - 2)]
+
+def _match(db: Session, table: str, rank: str, expression: str, category: Optional[str], limit: int) -> List[Medicine]:
+    sql = f"""
+        SELECT medicines.* FROM {table}
+        JOIN medicines ON medicines.id = {table}.rowid
+        WHERE {table} MATCH :expression AND medicines.stock > 0
+        {"AND medicines.category = :category" if category else ""}
+        ORDER BY {rank}
+        LIMIT :limit
+    """
+    params = {"expression": expression, "limit": limit}
+    if category:
+        params["category"] = category
+    return db.query(Medicine).from_statement(text(sql)).params(**params).all()
+
+def _is_close(tokens: List[str], name: str) -> bool:
+    words = _tokens(name)
+    return all(
+        max((SequenceMatcher(None, token, word).ratio() for word in words), default=0) >= FUZZY_THRESHOLD
+        for token in tokens
+    )
+
+def _like_search(db: Session, tokens: List[str], category: Optional[str], limit: int) -> List[Medicine]:
+    query = db.query(Medicine).filter(Medicine.stock > 0)
+    if category:
+        query = query.filter(Medicine.category == category)
+    for token in tokens:
+        pattern = f"%{token}%"
+        query = query.filter(or_(
+            Medicine.name.ilike(pattern),
+            Medicine.description.ilike(pattern),
+            Medicine.manufacturer.ilike(pattern),
+            Medicine.category.ilike(pattern)
+        ))
+    return query.order_by(Medicine.name).limit(limit).all()
+
+def search_medicines(db: Session, term: str, category: Optional[str] = None, limit: int = 20) -> List[Medicine]:
+    """
+    Ranked, in-stock medicine search over name, description, manufacturer and category.
+
+    Matches, in order of preference: every word as a prefix ("para 50"), every
+    word as a substring of the name ("cillin"), and finally names that share
+    enough trigrams with the query to be a likely typo ("paracetmol").
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return []
+
+    if db.get_bind().dialect.name != "sqlite":
+        return _like_search(db, tokens, category, limit)
+
+    # Beside other words, single characters match whole words only ("vitamin c");
+    # as prefixes they expand to a large slice of the vocabulary
+    prefix_expression = " AND ".join(
+        f'"{token}"*' if len(token) > 1 or len(tokens) == 1 else f'"{token}"'
+        for token in tokens
+    )
+    results = _match(db, "medicines_fts", _FTS_RANK, prefix_expression, category, limit)
+
+    long_tokens = [token for token in tokens if len(token) >= 3]
+    if len(results) < limit and len(long_tokens) == len(tokens):
+        seen = {medicine.id for medicine in results}
+        substring_expression = " AND ".join(f'"{token}"' for token in tokens)
+        results += [
+            medicine
+            for medicine in _match(db, "medicines_trgm", _TRGM_RANK, substring_expression, category, limit)
+            if medicine.id not in seen
+        ][:limit - len(results)]
+
+    if not results and long_tokens:
+        grams = {gram for token in long_tokens for gram in _trigrams(token)}
+        fuzzy_expression = " OR ".join(f'"{gram}"' for gram in sorted(grams))
+        candidates = _match(db, "medicines_trgm", _TRGM_RANK, fuzzy_expression, category, limit * 5)
+        results = [medicine for medicine in candidates if _is_close(long_tokens, medicine.name)][:limit]
+
+    return results
@@ -0,0 +1,597 @@
+import json
+import random
+from datetime import datetime, time, timedelta, timezone
+from typing import Dict, List
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.doctor import Doctor
+from app.models.medicine import Medicine
+from app.models.offline_sale import OfflineSale, OfflineSaleItem
+from app.models.order import Order, OrderItem
+from app.models.user import User
+from app.services.analytics_service import rebuild_rollups
+from app.services.inventory_service import backfill_opening_batches
+from app.services.slot_service import TIME_FORMAT
+
+# Rows per executemany call when generating synthetic data
+CHUNK_SIZE = 20_000
+
+SYNTHETIC_USER_EMAIL = "synthetic-user-{}@example.com"
+
+# Sample catalogue for a fresh install
+SAMPLE_MEDICINES = [
+    {
+        "name": "Paracetamol 500mg",
+        "category": "Pain Relief",
+        "description": "Effective pain reliever and fever reducer",
+        "price": 50.00,
+        "stock": 500,
+        "low_stock_threshold": 100,
+        "manufacturer": "PharmaCorp"
+    },
+    {
+        "name": "Amoxicillin 250mg",
+        "category": "Antibiotics",
+        "description": "Broad-spectrum antibiotic for bacterial infections",
+        "price": 150.00,
+        "stock": 200,
+        "low_stock_threshold": 50,
+        "manufacturer": "MediLife"
+    },
+    {
+        "name": "Cetirizine 10mg",
+        "category": "Allergy",
+        "description": "Antihistamine for allergic reactions",
+        "price": 80.00,
+        "stock": 300,
+        "low_stock_threshold": 50,
+        "manufacturer": "HealthPlus"
+    },
+    {
+        "name": "Omeprazole 20mg",
+        "category": "Digestive Health",
+        "description": "Reduces stomach acid production",
+        "price": 120.00,
+        "stock": 150,
+        "low_stock_threshold": 30,
+        "manufacturer": "GastroMed"
+    },
+    {
+        "name": "Aspirin 75mg",
+        "category": "Cardiovascular",
+        "description": "Blood thinner and pain reliever",
+        "price": 45.00,
+        "stock": 400,
+        "low_stock_threshold": 80,
+        "manufacturer": "CardioHealth"
+    },
+    {
+        "name": "Ibuprofen 400mg",
+        "category": "Pain Relief",
+        "description": "Anti-inflammatory pain reliever",
+        "price": 65.00,
+        "stock": 350,
+        "low_stock_threshold": 70,
+        "manufacturer": "PharmaCorp"
+    },
+    {
+        "name": "Vitamin C 1000mg",
+        "category": "Vitamins",
+        "description": "Immune system support",
+        "price": 200.00,
+        "stock": 250,
+        "low_stock_threshold": 50,
+        "manufacturer": "VitaLife"
+    },
+    {
+        "name": "Azithromycin 500mg",
+        "category": "Antibiotics",
+        "description": "Macrolide antibiotic for respiratory infections",
+        "price": 180.00,
+        "stock": 100,
+        "low_stock_threshold": 25,
+        "manufacturer": "MediLife"
+    },
+    {
+        "name": "Metformin 500mg",
+        "category": "Diabetes",
+        "description": "Blood sugar control medication",
+        "price": 90.00,
+        "stock": 300,
+        "low_stock_threshold": 60,
+        "manufacturer": "DiabetCare"
+    },
+    {
+        "name": "Losartan 50mg",
+        "category": "Cardiovascular",
+        "description": "Blood pressure medication",
+        "price": 110.00,
+        "stock": 200,
+        "low_stock_threshold": 40,
+        "manufacturer": "CardioHealth"
+    },
+    {
+        "name": "Cough Syrup",
+        "category": "Cold & Flu",
+        "description": "Relief from dry and wet cough",
+        "price": 95.00,
+        "stock": 180,
+        "low_stock_threshold": 35,
+        "manufacturer": "RespiCare"
+    },
+    {
+        "name": "Multivitamin Tablets",
+        "category": "Vitamins",
+        "description": "Complete daily vitamin supplement",
+        "price": 250.00,
+        "stock": 220,
+        "low_stock_threshold": 45,
+        "manufacturer": "VitaLife"
+    },
+    {
+        "name": "Calcium + Vitamin D3",
+        "category": "Vitamins",
+        "description": "Bone health supplement",
+        "price": 180.00,
+        "stock": 150,
+        "low_stock_threshold": 30,
+        "manufacturer": "BoneStrong"
+    },
+    {
+        "name": "Insulin Glargine",
+        "category": "Diabetes",
+        "description": "Long-acting insulin injection",
+        "price": 850.00,
+        "stock": 50,
+        "low_stock_threshold": 10,
+        "manufacturer": "DiabetCare"
+    },
+    {
+        "name": "Hand Sanitizer 500ml",
+        "category": "Hygiene",
+        "description": "70% alcohol-based sanitizer",
+        "price": 120.00,
+        "stock": 400,
+        "low_stock_threshold": 80,
+        "manufacturer": "HygienePro"
+    },
+    {
+        "name": "Dolo 650mg",
+        "category": "Pain Relief",
+        "description": "Fast-acting pain and fever relief",
+        "price": 55.00,
+        "stock": 600,
+        "low_stock_threshold": 120,
+        "manufacturer": "PharmaCorp"
+    },
+    {
+        "name": "Ciprofloxacin 500mg",
+        "category": "Antibiotics",
+        "description": "Fluoroquinolone antibiotic",
+        "price": 130.00,
+        "stock": 180,
+        "low_stock_threshold": 40,
+        "manufacturer": "MediLife"
+    },
+    {
+        "name": "Ranitidine 150mg",
+        "category": "Digestive Health",
+        "description": "Acid reflux treatment",
+        "price": 85.00,
+        "stock": 250,
+        "low_stock_threshold": 50,
+        "manufacturer": "GastroMed"
+    },
+    {
+        "name": "Atorvastatin 10mg",
+        "category": "Cardiovascular",
+        "description": "Cholesterol-lowering medication",
+        "price": 160.00,
+        "stock": 170,
+        "low_stock_threshold": 35,
+        "manufacturer": "CardioHealth"
+    },
+    {
+        "name": "Diclofenac Gel",
+        "category": "Pain Relief",
+        "description": "Topical pain relief for joints",
+        "price": 140.00,
+        "stock": 200,
+        "low_stock_threshold": 40,
+        "manufacturer": "PharmaCorp"
+    },
+    {
+        "name": "Vitamin B Complex",
+        "category": "Vitamins",
+        "description": "Complete B vitamin supplement",
+        "price": 170.00,
+        "stock": 190,
+        "low_stock_threshold": 38,
+        "manufacturer": "VitaLife"
+    },
+    {
+        "name": "Doxycycline 100mg",
+        "category": "Antibiotics",
+        "description": "Tetracycline antibiotic",
+        "price": 140.00,
+        "stock": 160,
+        "low_stock_threshold": 32,
+        "manufacturer": "MediLife"
+    },
+    {
+        "name": "Pantoprazole 40mg",
+        "category": "Digestive Health",
+        "description": "Proton pump inhibitor",
+        "price": 135.00,
+        "stock": 210,
+        "low_stock_threshold": 42,
+        "manufacturer": "GastroMed"
+    },
+    {
+        "name": "Amlodipine 5mg",
+        "category": "Cardiovascular",
+        "description": "Calcium channel blocker for hypertension",
+        "price": 95.00,
+        "stock": 280,
+        "low_stock_threshold": 56,
+        "manufacturer": "CardioHealth"
+    },
+    {
+        "name": "Montelukast 10mg",
+        "category": "Allergy",
+        "description": "Asthma and allergy relief",
+        "price": 190.00,
+        "stock": 140,
+        "low_stock_threshold": 28,
+        "manufacturer": "HealthPlus"
+    },
+    {
+        "name": "Glimepiride 2mg",
+        "category": "Diabetes",
+        "description": "Oral diabetes medication",
+        "price": 105.00,
+        "stock": 220,
+        "low_stock_threshold": 44,
+        "manufacturer": "DiabetCare"
+    },
+    {
+        "name": "Clopidogrel 75mg",
+        "category": "Cardiovascular",
+        "description": "Antiplatelet medication",
+        "price": 175.00,
+        "stock": 130,
+        "low_stock_threshold": 26,
+        "manufacturer": "CardioHealth"
+    },
+    {
+        "name": "Paracetamol Suspension",
+        "category": "Pain Relief",
+        "description": "Liquid pain relief for children",
+        "price": 75.00,
+        "stock": 320,
+        "low_stock_threshold": 64,
+        "manufacturer": "PharmaCorp"
+    },
+    {
+        "name": "Levofloxacin 500mg",
+        "category": "Antibiotics",
+        "description": "Broad-spectrum fluoroquinolone",
+        "price": 195.00,
+        "stock": 110,
+        "low_stock_threshold": 22,
+        "manufacturer": "MediLife"
+    },
+    {
+        "name": "Zinc Supplement",
+        "category": "Vitamins",
+        "description": "Immune system and wound healing",
+        "price": 145.00,
+        "stock": 185,
+        "low_stock_threshold": 37,
+        "manufacturer": "VitaLife"
+    },
+    {
+        "name": "Hydrocortisone Cream",
+        "category": "Skin Care",
+        "description": "Anti-inflammatory topical cream",
+        "price": 125.00,
+        "stock": 160,
+        "low_stock_threshold": 32,
+        "manufacturer": "DermaCare"
+    },
+    {
+        "name": "Salbutamol Inhaler",
+        "category": "Respiratory",
+        "description": "Bronchodilator for asthma",
+        "price": 280.00,
+        "stock": 90,
+        "low_stock_threshold": 18,
+        "manufacturer": "RespiCare"
+    },
+    {
+        "name": "Eye Drops Refresh",
+        "category": "Eye Care",
+        "description": "Lubricating eye drops",
+        "price": 155.00,
+        "stock": 140,
+        "low_stock_threshold": 28,
+        "manufacturer": "VisionCare"
+    }
+]
+
+SAMPLE_DOCTORS = [
+    {
+        "name": "Dr. Rajesh Kumar",
+        "specialization": "General Physician",
+        "available_days": "Mon,Tue,Wed,Thu,Fri",
+        "available_time": "9:00 AM - 5:00 PM",
+        "phone": "9876543210",
+        "email": "rajesh.kumar@clinic.com"
+    },
+    {
+        "name": "Dr. Priya Sharma",
+        "specialization": "Cardiologist",
+        "available_days": "Mon,Wed,Fri",
+        "available_time": "10:00 AM - 4:00 PM",
+        "phone": "9876543211",
+        "email": "priya.sharma@cardio.com"
+    },
+    {
+        "name": "Dr. Amit Patel",
+        "specialization": "Dermatologist",
+        "available_days": "Tue,Thu,Sat",
+        "available_time": "11:00 AM - 6:00 PM",
+        "phone": "9876543212",
+        "email": "amit.patel@skin.com"
+    },
+    {
+        "name": "Dr. Sneha Gupta",
+        "specialization": "Pediatrician",
+        "available_days": "Mon,Tue,Thu,Fri",
+        "available_time": "9:00 AM - 3:00 PM",
+        "phone": "9876543213",
+        "email": "sneha.gupta@kids.com"
+    },
+    {
+        "name": "Dr. Vikram Singh",
+        "specialization": "Orthopedic",
+        "available_days": "Wed,Fri,Sat",
+        "available_time": "10:00 AM - 5:00 PM",
+        "phone": "9876543214",
+        "email": "vikram.singh@bones.com"
+    }
+]
+
+# ============== SAMPLE DATA ==============
+
+def seed_sample_data(db: Session) -> Dict[str, int]:
+    """
+    Adds the sample medicines and doctors to whichever of the two tables is
+    empty, in one transaction. Returns how many of each were added; adds
+    nothing on later runs.
+    """
+    has_medicines, has_doctors = db.execute(
+        select(select(Medicine.id).exists(), select(Doctor.id).exists())
+    ).one()
+    added = {"medicines": 0, "doctors": 0}
+    if not has_medicines:
+        db.execute(insert(Medicine), SAMPLE_MEDICINES)
+        added["medicines"] = len(SAMPLE_MEDICINES)
+    if not has_doctors:
+        db.execute(insert(Doctor), SAMPLE_DOCTORS)
+        added["doctors"] = len(SAMPLE_DOCTORS)
+
+    if added["medicines"]:
+        backfill_opening_batches(db)  # commits
+    else:
+        db.commit()
+    return added
+
+# ============== SYNTHETIC DATA ==============
+
+COMMON_NAMES = [
+    "Paracetamol", "Amoxicillin", "Cetirizine", "Omeprazole", "Aspirin", "Ibuprofen", "Vitamin C",
+    "Azithromycin", "Metformin", "Losartan", "Insulin", "Ciprofloxacin", "Atorvastatin", "Zinc",
+]
+# Synthetic brand names: 24 * 24 * 12 distinct stems, so selectivity resembles a real catalogue
+NAME_PREFIXES = ["Al", "Bex", "Cor", "Dex", "Ery", "Fen", "Glu", "Hyd", "Ib", "Lev", "Mon", "Neo",
+                 "Ox", "Pra", "Quin", "Ram", "Sul", "Tri", "Ur", "Val", "Xan", "Zor", "Kel", "Jov"]
+NAME_ROOTS = ["bexa", "cila", "dro", "fla", "geno", "lina", "mazo", "nida", "pira", "rova", "sarta", "tami",
+              "vola", "xeti", "zapi", "lota", "mepa", "noxa", "pento", "quila", "ribo", "semi", "tolu", "vira"]
+NAME_SUFFIXES = ["mol", "cin", "pril", "statin", "zole", "mab", "pine", "dine", "fen", "lol", "tide", "vir"]
+FORMS = ["Tablets", "Syrup", "Gel", "Capsules", "Drops", "Cream", "Injection", "Suspension"]
+CATEGORIES = ["Pain Relief", "Antibiotics", "Allergy", "Digestive Health", "Cardiovascular", "Vitamins",
+              "Diabetes", "Cold & Flu", "Skin Care", "Respiratory", "Eye Care", "Hygiene"]
+MANUFACTURERS = ["PharmaCorp", "MediLife", "HealthPlus", "GastroMed", "CardioHealth", "VitaLife"] + [
+    f"{prefix}{root.capitalize()} Labs" for prefix in NAME_PREFIXES[:10] for root in NAME_ROOTS[:10]
+]
+SPECIALIZATIONS = ["General Physician", "Cardiologist", "Dermatologist", "Orthopedic", "Pediatrician", "ENT"]
+SCHEDULES = [("Mon,Tue,Wed,Thu,Fri", "9:00 AM - 5:00 PM"), ("Mon,Wed,Fri", "10:00 AM - 4:00 PM"),
+             ("Tue,Thu,Sat", "11:00 AM - 6:00 PM"), ("Mon-Sat", "9:00 AM - 1:00 PM")]
+# Weighted like a live store: mostly delivered, a few cancelled
+ORDER_STATUSES = ["Delivered"] * 12 + ["Placed"] * 3 + ["Packed", "Shipped", "Shipped", "Cancelled", "Cancelled"]
+APPOINTMENT_STATUSES = ["Pending", "Pending", "Approved", "Approved", "Approved", "Completed", "Rejected"]
+# Appointment slots generated per doctor per day, 30 minutes apart from 9:00 AM
+SLOTS_PER_DAY = 16
+
+def synthetic_medicines(count: int, rng: random.Random) -> List[dict]:
+    """Catalogue rows with realistic name selectivity for search"""
+    def name():
+        if rng.random() < 0.05:
+            return rng.choice(COMMON_NAMES)
+        return rng.choice(NAME_PREFIXES) + rng.choice(NAME_ROOTS) + rng.choice(NAME_SUFFIXES)
+
+    return [
+        {
+            "name": f"{name()} {rng.choice([5, 10, 20, 250, 500, 650, 1000])}mg {rng.choice(FORMS)}",
+            "category": rng.choice(CATEGORIES),
+            "description": f"{rng.choice(FORMS)} for everyday use",
+            "price": round(rng.uniform(10, 900), 2),
+            "stock": rng.randint(0, 500),
+            "low_stock_threshold": 10,
+            "manufacturer": rng.choice(MANUFACTURERS),
+        }
+        for _ in range(count)
+    ]
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _next_id(db: Session, model) -> int:
+    return (db.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+def _insert(db: Session, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.execute(model.__table__.insert(), rows[start:start + CHUNK_SIZE])
+
+def _line_items(rng: random.Random, medicines: list, max_quantity: int) -> List[dict]:
+    lines = []
+    for medicine_id, name, price in rng.sample(medicines, min(len(medicines), rng.randint(1, 3))):
+        quantity = rng.randint(1, max_quantity)
+        lines.append({"medicine_id": medicine_id, "medicine_name": name, "quantity": quantity,
+                      "price": price, "subtotal": price * quantity})
+    return lines
+
+def _orders(db: Session, rng: random.Random, count: int, user_ids: list, medicines: list, now: datetime) -> None:
+    order_id, item_id = _next_id(db, Order), _next_id(db, OrderItem)
+    # Built and inserted a chunk at a time so a million orders never sit in memory at once
+    for start in range(0, count, CHUNK_SIZE):
+        orders, items = [], []
+        for _ in range(min(CHUNK_SIZE, count - start)):
+            created = now - timedelta(seconds=rng.randint(0, 365 * 86400))
+            lines = _line_items(rng, medicines, 4)
+            for line in lines:
+                items.append({"id": item_id, "order_id": order_id, **line})
+                item_id += 1
+            orders.append({
+                "id": order_id,
+                "user_id": rng.choice(user_ids),
+                "order_number": f"SYN-{order_id:08d}",
+                "status": rng.choice(ORDER_STATUSES),
+                "total_amount": round(sum(line["subtotal"] for line in lines), 2),
+                "payment_mode": rng.choice(["UPI", "COD"]),
+                "payment_status": rng.choice(["Success", "Pending"]),
+                "shipping_address": f"{rng.randint(1, 999)} Synthetic Street",
+                "created_at": created,
+                "updated_at": created,
+            })
+            order_id += 1
+        db.execute(Order.__table__.insert(), orders)
+        db.execute(OrderItem.__table__.insert(), items)
+
+def _offline_sales(db: Session, rng: random.Random, count: int, medicines: list, now: datetime) -> None:
+    sale_id = _next_id(db, OfflineSale)
+    for start in range(0, count, CHUNK_SIZE):
+        sales, items = [], []
+        for _ in range(min(CHUNK_SIZE, count - start)):
+            lines = _line_items(rng, medicines, 3)
+            subtotal = sum(line["subtotal"] for line in lines)
+            sales.append({
+                "id": sale_id, "invoice_number": f"SYN-INV-{sale_id:08d}", "customer_name": "Walk-in",
+                "items": json.dumps(lines), "subtotal": subtotal, "tax": subtotal * 0.05,
+                "total_amount": subtotal * 1.05, "payment_mode": rng.choice(["Cash", "Card", "UPI"]),
+                "created_at": now - timedelta(seconds=rng.randint(0, 365 * 86400)),
+            })
+            items.extend({"sale_id": sale_id, **line} for line in lines)
+            sale_id += 1
+        db.execute(OfflineSale.__table__.insert(), sales)
+        db.execute(OfflineSaleItem.__table__.insert(), items)
+
+def _appointments(db: Session, rng: random.Random, count: int, user_ids: list, doctors: list, now: datetime) -> None:
+    # Walk (doctor, day, slot) combinations from a day no booking uses yet, so no two share a slot
+    latest = db.execute(select(func.max(Appointment.appointment_date))).scalar()
+    first_day = (now - timedelta(days=30)).date()
+    if latest is not None:
+        first_day = max(first_day, latest.date() + timedelta(days=1))
+
+    rows = []
+    for index in range(count):
+        doctor_id, name, specialization = doctors[index % len(doctors)]
+        day, slot = divmod(index // len(doctors), SLOTS_PER_DAY)
+        start = datetime.combine(first_day + timedelta(days=day), time(9, 0)) + timedelta(minutes=30 * slot)
+        rows.append({
+            "user_id": rng.choice(user_ids), "doctor_id": doctor_id, "doctor_name": name,
+            "specialization": specialization, "appointment_date": start,
+            "appointment_time": start.strftime(TIME_FORMAT), "status": rng.choice(APPOINTMENT_STATUSES),
+            "created_at": now, "updated_at": now,
+        })
+    _insert(db, Appointment, rows)
+
+def generate_synthetic(
+    db: Session,
+    medicines: int = 0,
+    users: int = 0,
+    doctors: int = 0,
+    orders: int = 0,
+    appointments: int = 0,
+    offline_sales: int = 0,
+    seed: int = 1
+) -> Dict[str, int]:
+    """
+    Bulk-inserts synthetic data for performance testing. Orders, sales and
+    appointments reference the medicines, users and doctors created in the
+    same call, or the existing ones when none are requested. Rebuilds the
+    sales rollups and opening stock batches afterwards, since the bulk
+    inserts bypass both. Deterministic for a given seed on an empty database.
+
+    Returns the number of rows created per table.
+    """
+    rng = random.Random(seed)
+    now = _utcnow()
+
+    if medicines:
+        first = _next_id(db, Medicine)
+        _insert(db, Medicine, synthetic_medicines(medicines, rng))
+    medicine_pool = []
+    if orders or offline_sales:
+        query = select(Medicine.id, Medicine.name, Medicine.price)
+        medicine_pool = db.execute(query.where(Medicine.id >= first) if medicines else query).all()
+
+    user_ids = []
+    if users:
+        first_user = _next_id(db, User)
+        user_ids = list(range(first_user, first_user + users))
+        _insert(db, User, [
+            {"id": user_id, "email": SYNTHETIC_USER_EMAIL.format(user_id), "role": "user", "is_active": True, "created_at": now}
+            for user_id in user_ids
+        ])
+    elif orders or appointments:
+        user_ids = db.execute(select(User.id).where(User.role == "user")).scalars().all()
+
+    if doctors:
+        first_doctor = _next_id(db, Doctor)
+        _insert(db, Doctor, [
+            {"id": doctor_id, "name": f"Dr. Synthetic {doctor_id}",
+             "specialization": SPECIALIZATIONS[doctor_id % len(SPECIALIZATIONS)],
+             "available_days": SCHEDULES[doctor_id % len(SCHEDULES)][0],
+             "available_time": SCHEDULES[doctor_id % len(SCHEDULES)][1]}
+            for doctor_id in range(first_doctor, first_doctor + doctors)
+        ])
+    doctor_pool = []
+    if appointments:
+        query = select(Doctor.id, Doctor.name, Doctor.specialization)
+        doctor_pool = db.execute(query.where(Doctor.id >= first_doctor) if doctors else query).all()
+
+    if (orders or offline_sales) and not medicine_pool:
+        raise ValueError("Orders and sales need medicines: add some or generate them in the same run")
+    if (orders or appointments) and not user_ids:
+        raise ValueError("Orders and appointments need users: add some or generate them in the same run")
+    if appointments and not doctor_pool:
+        raise ValueError("Appointments need doctors: add some or generate them in the same run")
+
+    if orders:
+        _orders(db, rng, orders, user_ids, medicine_pool, now)
+    if offline_sales:
+        _offline_sales(db, rng, offline_sales, medicine_pool, now)
+    if appointments:
+        _appointments(db, rng, appointments, user_ids, doctor_pool, now)
+
+    backfill_opening_batches(db)  # commits
+    if orders or offline_sales:
+        rebuild_rollups(db)
+    return {
+        "medicines": medicines, "users": users, "doctors": doctors,
+        "orders": orders, "appointments": appointments, "offline_sales": offline_sales,
+    }
@@ -0,0 +1,196 @@
+import logging
+import re
+from datetime import date, datetime, time, timedelta
+from typing import FrozenSet, List, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.appointment import Appointment, FREES_SLOT
+from app.models.doctor import Doctor
+
+logger = logging.getLogger(__name__)
+
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_HOURS = re.compile(r"^\s*(.+?)\s*(?:-|–|to)\s*(.+?)\s*$", re.IGNORECASE)
+_DAY_RANGE = re.compile(r"\s*(?:-|–|\bto\b)\s*", re.IGNORECASE)
+
+CLINIC_TZ = ZoneInfo(settings.CLINIC_TIMEZONE)
+
+# Display format of Appointment.appointment_time, e.g. "09:30 AM"
+TIME_FORMAT = "%I:%M %p"
+
+class Schedule(NamedTuple):
+    weekdays: FrozenSet[int]  # 0 = Monday
+    start: time
+    end: time
+
+class DoctorAvailability(NamedTuple):
+    name: str
+    specialization: str
+    schedule: Optional[Schedule]  # None when the doctor's hours cannot be parsed
+
+def clinic_now() -> datetime:
+    """The clinic's current wall-clock time, naive like slot times"""
+    return datetime.now(CLINIC_TZ).replace(tzinfo=None)
+
+def _weekday(name: str) -> int:
+    """"Mon", "Tues" or "Monday" -> 0-6"""
+    name = name.strip().lower().rstrip(".")
+    for number, weekday in enumerate(_WEEKDAYS):
+        if len(name) >= 3 and weekday.startswith(name):
+            return number
+    raise ValueError(f"Unrecognised day: {name!r}")
+
+def parse_days(available_days: str) -> FrozenSet[int]:
+    """"Mon,Wed,Fri", "Mon-Fri" or "Monday to Friday" -> weekday numbers"""
+    days = set()
+    for part in available_days.replace(";", ",").split(","):
+        if not part.strip():
+            continue
+        bounds = _DAY_RANGE.split(part.strip())
+        if len(bounds) > 2:
+            raise ValueError(f"Unrecognised days: {part.strip()!r}")
+        day = _weekday(bounds[0])
+        stop = _weekday(bounds[-1])
+        days.add(day)
+        while day != stop:  # ranges may wrap around the week, e.g. "Sat-Mon"
+            day = (day + 1) % 7
+            days.add(day)
+    if not days:
+        raise ValueError(f"No days in {available_days!r}")
+    return frozenset(days)
+
+def parse_time(value: str) -> time:
+    """"9:00 AM", "09:00 AM", "5 PM" or "17:00" -> time"""
+    value = " ".join(value.upper().replace(".", "").split())
+    for pattern in ("%I:%M %p", "%I %p", "%I:%M%p", "%I%p", "%H:%M"):
+        try:
+            return datetime.strptime(value, pattern).time()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised time: {value!r}")
+
+def parse_schedule(available_days: str, available_time: str) -> Schedule:
+    """Parses a doctor's free-text availability, e.g. ("Mon,Tue,Wed", "9:00 AM - 5:00 PM")"""
+    match = _HOURS.match(available_time or "")
+    if not match:
+        raise ValueError(f"Unrecognised hours: {available_time!r}")
+    return Schedule(parse_days(available_days or ""), parse_time(match.group(1)), parse_time(match.group(2)))
+
+def day_slots(schedule: Schedule, day: date) -> List[datetime]:
+    """Start times of every slot the schedule offers on `day`"""
+    if day.weekday() not in schedule.weekdays:
+        return []
+    step = timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES)
+    slot, end = datetime.combine(day, schedule.start), datetime.combine(day, schedule.end)
+    slots = []
+    while slot + step <= end:
+        slots.append(slot)
+        slot += step
+    return slots
+
+class AvailabilityIndex:
+    """
+    Per-process cache of parsed doctor schedules and of each doctor's booked
+    slots per day, so listing slots costs no queries when warm.
+
+    It is only a read-side index: the unique (doctor_id, appointment_date)
+    index on appointments is what prevents double booking, so another
+    worker's bookings appearing here up to `ttl` seconds late is harmless.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self.schedules = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.booked = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def doctor(self, db: Session, doctor_id: int) -> DoctorAvailability:
+        """404 for an unknown doctor"""
+        entry = self.schedules.get(doctor_id)
+        if entry is None:
+            doctor = db.query(Doctor).filter(Doctor.id == doctor_id).first()
+            if not doctor:
+                raise HTTPException(status_code=404, detail="Doctor not found")
+            try:
+                schedule = parse_schedule(doctor.available_days, doctor.available_time)
+            except ValueError as error:
+                logger.warning(
+                    "Doctor %s cannot be booked: %s", doctor_id, error,
+                    extra={"available_days": doctor.available_days, "available_time": doctor.available_time}
+                )
+                schedule = None
+            entry = DoctorAvailability(doctor.name, doctor.specialization, schedule)
+            self.schedules.set(doctor_id, entry)
+        return entry
+
+    def booked_slots(self, db: Session, doctor_id: int, day: date) -> FrozenSet[datetime]:
+        key = (doctor_id, day)
+        booked = self.booked.get(key)
+        if booked is None:
+            generation = self.booked.generation
+            start = datetime.combine(day, time.min)
+            booked = frozenset(
+                slot for slot, in db.query(Appointment.appointment_date).filter(
+                    Appointment.doctor_id == doctor_id,
+                    Appointment.appointment_date >= start,
+                    Appointment.appointment_date < start + timedelta(days=1),
+                    Appointment.status.notin_(FREES_SLOT)
+                )
+            )
+            self.booked.set(key, booked, generation)
+        return booked
+
+    def slots(self, db: Session, doctor_id: int, day: date) -> List[dict]:
+        schedule = self.doctor(db, doctor_id).schedule
+        if schedule is None:
+            return []
+        booked = self.booked_slots(db, doctor_id, day)
+        now = clinic_now()
+        return [
+            {"start": slot, "time": slot.strftime(TIME_FORMAT), "available": slot not in booked and slot > now}
+            for slot in day_slots(schedule, day)
+        ]
+
+    def slot_for(self, db: Session, doctor_id: int, day: date, appointment_time: str) -> datetime:
+        """The slot starting at `appointment_time` on `day`; 400 if the doctor does not offer it"""
+        schedule = self.doctor(db, doctor_id).schedule
+        try:
+            slot = datetime.combine(day, parse_time(appointment_time))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid appointment time: {appointment_time}")
+        if schedule is None or slot not in day_slots(schedule, day):
+            raise HTTPException(status_code=400, detail="The doctor is not available at that time")
+        if slot <= clinic_now():
+            raise HTTPException(status_code=400, detail="That slot has already passed")
+        return slot
+
+    def changed(self, doctor_id: Optional[int], slot: datetime) -> None:
+        """Call after committing a booking or a status change that frees or takes a slot"""
+        if doctor_id is not None:
+            self.booked.discard((doctor_id, slot.date()))
+
+availability = AvailabilityIndex(
+    maxsize=settings.AVAILABILITY_CACHE_SIZE,
+    ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS
+)
+
+def upgrade_appointments_table(engine: Engine) -> None:
+    """
+    Adds `doctor_id` and the no-double-booking index to an `appointments`
+    table created before slots existed. Earlier bookings keep a NULL doctor_id
+    and are not checked for conflicts.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(Appointment.__tablename__):
+        return
+
+    columns = {column["name"] for column in inspector.get_columns(Appointment.__tablename__)}
+    if "doctor_id" not in columns:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE appointments ADD COLUMN doctor_id INTEGER REFERENCES doctors (id)"))
+
+    for index in Appointment.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
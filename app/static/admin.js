@@ -63,7 +63,7 @@ document.getElementById('logout-btn').addEventListener('click', (e) => {
 });
 
 // ============== API HELPER ==============
-async function apiCall(endpoint, method = 'GET', body = null) {
+async function apiCall(endpoint, method = 'GET', body = null, onResponse = null) {
     const options = {
         method,
         headers: {
@@ -91,6 +91,7 @@ async function apiCall(endpoint, method = 'GET', body = null) {
             throw new Error(data.detail || 'API request failed');
         }
         
+        if (onResponse) onResponse(response);
         return data;
     } catch (error) {
         console.error('API Error:', error);
@@ -99,6 +100,34 @@ async function apiCall(endpoint, method = 'GET', body = null) {
     }
 }
 
+// List endpoints return one page at a time; the next page's cursor is in X-Next-Cursor
+const PAGE_SIZE = 100;
+
+async function apiCallPage(endpoint, cursor = null, limit = PAGE_SIZE) {
+    const url = new URL(endpoint, API_BASE);
+    url.searchParams.set('limit', limit);
+    if (cursor) url.searchParams.set('cursor', cursor);
+    
+    let nextCursor = null;
+    const items = await apiCall(url.pathname + url.search, 'GET', null, response => {
+        nextCursor = response.headers.get('X-Next-Cursor');
+    });
+    return items && { items, nextCursor };
+}
+
+// Every page of a list; only for lists bounded by the catalogue size
+async function apiCallAll(endpoint) {
+    const items = [];
+    let cursor = null;
+    do {
+        const page = await apiCallPage(endpoint, cursor, 500);
+        if (!page) return null;
+        items.push(...page.items);
+        cursor = page.nextCursor;
+    } while (cursor);
+    return items;
+}
+
 // ============== LOAD DASHBOARD STATS ==============
 async function loadDashboardStats() {
     const stats = await apiCall('/admin/analytics/dashboard');
@@ -134,7 +163,7 @@ function loadSectionData(sectionId) {
 
 // ============== OFFLINE SALES & BILLING ==============
 async function loadMedicinesForBilling() {
-    allMedicines = await apiCall('/admin/medicines');
+    allMedicines = await apiCallAll('/admin/medicines');
     if (allMedicines) {
         const select = document.getElementById('medicine-select');
         select.innerHTML = '<option value="">Select Medicine</option>';
@@ -371,7 +400,9 @@ function printBill(saleId) {
 }
 
 // ============== APPOINTMENTS ==============
-async function loadAppointments() {
+let appointmentsCursor = null;
+
+async function loadAppointments(more = false) {
     const status = document.getElementById('appointment-status-filter').value;
     const date = document.getElementById('appointment-date-filter').value;
     
@@ -379,15 +410,27 @@ async function loadAppointments() {
     if (status) endpoint += `status=${status}&`;
     if (date) endpoint += `date=${date}&`;
     
-    const appointments = await apiCall(endpoint);
+    const page = await apiCallPage(endpoint, more ? appointmentsCursor : null);
+    const appointments = page ? page.items : [];
     const tbody = document.getElementById('appointments-body');
+    appointmentsCursor = page ? page.nextCursor : null;
+    document.getElementById('appointments-more').hidden = !appointmentsCursor;
     
-    if (!appointments || appointments.length === 0) {
+    if (more) {
+        tbody.insertAdjacentHTML('beforeend', renderAppointmentRows(appointments));
+        return;
+    }
+    
+    if (appointments.length === 0) {
         tbody.innerHTML = '<tr class="empty-state"><td colspan="7">No appointments found</td></tr>';
         return;
     }
     
-    tbody.innerHTML = appointments.map(apt => {
+    tbody.innerHTML = renderAppointmentRows(appointments);
+}
+
+function renderAppointmentRows(appointments) {
+    return appointments.map(apt => {
         const date = new Date(apt.appointment_date).toLocaleDateString();
         const statusBadge = `badge-${apt.status.toLowerCase()}`;
         
@@ -421,24 +464,39 @@ async function updateAppointmentStatus(id, status) {
     }
 }
 
-document.getElementById('appointment-status-filter').addEventListener('change', loadAppointments);
-document.getElementById('appointment-date-filter').addEventListener('change', loadAppointments);
+document.getElementById('appointment-status-filter').addEventListener('change', () => loadAppointments());
+document.getElementById('appointment-date-filter').addEventListener('change', () => loadAppointments());
+document.getElementById('appointments-more').addEventListener('click', () => loadAppointments(true));
 
 // ============== ORDERS ==============
-async function loadOrders() {
+let ordersCursor = null;
+
+async function loadOrders(more = false) {
     const status = document.getElementById('order-status-filter').value;
     let endpoint = '/admin/orders';
     if (status) endpoint += `?status=${status}`;
     
-    const orders = await apiCall(endpoint);
+    const page = await apiCallPage(endpoint, more ? ordersCursor : null);
+    const orders = page ? page.items : [];
     const tbody = document.getElementById('orders-body');
+    ordersCursor = page ? page.nextCursor : null;
+    document.getElementById('orders-more').hidden = !ordersCursor;
     
-    if (!orders || orders.length === 0) {
+    if (more) {
+        tbody.insertAdjacentHTML('beforeend', renderOrderRows(orders));
+        return;
+    }
+    
+    if (orders.length === 0) {
         tbody.innerHTML = '<tr class="empty-state"><td colspan="8">No orders found</td></tr>';
         return;
     }
     
-    tbody.innerHTML = orders.map(order => {
+    tbody.innerHTML = renderOrderRows(orders);
+}
+
+function renderOrderRows(orders) {
+    return orders.map(order => {
         const date = new Date(order.created_at).toLocaleDateString();
         const statusBadge = `badge-${order.status.toLowerCase()}`;
         
@@ -479,7 +537,8 @@ async function updateOrderStatus(id, status) {
     }
 }
 
-document.getElementById('order-status-filter').addEventListener('change', loadOrders);
+document.getElementById('order-status-filter').addEventListener('change', () => loadOrders());
+document.getElementById('orders-more').addEventListener('click', () => loadOrders(true));
 
 // ============== INVENTORY ==============
 let filteredMedicines = [];
@@ -488,7 +547,7 @@ async function loadInventory(lowStockOnly = false) {
     let endpoint = '/admin/medicines';
     if (lowStockOnly) endpoint += '?low_stock=true';
     
-    const medicines = await apiCall(endpoint);
+    const medicines = await apiCallAll(endpoint);
     allMedicines = medicines || [];
     filteredMedicines = allMedicines;
     renderInventory();
@@ -593,8 +652,7 @@ async function editMedicine(id) {
     const medicine = allMedicines.find(m => m.id === id);
     if (!medicine) {
         // Fetch if not in memory
-        const med = await apiCall(`/admin/medicines`);
-        const found = med.find(m => m.id === id);
+        const found = await apiCall(`/user/medicines/${id}`);
         if (found) {
             populateMedicineForm(found);
         }
@@ -47,7 +47,7 @@ document.getElementById('logout-link').addEventListener('click', (e) => {
 });
 
 // API Helper
-async function apiCall(endpoint, method = 'GET', body = null) {
+async function apiCall(endpoint, method = 'GET', body = null, onResponse = null) {
     const options = {
         method,
         headers: {
@@ -75,6 +75,7 @@ async function apiCall(endpoint, method = 'GET', body = null) {
             throw new Error(data.detail || 'API request failed');
         }
         
+        if (onResponse) onResponse(response);
         return data;
     } catch (error) {
         console.error('API Error:', error);
@@ -83,6 +84,22 @@ async function apiCall(endpoint, method = 'GET', body = null) {
     }
 }
 
+// Every page of a list, following the cursor in X-Next-Cursor
+async function apiCallAll(endpoint) {
+    const items = [];
+    let cursor = null;
+    do {
+        const page = cursor ? `${endpoint}?cursor=${encodeURIComponent(cursor)}` : endpoint;
+        cursor = null;
+        const data = await apiCall(page, 'GET', null, response => {
+            cursor = response.headers.get('X-Next-Cursor');
+        });
+        if (!data) return null;
+        items.push(...data);
+    } while (cursor);
+    return items;
+}
+
 // Load doctors
 let doctors = [];
 
@@ -99,7 +116,7 @@ async function loadDoctors() {
 
 // Load appointments
 async function loadAppointments() {
-    const appointments = await apiCall('/user/appointments');
+    const appointments = await apiCallAll('/user/appointments');
     const container = document.getElementById('appointments-list');
     
     if (!appointments || appointments.length === 0) {
@@ -149,6 +166,27 @@ const dateInput = document.getElementById('appointment-date');
 const today = new Date().toISOString().split('T')[0];
 dateInput.min = today;
 
+// Offer only the selected doctor's free slots for the selected day
+const timeSelect = document.getElementById('appointment-time');
+
+async function loadSlots() {
+    const doctorId = document.getElementById('doctor-select').value;
+    const day = dateInput.value;
+    if (!doctorId || !day) {
+        timeSelect.innerHTML = '<option value="">Select doctor and date first</option>';
+        return;
+    }
+    
+    const data = await apiCall(`/user/doctors/${doctorId}/slots?date=${day}`);
+    const slots = data ? data.slots.filter(slot => slot.available) : [];
+    timeSelect.innerHTML = slots.length
+        ? slots.map(slot => `<option value="${slot.time}">${slot.time}</option>`).join('')
+        : '<option value="">No free slots on this day</option>';
+}
+
+document.getElementById('doctor-select').addEventListener('change', loadSlots);
+dateInput.addEventListener('change', loadSlots);
+
 // Appointment form
 document.getElementById('appointment-form').addEventListener('submit', async (e) => {
     e.preventDefault();
@@ -163,6 +201,7 @@ document.getElementById('appointment-form').addEventListener('submit', async (e)
     const notes = document.getElementById('appointment-notes').value;
     
     const appointmentData = {
+        doctor_id: Number(doctorSelect.value),
         doctor_name: doctorName,
         specialization: specialization,
         appointment_date: new Date(appointmentDate).toISOString(),
@@ -176,6 +215,7 @@ document.getElementById('appointment-form').addEventListener('submit', async (e)
         showToast('Appointment booked successfully! Waiting for admin approval.', 'success', 'Appointment Booked');
         appointmentModal.classList.remove('active');
         document.getElementById('appointment-form').reset();
+        loadSlots();
         loadAppointments();
     }
 });
@@ -79,8 +79,11 @@ document.getElementById('logout-link').addEventListener('click', (e) => {
     window.location.href = '/static/login.html';
 });
 
+// Network failures are retried this many times, but only for requests with an idempotency key
+const MAX_RETRIES = 2;
+
 // API Helper
-async function apiCall(endpoint, method = 'GET', body = null) {
+async function apiCall(endpoint, method = 'GET', body = null, idempotencyKey = null) {
     const options = {
         method,
         headers: {
@@ -93,8 +96,13 @@ async function apiCall(endpoint, method = 'GET', body = null) {
         options.body = JSON.stringify(body);
     }
     
+    if (idempotencyKey) {
+        // The server answers a retry with the first attempt's result instead of repeating it
+        options.headers['Idempotency-Key'] = idempotencyKey;
+    }
+    
     try {
-        const response = await fetch(`${API_BASE}${endpoint}`, options);
+        const response = await fetchWithRetry(`${API_BASE}${endpoint}`, options, idempotencyKey ? MAX_RETRIES : 0);
         
         if (response.status === 401) {
             localStorage.clear();
@@ -116,6 +124,30 @@ async function apiCall(endpoint, method = 'GET', body = null) {
     }
 }
 
+async function fetchWithRetry(url, options, retries) {
+    for (let attempt = 0; ; attempt++) {
+        try {
+            return await fetch(url, options);
+        } catch (error) {
+            if (attempt >= retries) throw error;
+            await new Promise(resolve => setTimeout(resolve, 500 * 2 ** attempt));
+        }
+    }
+}
+
+// One key per distinct checkout: resubmitting the same cart reuses it, changing the cart starts a new one
+let checkoutKey = null;
+let checkoutPayload = null;
+
+function idempotencyKeyFor(payload) {
+    const serialized = JSON.stringify(payload);
+    if (serialized !== checkoutPayload) {
+        checkoutPayload = serialized;
+        checkoutKey = crypto.randomUUID();
+    }
+    return checkoutKey;
+}
+
 // Render cart
 function renderCart() {
     const container = document.getElementById('cart-items');
@@ -220,13 +252,13 @@ document.getElementById('checkout-form').addEventListener('submit', async (e) =>
     };
     
     // Create order
-    const order = await apiCall('/user/orders', 'POST', orderData);
+    const order = await apiCall('/user/orders', 'POST', orderData, idempotencyKeyFor(orderData));
     
     if (!order) return;
     
     // Process payment if UPI
     if (paymentMode === 'UPI') {
-        const paymentResult = await apiCall(`/user/orders/${order.id}/payment`, 'POST', { payment_mode: 'UPI' });
+        const paymentResult = await apiCall(`/user/orders/${order.id}/payment?payment_mode=UPI`, 'POST', null, crypto.randomUUID());
         
         if (paymentResult) {
             if (paymentResult.success) {
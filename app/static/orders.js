@@ -29,7 +29,7 @@ document.getElementById('logout-link').addEventListener('click', (e) => {
 });
 
 // API Helper
-async function apiCall(endpoint, method = 'GET', body = null) {
+async function apiCall(endpoint, method = 'GET', body = null, onResponse = null) {
     const options = {
         method,
         headers: {
@@ -57,6 +57,7 @@ async function apiCall(endpoint, method = 'GET', body = null) {
             throw new Error(data.detail || 'API request failed');
         }
         
+        if (onResponse) onResponse(response);
         return data;
     } catch (error) {
         console.error('API Error:', error);
@@ -65,9 +66,25 @@ async function apiCall(endpoint, method = 'GET', body = null) {
     }
 }
 
+// Every page of a list, following the cursor in X-Next-Cursor
+async function apiCallAll(endpoint) {
+    const items = [];
+    let cursor = null;
+    do {
+        const page = cursor ? `${endpoint}?cursor=${encodeURIComponent(cursor)}` : endpoint;
+        cursor = null;
+        const data = await apiCall(page, 'GET', null, response => {
+            cursor = response.headers.get('X-Next-Cursor');
+        });
+        if (!data) return null;
+        items.push(...data);
+    } while (cursor);
+    return items;
+}
+
 // Load orders
 async function loadOrders() {
-    const orders = await apiCall('/user/orders');
+    const orders = await apiCallAll('/user/orders');
     const container = document.getElementById('orders-list');
     
     if (!orders || orders.length === 0) {
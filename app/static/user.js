@@ -87,7 +87,7 @@ document.getElementById('logout-link').addEventListener('click', (e) => {
 });
 
 // API Helper
-async function apiCall(endpoint, method = 'GET', body = null, requireAuth = true) {
+async function apiCall(endpoint, method = 'GET', body = null, requireAuth = true, onResponse = null) {
     const options = {
         method,
         headers: {
@@ -118,6 +118,7 @@ async function apiCall(endpoint, method = 'GET', body = null, requireAuth = true
             throw new Error(data.detail || 'API request failed');
         }
         
+        if (onResponse) onResponse(response);
         return data;
     } catch (error) {
         console.error('API Error:', error);
@@ -126,19 +127,39 @@ async function apiCall(endpoint, method = 'GET', body = null, requireAuth = true
     }
 }
 
-// Load medicines
+// Load medicines, one page at a time; the next page's cursor is in X-Next-Cursor
 let allMedicines = [];
+let medicinesEndpoint = '/user/medicines?';
+let medicinesCursor = null;
 
 async function loadMedicines(category = '', search = '') {
     let endpoint = '/user/medicines?';
-    if (category) endpoint += `category=${category}&`;
-    if (search) endpoint += `search=${search}&`;
+    if (category) endpoint += `category=${encodeURIComponent(category)}&`;
+    if (search) endpoint += `search=${encodeURIComponent(search)}&`;
     
-    const medicines = await apiCall(endpoint, 'GET', null, false);
-    allMedicines = medicines || [];
+    medicinesEndpoint = endpoint;
+    allMedicines = await loadMedicinesPage(endpoint);
     renderMedicines();
 }
 
+async function loadMoreMedicines() {
+    allMedicines = allMedicines.concat(await loadMedicinesPage(medicinesEndpoint, medicinesCursor));
+    renderMedicines();
+}
+
+async function loadMedicinesPage(endpoint, cursor = null) {
+    let nextCursor = null;
+    const page = cursor ? `${endpoint}cursor=${encodeURIComponent(cursor)}&` : endpoint;
+    const medicines = await apiCall(page, 'GET', null, false, response => {
+        nextCursor = response.headers.get('X-Next-Cursor');
+    });
+    medicinesCursor = nextCursor;
+    document.getElementById('medicines-more').hidden = !medicinesCursor;
+    return medicines || [];
+}
+
+document.getElementById('medicines-more').addEventListener('click', loadMoreMedicines);
+
 function renderMedicines() {
     const grid = document.getElementById('medicines-grid');
     
@@ -216,10 +237,13 @@ async function loadCategories() {
 }
 
 // Search and filter
+// Debounced so search-as-you-type sends one request per pause, not one per keystroke
+let searchTimer = null;
 document.getElementById('search-input').addEventListener('input', (e) => {
     const search = e.target.value;
     const category = document.getElementById('category-filter').value;
-    loadMedicines(category, search);
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => loadMedicines(category, search), 150);
 });
 
 document.getElementById('category-filter').addEventListener('change', (e) => {
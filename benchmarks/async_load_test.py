@@ -0,0 +1,139 @@
+"""
+Compares the sync and async (ASYNC_DB=true) request paths under concurrent load.
+
+Usage:
+    python benchmarks/async_load_test.py [--concurrency 64] [--duration 15] [--workers 1]
+
+For each mode it seeds a throwaway SQLite database, starts uvicorn on a free
+port, drives a mixed storefront workload over HTTP and reports req/s, p50 and
+p99 latency.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEARCH_TERMS = ["para", "vita", "cillin", "pharmacorp", "cardio", "zinc", "cough", "insulin"]
+USER_EMAIL = "loadtest@example.com"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def prepare_database(env) -> str:
+    """Creates and seeds the database, returns a bearer token for a regular user"""
+    for script in ("create_table.py", "seed_data.py"):
+        subprocess.run([sys.executable, script], cwd=ROOT, env=env, check=True, capture_output=True)
+    code = (
+        "from app.core.database import SessionLocal\n"
+        "from app.models.user import User\n"
+        "from app.core.security import create_access_token\n"
+        "db = SessionLocal()\n"
+        f"user = User(email='{USER_EMAIL}', role='user'); db.add(user); db.commit()\n"
+        "print(create_access_token({'sub': user.email, 'role': user.role}))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True, capture_output=True, text=True)
+    return result.stdout.strip().splitlines()[-1]
+
+def pick_request(rng, token):
+    roll = rng.random()
+    auth = {"Authorization": f"Bearer {token}"}
+    if roll < 0.35:
+        return "GET", "/user/medicines", {"params": {"search": rng.choice(SEARCH_TERMS)}}
+    if roll < 0.55:
+        return "GET", f"/user/medicines/{rng.randint(1, 33)}", {}
+    if roll < 0.65:
+        return "GET", "/user/medicines", {"params": {"limit": 20}}
+    if roll < 0.90:
+        return "GET", "/user/orders", {"headers": auth, "params": {"limit": 20}}
+    if roll < 0.97:
+        return "GET", "/user/appointments", {"headers": auth}
+    body = {
+        "items": [{"medicine_id": rng.randint(1, 33), "quantity": 1}],
+        "shipping_address": "Load test street",
+        "payment_mode": "COD",
+    }
+    return "POST", "/user/orders", {"headers": auth, "json": body}
+
+async def drive(base_url, token, concurrency, duration):
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            while time.perf_counter() < deadline:
+                method, path, options = pick_request(rng, token)
+                start = time.perf_counter()
+                response = await client.request(method, path, **options)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 500:
+                    errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+def run_mode(async_db, args):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/loadtest.db",
+        ASYNC_DB="true" if async_db else "false",
+        SECRET_KEY="load-test-secret",
+    )
+    token = prepare_database(env)
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(base_url + "/", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        return asyncio.run(drive(base_url, token, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'requests':>10}{'req/s':>10}{'p50':>10}{'p99':>10}{'5xx':>6}")
+    for async_db in (False, True):
+        result = run_mode(async_db, args)
+        print(
+            f"{'async' if async_db else 'sync':<8}{result['requests']:>10}{result['rps']:>10.1f}"
+            f"{result['p50_ms']:>8.1f}ms{result['p99_ms']:>8.1f}ms{result['errors']:>6}"
+        )
+
+if __name__ == "__main__":
+    main()
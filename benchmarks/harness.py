@@ -0,0 +1,440 @@
+"""
+Load-test harness for the storefront and admin APIs, with stored baselines.
+
+Usage (after `pip install -r requirements-dev.txt`):
+    python benchmarks/harness.py run [--scale small] [--mode asgi|uvicorn] [--workload mixed]
+                                     [--concurrency 32] [--duration 20] [--output FILE] [--compare BASELINE]
+    python benchmarks/harness.py compare BASELINE RESULTS [--threshold 15]
+
+`run` drives a weighted mix of scenarios against a copy of a synthetic
+dataset (see dataset.py; generated on first use and cached under
+benchmarks/.data) and reports, per scenario, req/s, p50/p95/p99 latency and
+SQL queries per request. `--mode asgi` calls the app in-process through
+httpx's ASGI transport, so it measures the app without the network;
+`--mode uvicorn` starts a real server and goes over HTTP.
+
+Queries per request come from the app's /metrics, which labels by route
+template, so scenarios that share a route (browse, category and search all
+hit GET /user/medicines) share that figure. With `--workers` above 1 it is
+one worker's view.
+
+Save a run with `--output benchmarks/baselines/<name>.json` and check later
+runs with `--compare` (or the `compare` command). It flags a regression
+when total req/s drops, or a scenario's p50 or p95 rises, by more than
+`--threshold` percent, or when a scenario makes more queries per request.
+The exit status is 1 on any regression. Baselines are only comparable on
+the same machine, scale, dataset version, mode and workload; on a shared or busy host,
+raise the threshold or lengthen `--duration`.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, NamedTuple, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from dataset import ADMIN_EMAIL, DATASET_VERSION, SCALES  # noqa: E402
+from search_benchmark import QUERIES  # noqa: E402
+
+SECRET_KEY = "benchmark-secret"
+METRICS_TOKEN = "benchmark-metrics"
+METRICS_AUTH = {"Authorization": f"Bearer {METRICS_TOKEN}"}
+# Distinct shoppers the clients act as
+SHOPPERS = 200
+# Fewest requests a scenario needs, in both runs, for its latency to be compared
+MIN_SAMPLES = 100
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    route: str  # route template, as labelled in /metrics
+    build: Callable  # (rng, context) -> (path, request options)
+
+class Context(NamedTuple):
+    shoppers: list  # (user id, auth headers)
+    admin: dict
+    medicines: int
+    categories: list
+    stocked: list  # (id, name, price) of medicines with plenty of stock
+    doctors: list  # (id, Schedule)
+
+def _shopper(rng, ctx):
+    return rng.choice(ctx.shoppers)[1]
+
+def _order_body(rng, ctx):
+    return {
+        "items": [{"medicine_id": medicine_id, "quantity": 1} for medicine_id, _, _ in rng.sample(ctx.stocked, rng.randint(1, 2))],
+        "shipping_address": "Benchmark street",
+        "payment_mode": rng.choice(["UPI", "COD"]),
+    }
+
+def _sale_body(rng, ctx):
+    medicine_id, name, price = rng.choice(ctx.stocked)
+    return {
+        "items": [{"medicine_id": medicine_id, "medicine_name": name, "quantity": 1, "price": price, "subtotal": price}],
+        "payment_mode": rng.choice(["Cash", "Card", "UPI"]),
+    }
+
+def _booking_body(rng, ctx):
+    from app.services.slot_service import day_slots
+
+    doctor_id, schedule = rng.choice(ctx.doctors)
+    slots = []
+    while not slots:  # a day the doctor works, past the generated bookings
+        slots = day_slots(schedule, date.today() + timedelta(days=rng.randint(60, 720)))
+    slot = rng.choice(slots)
+    return {"doctor_id": doctor_id, "appointment_date": slot.date().isoformat(), "appointment_time": slot.strftime("%I:%M %p")}
+
+STOREFRONT = [
+    (20, Scenario("browse", "GET", "/user/medicines", lambda rng, ctx: ("/user/medicines", {"params": {"limit": 20}}))),
+    (10, Scenario("category", "GET", "/user/medicines", lambda rng, ctx: (
+        "/user/medicines", {"params": {"category": rng.choice(ctx.categories), "limit": 20}}))),
+    (20, Scenario("search", "GET", "/user/medicines", lambda rng, ctx: (
+        "/user/medicines", {"params": {"search": rng.choice(QUERIES), "limit": 20}}))),
+    (15, Scenario("detail", "GET", "/user/medicines/{medicine_id}", lambda rng, ctx: (
+        f"/user/medicines/{rng.randint(1, ctx.medicines)}", {}))),
+    (12, Scenario("my_orders", "GET", "/user/orders", lambda rng, ctx: (
+        "/user/orders", {"headers": _shopper(rng, ctx), "params": {"limit": 20}}))),
+    (5, Scenario("place_order", "POST", "/user/orders", lambda rng, ctx: (
+        "/user/orders", {"headers": _shopper(rng, ctx), "json": _order_body(rng, ctx)}))),
+    (8, Scenario("doctor_slots", "GET", "/user/doctors/{doctor_id}/slots", lambda rng, ctx: (
+        f"/user/doctors/{rng.choice(ctx.doctors)[0]}/slots",
+        {"params": {"date": (date.today() + timedelta(days=rng.randint(0, 14))).isoformat()}}))),
+    (5, Scenario("my_appointments", "GET", "/user/appointments", lambda rng, ctx: (
+        "/user/appointments", {"headers": _shopper(rng, ctx)}))),
+    (2, Scenario("book_appointment", "POST", "/user/appointments", lambda rng, ctx: (
+        "/user/appointments", {"headers": _shopper(rng, ctx), "json": _booking_body(rng, ctx)}))),
+]
+
+ADMIN = [
+    (20, Scenario("admin_orders", "GET", "/admin/orders", lambda rng, ctx: (
+        "/admin/orders", {"headers": ctx.admin, "params": {"limit": 50, **rng.choice([{}, {"status": "Placed"}])}}))),
+    (15, Scenario("admin_medicines", "GET", "/admin/medicines", lambda rng, ctx: (
+        "/admin/medicines", {"headers": ctx.admin, "params": {"limit": 50}}))),
+    (15, Scenario("sales_analytics", "GET", "/admin/analytics/sales", lambda rng, ctx: (
+        "/admin/analytics/sales", {"headers": ctx.admin, "params": {"period": rng.choice(["daily", "weekly", "monthly"])}}))),
+    (10, Scenario("dashboard", "GET", "/admin/analytics/dashboard", lambda rng, ctx: (
+        "/admin/analytics/dashboard", {"headers": ctx.admin}))),
+    (10, Scenario("expiring_batches", "GET", "/admin/batches/expiring", lambda rng, ctx: (
+        "/admin/batches/expiring", {"headers": ctx.admin, "params": {"days": 90, "limit": 50}}))),
+    (10, Scenario("admin_appointments", "GET", "/admin/appointments", lambda rng, ctx: (
+        "/admin/appointments", {"headers": ctx.admin, "params": {"limit": 50}}))),
+    (5, Scenario("offline_sale", "POST", "/admin/offline-sales", lambda rng, ctx: (
+        "/admin/offline-sales", {"headers": ctx.admin, "json": _sale_body(rng, ctx)}))),
+]
+
+# Shoppers far outnumber staff
+WORKLOADS = {
+    "storefront": STOREFRONT,
+    "admin": ADMIN,
+    "mixed": STOREFRONT + [(weight // 5 or 1, scenario) for weight, scenario in ADMIN],
+}
+
+# ============== SETUP ==============
+
+def dataset_path(scale: str) -> str:
+    """The cached dataset for `scale`, generated on first use"""
+    path = os.path.join(HERE, ".data", f"{scale}-v{DATASET_VERSION}.db")
+    if not os.path.exists(path):
+        print(f"Generating the {scale} dataset (cached at {path})...", flush=True)
+        subprocess.run([sys.executable, os.path.join(HERE, "dataset.py"), "--scale", scale, "--db", path], cwd=ROOT, check=True)
+    return path
+
+def configure(database: str) -> dict:
+    """Environment for the app under test; applied to this process too, before the app is imported"""
+    env = {
+        "DATABASE_URL": f"sqlite:///{database}",
+        "SECRET_KEY": SECRET_KEY,
+        "RATE_LIMIT_ENABLED": "false",
+        "EMAIL_TRANSPORT": "memory",
+        "METRICS_ENABLED": "true",
+        "METRICS_TOKEN": METRICS_TOKEN,
+        "LOG_LEVEL": "WARNING",
+        "ADMIN_EMAIL": ADMIN_EMAIL,
+    }
+    os.environ.update(env)
+    return dict(os.environ)
+
+def load_context(database: str, scale: str) -> Context:
+    from app.core.security import create_access_token
+    from app.services.slot_service import parse_schedule
+
+    def auth(user_id, email, role):
+        return {"Authorization": f"Bearer {create_access_token({'sub': email, 'uid': user_id, 'role': role})}"}
+
+    conn = sqlite3.connect(database)
+    try:
+        shoppers = conn.execute("SELECT id, email FROM users WHERE role = 'user' ORDER BY id LIMIT ?", (SHOPPERS,)).fetchall()
+        categories = [category for category, in conn.execute("SELECT DISTINCT category FROM medicines ORDER BY category")]
+        stocked = conn.execute("SELECT id, name, price FROM medicines WHERE stock >= 250 ORDER BY id LIMIT 500").fetchall()
+        doctors = conn.execute("SELECT id, available_days, available_time FROM doctors ORDER BY id").fetchall()
+        admin_id, = conn.execute("SELECT id FROM users WHERE email = ?", (ADMIN_EMAIL,)).fetchone()
+    finally:
+        conn.close()
+
+    return Context(
+        shoppers=[(user_id, auth(user_id, email, "user")) for user_id, email in shoppers],
+        admin=auth(admin_id, ADMIN_EMAIL, "admin"),
+        medicines=SCALES[scale]["medicines"],
+        categories=categories,
+        stocked=stocked,
+        doctors=[(doctor_id, parse_schedule(days, hours)) for doctor_id, days, hours in doctors],
+    )
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# ============== LOAD ==============
+
+async def drive(client: httpx.AsyncClient, workload, ctx: Context, concurrency: int, duration: float, warmup: float) -> dict:
+    weights, scenarios = zip(*workload)
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+
+    async def worker(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            scenario = rng.choices(scenarios, weights)[0]
+            path, options = scenario.build(rng, ctx)
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, path, **options)
+                status = f"{response.status_code // 100}xx"
+            except httpx.TransportError:
+                status = "error"
+            if start >= measure_from:
+                samples[scenario.name].append(time.perf_counter() - start)
+                statuses[scenario.name][status] += 1
+
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    return {"samples": samples, "statuses": statuses, "elapsed": time.perf_counter() - measure_from}
+
+def queries_per_request(text: str) -> Dict[tuple, float]:
+    """(method, route) -> mean SQL statements per request, from a /metrics scrape"""
+    totals = defaultdict(dict)
+    for kind, method, route, value in re.findall(
+        r'^http_request_db_queries_(sum|count)\{method="([^"]*)",route="([^"]*)"\} (\S+)$', text, re.MULTILINE
+    ):
+        totals[(method, route)][kind] = float(value)
+    return {key: pair["sum"] / pair["count"] for key, pair in totals.items() if pair.get("count")}
+
+def run_asgi(workload, ctx, args) -> tuple:
+    from app.main import app
+
+    async def main():
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                result = await drive(client, workload, ctx, args.concurrency, args.duration, args.warmup)
+                return result, (await client.get("/metrics", headers=METRICS_AUTH)).text
+
+    return asyncio.run(main())
+
+def run_uvicorn(workload, ctx, args, env) -> tuple:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(200):
+            try:
+                httpx.get(base_url + "/", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+
+        async def main():
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+                result = await drive(client, workload, ctx, args.concurrency, args.duration, args.warmup)
+                return result, (await client.get("/metrics", headers=METRICS_AUTH)).text
+
+        return asyncio.run(main())
+    finally:
+        server.terminate()
+        server.wait()
+
+def percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarise(workload, result: dict, metrics_text: str) -> dict:
+    queries = queries_per_request(metrics_text)
+    elapsed = result["elapsed"]
+    scenarios = {}
+    for _, scenario in workload:
+        latencies = sorted(result["samples"].get(scenario.name, []))
+        if not latencies:
+            continue
+        qpr = queries.get((scenario.method, scenario.route))
+        scenarios[scenario.name] = {
+            "endpoint": f"{scenario.method} {scenario.route}",
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+            "queries_per_request": round(qpr, 2) if qpr is not None else None,
+            "statuses": dict(sorted(result["statuses"][scenario.name].items())),
+        }
+    total = sum(entry["requests"] for entry in scenarios.values())
+    return {"total": {"requests": total, "rps": round(total / elapsed, 2)}, "scenarios": scenarios}
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(report: dict) -> None:
+    meta = report["meta"]
+    print(f"\n{meta['workload']} workload, {meta['mode']} mode, {meta['scale']} dataset, "
+          f"concurrency {meta['concurrency']}, {meta['duration']}s\n")
+    print(f"{'scenario':<20}{'endpoint':<36}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}  statuses")
+    for name, entry in report["scenarios"].items():
+        qpr = entry["queries_per_request"]
+        statuses = " ".join(f"{status}:{count}" for status, count in entry["statuses"].items())
+        print(f"{name:<20}{entry['endpoint']:<36}{entry['requests']:>9}{entry['rps']:>9.1f}{entry['p50_ms']:>9.1f}"
+              f"{entry['p95_ms']:>9.1f}{entry['p99_ms']:>9.1f}{'-' if qpr is None else format(qpr, '.1f'):>9}  {statuses}")
+    print(f"{'total':<56}{report['total']['requests']:>9}{report['total']['rps']:>9.1f}")
+
+def run(args) -> int:
+    source = dataset_path(args.scale)
+    workdir = tempfile.mkdtemp(prefix="pharmacy-bench-")
+    database = os.path.join(workdir, "bench.db")
+    shutil.copyfile(source, database)  # every run starts from the same data
+    env = configure(database)
+    workload = WORKLOADS[args.workload]
+    ctx = load_context(database, args.scale)
+
+    try:
+        if args.mode == "asgi":
+            result, metrics_text = run_asgi(workload, ctx, args)
+        else:
+            result, metrics_text = run_uvicorn(workload, ctx, args, env)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "mode": args.mode, "workload": args.workload, "scale": args.scale,
+            "concurrency": args.concurrency, "duration": args.duration,
+            "dataset_version": DATASET_VERSION,
+            "workers": args.workers if args.mode == "uvicorn" else None,
+            "revision": git_revision(), "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version, "machine": platform.node(),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        **summarise(workload, result, metrics_text),
+    }
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            return compare(json.load(f), report, args.threshold)
+    return 0
+
+# ============== COMPARE ==============
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Prints changes against the baseline; returns 1 if anything regressed"""
+    for key in ("mode", "workload", "scale", "dataset_version", "concurrency"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"warning: baseline {key} is {baseline['meta'].get(key)!r}, this run is {current['meta'].get(key)!r}")
+
+    def change(new, old):
+        return new / old - 1 if old else 0.0
+
+    limit = threshold / 100
+    regressions = 0
+    print(f"\n{'scenario':<20}{'p50 ms':>22}{'p95 ms':>22}{'queries':>16}")
+    for name, base in baseline["scenarios"].items():
+        new = current["scenarios"].get(name)
+        if new is None:
+            print(f"{name:<20}  missing from this run")
+            continue
+        problems = []
+        p50_change, p95_change = change(new["p50_ms"], base["p50_ms"]), change(new["p95_ms"], base["p95_ms"])
+        # Percentiles of a handful of requests are mostly noise
+        if min(base["requests"], new["requests"]) >= MIN_SAMPLES:
+            problems += [label for label, delta in (("p50", p50_change), ("p95", p95_change)) if delta > limit]
+        base_qpr, new_qpr = base.get("queries_per_request"), new.get("queries_per_request")
+        # Query counts barely vary between runs, so any real increase counts
+        if base_qpr is not None and new_qpr is not None and new_qpr > base_qpr + 0.5:
+            problems.append("queries")
+        regressions += bool(problems)
+        qpr = f"{base_qpr}->{new_qpr}" if base_qpr is not None else "-"
+        verdict = "REGRESSION: " + ", ".join(problems) if problems else "ok"
+        if not problems and min(base["requests"], new["requests"]) < MIN_SAMPLES:
+            verdict = "ok (too few requests to judge latency)"
+        print(f"{name:<20}{base['p50_ms']:>11.1f}{p50_change * 100:>+10.1f}%{base['p95_ms']:>11.1f}{p95_change * 100:>+10.1f}%"
+              f"{qpr:>16}  {verdict}")
+
+    rps_change = change(current["total"]["rps"], baseline["total"]["rps"])
+    total_regressed = rps_change < -limit
+    regressions += total_regressed
+    print(f"{'total req/s':<20}{baseline['total']['rps']:>11.1f}{rps_change * 100:>+10.1f}%"
+          f"{'  REGRESSION' if total_regressed else ''}")
+
+    print(f"\n{regressions} regression(s) beyond {threshold:g}%" if regressions else f"\nNo regressions beyond {threshold:g}%")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Drive a workload and report per-scenario results")
+    run_parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    run_parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    run_parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--duration", type=float, default=20, help="Measured seconds, after the warm-up")
+    run_parser.add_argument("--warmup", type=float, default=3)
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (uvicorn mode)")
+    run_parser.add_argument("--output", help="Write the results as JSON, e.g. to store a baseline")
+    run_parser.add_argument("--compare", metavar="BASELINE", help="Compare against a stored baseline")
+    run_parser.add_argument("--threshold", type=float, default=15, help="Allowed change in percent")
+
+    compare_parser = commands.add_parser("compare", help="Compare two stored results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("--threshold", type=float, default=15, help="Allowed change in percent")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        sys.exit(run(args))
+    with open(args.baseline) as f, open(args.results) as g:
+        sys.exit(compare(json.load(f), json.load(g), args.threshold))
+
+if __name__ == "__main__":
+    main()
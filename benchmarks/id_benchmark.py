@@ -0,0 +1,70 @@
+"""
+Order/invoice number throughput: hi-lo block allocation from id_sequences.
+
+Usage:
+    python benchmarks/id_benchmark.py [--ids 50000] [--threads 8] [--processes 4]
+
+Each process and thread draws from the same sequence, as uvicorn workers would;
+every value is checked for uniqueness. Throughput excludes process start-up.
+Builds a throwaway SQLite database.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def draw(block_size, count, threads):
+    from app.services.id_service import HiLoSequence
+
+    sequence = HiLoSequence("benchmark", block_size)
+    sequence.bind.connect().close()  # open the pool before timing
+    values = []
+    per_thread = count // threads
+    start = time.perf_counter()
+
+    def worker():
+        local = [sequence.next() for _ in range(per_thread)]
+        values.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return values, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ids", type=int, default=50_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/id_bench.db"
+
+    from app.core.database import Base, engine
+    from app.models.id_sequence import IdSequence
+
+    Base.metadata.create_all(bind=engine, tables=[IdSequence.__table__])
+    engine.dispose()
+
+    per_process = args.ids // args.processes
+    print(f"{args.processes} processes x {args.threads} threads, {args.ids:,} ids per run\n")
+    print(f"{'block size':>10}{'ids/s':>14}{'round trips':>13}  unique")
+    context = multiprocessing.get_context("spawn")
+    for block_size in (1, 10, 100, 1000):
+        with context.Pool(args.processes) as pool:
+            results = pool.starmap(draw, [(block_size, per_process, args.threads)] * args.processes)
+        elapsed = max(seconds for _, seconds in results)
+        values = [value for result, _ in results for value in result]
+        unique = len(set(values)) == len(values)
+        round_trips = sum(-(-len(result) // block_size) for result, _ in results)
+        print(f"{block_size:>10}{len(values) / elapsed:>14,.0f}{round_trips:>13,}  {'yes' if unique else 'NO'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Overhead of the metrics middleware and SQL timing hooks on the catalogue routes.
+
+Usage:
+    python benchmarks/metrics_benchmark.py [--skus 5000] [--requests 2000] [--rounds 5]
+
+Requests go straight to the ASGI app in-process (no network), which makes the
+relative overhead look as large as it can get. Rounds alternate between the
+plain app and the instrumented one; the median round is reported. Catalogue
+routes are measured both served from the response cache and hitting SQLite.
+Builds a throwaway SQLite database.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUTES = [
+    "/user/medicines?limit=50",
+    "/user/medicines?category=Vitamins&limit=50",
+    "/user/medicines?search=para&limit=20",
+]
+
+CATEGORIES = ["Pain Relief", "Antibiotics", "Allergy", "Digestive Health", "Cardiovascular", "Vitamins"]
+
+def build_catalogue(skus):
+    from sqlalchemy import insert
+    from app.core.database import Base, SessionLocal, engine
+    from app.models.medicine import Medicine
+    from app.services.search_service import ensure_search_index
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    rng = random.Random(42)
+    db = SessionLocal()
+    db.execute(insert(Medicine), [
+        {
+            "name": f"{rng.choice(['Para', 'Amoxi', 'Ceti', 'Ome', 'Ibu'])}{index} {rng.choice(['Tablets', 'Syrup'])}",
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(1, 50), 2),
+            "stock": rng.randint(0, 500),
+        }
+        for index in range(skus)
+    ])
+    db.commit()
+    db.close()
+
+async def run(app, requests):
+    import httpx
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for route in ROUTES:  # warm up caches and connections
+            await client.get(route)
+        start = time.perf_counter()
+        for index in range(requests):
+            response = await client.get(ROUTES[index % len(ROUTES)])
+            assert response.status_code == 200, response.text
+        return (time.perf_counter() - start) / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skus", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/metrics_bench.db"
+    os.environ["METRICS_ENABLED"] = "false"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["EMAIL_TRANSPORT"] = "memory"
+
+    build_catalogue(args.skus)
+
+    from app.core.metrics import MetricsMiddleware, install_query_hooks, remove_query_hooks
+    from app.main import app
+    from app.services.catalogue_cache import catalogue_cache
+
+    instrumented = MetricsMiddleware(app)
+    cache_ttl = catalogue_cache.ttl
+
+    print(f"{args.skus:,} medicines, {args.requests:,} requests per round, {args.rounds} rounds\n")
+    print(f"{'catalogue cache':<16}{'plain µs/req':>14}{'metrics µs/req':>16}{'overhead':>10}")
+    for label, ttl in (("hit", cache_ttl), ("off", 0)):
+        catalogue_cache.ttl = ttl
+        plain, measured = [], []
+        for _ in range(args.rounds):
+            remove_query_hooks()
+            plain.append(asyncio.run(run(app, args.requests)))
+            install_query_hooks()
+            measured.append(asyncio.run(run(instrumented, args.requests)))
+        remove_query_hooks()
+
+        base, with_metrics = statistics.median(plain), statistics.median(measured)
+        print(f"{label:<16}{base * 1e6:>14.1f}{with_metrics * 1e6:>16.1f}{(with_metrics / base - 1) * 100:>9.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Catalogue search latency at scale: indexed FTS5 search vs the old LIKE '%term%' filter.
+
+Usage:
+    python benchmarks/search_benchmark.py [--skus 100000] [--runs 50]
+
+Builds a throwaway SQLite database, so it never touches pharmacy.db.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERIES = ["para", "amoxicillin", "cillin", "vitamin c", "paracetmol", "pharmacorp", "cardio", "500mg", "zorbexa", "qqq"]
+
+def build_catalogue(engine, skus):
+    from sqlalchemy import insert
+    from app.models.medicine import Medicine
+    from app.services.seed_service import synthetic_medicines
+
+    with engine.begin() as conn:
+        conn.execute(insert(Medicine), synthetic_medicines(skus, random.Random(42)))
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/search_bench.db"
+
+    from app.core.database import Base, SessionLocal, engine
+    from app.models.medicine import Medicine
+    from app.services.search_service import ensure_search_index, search_medicines
+
+    Base.metadata.create_all(bind=engine, tables=[Medicine.__table__])
+    ensure_search_index(engine)
+
+    start = time.perf_counter()
+    build_catalogue(engine, args.skus)
+    print(f"Loaded {args.skus:,} SKUs (with index triggers) in {time.perf_counter() - start:.1f}s\n")
+
+    db = SessionLocal()
+    # LIKE is the previous name-only filter; FTS also covers description, manufacturer and category
+    print(f"{'query':<14}{'LIKE p50':>10}{'LIKE p95':>10}{'FTS p50':>10}{'FTS p95':>10}  top hit")
+    for term in QUERIES:
+        like = lambda: db.query(Medicine).filter(
+            Medicine.stock > 0, Medicine.name.contains(term)
+        ).order_by(Medicine.name).limit(20).all()
+        fts = lambda: search_medicines(db, term, limit=20)
+        like_p50, like_p95 = timed(like, args.runs)
+        fts_p50, fts_p95 = timed(fts, args.runs)
+        top = fts()
+        print(f"{term:<14}{like_p50:>9.2f}ms{like_p95:>8.2f}ms{fts_p50:>8.2f}ms{fts_p95:>8.2f}ms  {top[0].name if top else '-'}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
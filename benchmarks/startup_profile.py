@@ -0,0 +1,138 @@
+"""
+Startup profile: per-module import cost and time to first request.
+
+Usage:
+    python benchmarks/startup_profile.py [--runs 5] [--top 15] [--budget-ms 3000]
+
+Imports `app.main` under `python -X importtime` and reports the slowest
+modules and the cost per top-level package. Then boots the app in fresh
+processes, on an empty database (first boot: schema and sample data) and on
+the same database again (restart), and times each phase up to the first
+request, interpreter start-up included. With `--budget-ms`, exits with
+status 1 when the median first boot exceeds the budget.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process; its own imports count as interpreter start-up
+BOOT = """
+import asyncio, json, time
+import httpx
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://startup") as client:
+            response = await client.get("/user/medicines", params={"limit": 20})
+        served = time.perf_counter()
+        print(json.dumps({
+            "status": response.status_code,
+            "import_ms": (imported - started) * 1000,
+            "lifespan_ms": (ready - imported) * 1000,
+            "first_request_ms": (served - ready) * 1000,
+        }), flush=True)
+
+asyncio.run(boot())
+"""
+
+def environment(database: str) -> dict:
+    return dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{database}",
+        EMAIL_TRANSPORT="memory",
+        LOG_LEVEL="WARNING",
+        ADMIN_EMAIL="admin@example.com",
+    )
+
+def import_profile(env: dict) -> list:
+    """(module, self µs, cumulative µs) for every module `import app.main` loads"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match:
+            modules.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return modules
+
+def boot(env: dict) -> dict:
+    """Phase timings of one fresh process, plus wall time from spawn to the first response"""
+    spawned = time.perf_counter()
+    child = subprocess.Popen([sys.executable, "-c", BOOT], cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+    line = child.stdout.readline()
+    total = (time.perf_counter() - spawned) * 1000
+    child.wait()
+    timings = json.loads(line)
+    if timings.pop("status") != 200:
+        sys.exit("The first request failed")
+    timings["interpreter_ms"] = total - sum(timings.values())
+    timings["total_ms"] = total
+    return timings
+
+def print_imports(modules: list, top: int) -> None:
+    total = next(cumulative for name, _, cumulative in modules if name == "app.main")
+    packages = defaultdict(int)
+    for name, own, _ in modules:
+        packages["app" if name.startswith("app.") else name.split(".")[0]] += own
+
+    print(f"import app.main: {total / 1000:.0f} ms\n")
+    print(f"{'package':<32}{'ms':>8}{'share':>8}")
+    for name, own in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<32}{own / 1000:>8.1f}{own / total * 100:>7.1f}%")
+
+    print(f"\n{'module':<48}{'self ms':>9}{'cumulative ms':>15}")
+    for name, own, cumulative in sorted(modules, key=lambda module: -module[1])[:top]:
+        print(f"{name:<48}{own / 1000:>9.1f}{cumulative / 1000:>15.1f}")
+
+    print(f"\n{'app module':<48}{'self ms':>9}{'cumulative ms':>15}")
+    app_modules = [module for module in modules if module[0].startswith("app.")]
+    for name, own, cumulative in sorted(app_modules, key=lambda module: -module[2])[:top]:
+        print(f"{name:<48}{own / 1000:>9.1f}{cumulative / 1000:>15.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the median first boot is slower")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        print_imports(import_profile(environment(os.path.join(workdir, "imports.db"))), args.top)
+
+        phases = ["interpreter_ms", "import_ms", "lifespan_ms", "first_request_ms", "total_ms"]
+        results = {"first boot": [], "restart": []}
+        for run in range(args.runs):
+            env = environment(os.path.join(workdir, f"boot-{run}.db"))
+            results["first boot"].append(boot(env))
+            results["restart"].append(boot(env))
+
+        print(f"\nTime to first request, median of {args.runs} fresh processes (ms)\n")
+        print(f"{'':<12}" + "".join(f"{phase[:-3].replace('_', ' '):>16}" for phase in phases))
+        medians = {}
+        for label, runs in results.items():
+            medians[label] = {phase: statistics.median(run[phase] for run in runs) for phase in phases}
+            print(f"{label:<12}" + "".join(f"{medians[label][phase]:>16.0f}" for phase in phases))
+
+    if args.budget_ms is not None:
+        total = medians["first boot"]["total_ms"]
+        if total > args.budget_ms:
+            sys.exit(f"\nFirst boot took {total:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+        print(f"\nFirst boot within the {args.budget_ms:.0f} ms budget")
+
+if __name__ == "__main__":
+    main()
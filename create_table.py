@@ -1,11 +1,12 @@
-from app.core.database import Base, engine
-from app.models.user import User
-from app.models.otp import OTP
-from app.models.medicine import Medicine
-from app.models.order import Order, OrderItem
-from app.models.appointment import Appointment
-from app.models.offline_sale import OfflineSale
-from app.models.doctor import Doctor
+"""
+Create or upgrade the database schema.
 
-Base.metadata.create_all(bind=engine)
-print("Database tables created successfully")
+The app does this itself at startup (see INIT_DB_ON_STARTUP); run this
+script instead when several workers share one database.
+"""
+from app.core.database import engine
+from app.services.schema_service import init_schema
+
+if __name__ == "__main__":
+    init_schema(engine)
+    print("Database tables created successfully")
@@ -0,0 +1,81 @@
+"""
+Maintenance commands.
+
+Usage:
+    python manage.py backfill-rollups
+    python manage.py migrate-offline-items
+    python manage.py purge-jobs
+    python manage.py backfill-batches
+"""
+import argparse
+
+from app.core.database import SessionLocal
+# Register every model so relationships resolve outside the web app
+from app.models import appointment, doctor, id_sequence, job, medicine, offline_sale, order, otp, sales_rollup, user  # noqa: F401
+
+def backfill_rollups(args):
+    """Rebuild the daily sales rollups from existing orders and offline sales"""
+    from app.services.analytics_service import rebuild_rollups
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        print("✓ Sales rollups rebuilt")
+    finally:
+        db.close()
+
+def migrate_offline_items(args):
+    """Move offline sale items from the legacy JSON column into offline_sale_items, then rebuild the rollups"""
+    from app.services.analytics_service import rebuild_rollups
+    from app.services.offline_sale_service import backfill_line_items
+
+    db = SessionLocal()
+    try:
+        count = backfill_line_items(db)
+        print(f"✓ Line items backfilled for {count} offline sales")
+        rebuild_rollups(db)
+        print("✓ Sales rollups rebuilt")
+    finally:
+        db.close()
+
+def purge_jobs(args):
+    """Delete finished background jobs older than JOB_RETENTION_DAYS"""
+    from app.core.config import settings
+    from app.services.job_service import purge_finished_jobs
+
+    db = SessionLocal()
+    try:
+        count = purge_finished_jobs(db, settings.JOB_RETENTION_DAYS)
+        print(f"✓ {count} finished jobs deleted")
+    finally:
+        db.close()
+
+def backfill_batches(args):
+    """Record the stock of medicines that have no batches as an opening batch, so sales can draw from it FEFO"""
+    from app.services.inventory_service import backfill_opening_batches
+
+    db = SessionLocal()
+    try:
+        count = backfill_opening_batches(db)
+        print(f"✓ Opening batches created for {count} medicines")
+    finally:
+        db.close()
+
+COMMANDS = {
+    "backfill-rollups": backfill_rollups,
+    "migrate-offline-items": migrate_offline_items,
+    "purge-jobs": purge_jobs,
+    "backfill-batches": backfill_batches,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="PharmaTrack maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, handler in COMMANDS.items():
+        subparsers.add_parser(name, help=handler.__doc__)
+
+    args = parser.parse_args()
+    COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,6 @@
 #!/bin/bash
 
-# Create tables if database doesn't exist
-python create_table.py
-
-# Seed data if database is empty
-python seed_data.py
-
-# Start the server
+# The app creates/upgrades the schema and seeds an empty database at startup
+# (INIT_DB_ON_STARTUP), so only the server process is started
+# Client IPs behind the proxy are resolved by the app itself (TRUSTED_PROXIES), not by uvicorn
 exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# The app reads its settings at import time, so point it at a scratch database first
+_workdir = tempfile.TemporaryDirectory()
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir.name, 'test.db')}",
+    "SECRET_KEY": "test-secret",
+    "ADMIN_EMAIL": "admin@example.com",
+    "EMAIL_TRANSPORT": "memory",
+    "RATE_LIMIT_ENABLED": "false",
+    "INIT_DB_ON_STARTUP": "false",
+    "LOG_LEVEL": "WARNING",
+})
+
+@pytest.fixture(scope="session")
+def app():
+    from app.core.database import engine
+    from app.main import app
+    from app.services.schema_service import init_schema
+
+    init_schema(engine)
+    yield app
+    engine.dispose()
+
+@pytest.fixture
+def db(app):
+    from app.core.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.security import create_access_token
+from app.models.medicine import Medicine
+from app.models.user import User
+
+def _request(app, method: str, path: str, user: User, **options) -> httpx.Response:
+    token = create_access_token({"sub": user.email, "uid": user.id, "role": user.role})
+
+    async def call():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, headers={"Authorization": f"Bearer {token}"}, **options)
+
+    return asyncio.run(call())
+
+def _user(db, email: str, role: str) -> User:
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        user = User(email=email, role=role)
+        db.add(user)
+        db.commit()
+    return user
+
+def _medicine(db, name: str) -> Medicine:
+    medicine = Medicine(name=name, category="Test", price=50.0, stock=10)
+    db.add(medicine)
+    db.commit()
+    return medicine
+
+@pytest.mark.parametrize("quantity", [0, -5])
+def test_order_with_non_positive_quantity_is_rejected(app, db, quantity):
+    shopper = _user(db, "cart-shopper@example.com", "user")
+    medicine = _medicine(db, f"Cart tablets {quantity}")
+
+    response = _request(app, "POST", "/user/orders", shopper, json={
+        "items": [{"medicine_id": medicine.id, "quantity": quantity}],
+        "shipping_address": "Test street", "payment_mode": "COD",
+    })
+    assert response.status_code == 422, response.text
+    db.expire_all()
+    assert db.get(Medicine, medicine.id).stock == 10
+
+def test_empty_order_is_rejected(app, db):
+    shopper = _user(db, "cart-shopper@example.com", "user")
+
+    response = _request(app, "POST", "/user/orders", shopper, json={
+        "items": [], "shipping_address": "Test street", "payment_mode": "COD",
+    })
+    assert response.status_code == 422, response.text
+
+def test_offline_sale_with_negative_quantity_or_no_items_is_rejected(app, db):
+    admin = _user(db, "counter-admin@example.com", "admin")
+    medicine = _medicine(db, "Counter syrup")
+    line = {"medicine_id": medicine.id, "medicine_name": medicine.name, "quantity": -5, "price": 50.0, "subtotal": -250.0}
+
+    for items in ([line], []):
+        response = _request(app, "POST", "/admin/offline-sales", admin, json={"items": items, "payment_mode": "Cash"})
+        assert response.status_code == 422, response.text
+    db.expire_all()
+    assert db.get(Medicine, medicine.id).stock == 10
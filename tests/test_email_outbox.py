@@ -0,0 +1,46 @@
+import time
+from email.message import EmailMessage
+
+from app.services.email_service import EmailOutbox, MemoryTransport
+
+class FlakyTransport(MemoryTransport):
+    """Fails every attempt to one recipient"""
+    def __init__(self, failing: str):
+        super().__init__()
+        self.failing = failing
+        self.attempts = 0
+
+    def send(self, message: EmailMessage) -> None:
+        if message["To"] == self.failing:
+            self.attempts += 1
+            raise OSError("mailbox unavailable")
+        super().send(message)
+
+def _message(to: str) -> EmailMessage:
+    message = EmailMessage()
+    message["To"] = to
+    message.set_content("code")
+    return message
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_failing_recipient_does_not_block_the_queue():
+    transport = FlakyTransport("broken@example.com")
+    outbox = EmailOutbox(transport, max_attempts=3, retry_backoff=0.3)
+    try:
+        outbox.enqueue(_message("broken@example.com"))
+        outbox.enqueue(_message("fine@example.com"))
+
+        # Delivered well before the failed message's first backoff is over
+        _wait_for(lambda: transport.sent, timeout=0.25)
+        assert [message["To"] for message in transport.sent] == ["fine@example.com"]
+
+        _wait_for(lambda: outbox.stats()["failed"] == 1)
+        assert transport.attempts == 3
+        assert outbox.stats()["retries"] == 2
+    finally:
+        outbox.stop()
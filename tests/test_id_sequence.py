@@ -0,0 +1,20 @@
+import threading
+
+from app.core.config import settings
+from app.core.database import engine
+from app.services.id_service import HiLoSequence
+
+def test_block_refill_does_not_wait_for_the_request_pool(app):
+    sequence = HiLoSequence("test-refill", block_size=2)
+    # Every request-pool connection is checked out, as at peak checkout
+    held = [engine.connect() for _ in range(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)]
+    values = []
+    try:
+        worker = threading.Thread(target=lambda: values.extend(sequence.next() for _ in range(5)))
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive(), "reserving an id block waited for the request pool"
+    finally:
+        for connection in held:
+            connection.close()
+    assert values == sorted(set(values)) and len(values) == 5
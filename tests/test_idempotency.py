@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+from starlette.responses import JSONResponse
+
+from app.core.cache import TTLCache
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.security import create_access_token
+
+AUTH = {"Authorization": f"Bearer {create_access_token({'sub': 'shopper@example.com', 'uid': 1, 'role': 'user'})}"}
+
+def _app(statuses: list):
+    """Answers each request with the next status in `statuses`; records the calls"""
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(scope["query_string"])
+        await JSONResponse({"call": len(calls)}, status_code=statuses[len(calls) - 1])(scope, receive, send)
+
+    return IdempotencyMiddleware(app, paths=[r"/orders"], store=TTLCache(maxsize=100, ttl=60)), calls
+
+def _post(app, key: str, **options) -> httpx.Response:
+    async def post():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/orders", headers={**AUTH, "Idempotency-Key": key}, **options)
+
+    return asyncio.run(post())
+
+def test_success_is_replayed():
+    app, calls = _app([201])
+    first = _post(app, "k", json={"items": [1]})
+    repeat = _post(app, "k", json={"items": [1]})
+
+    assert len(calls) == 1
+    assert repeat.status_code == 201 and repeat.json() == first.json()
+    assert repeat.headers["idempotent-replayed"] == "true"
+
+def test_errors_are_not_replayed():
+    app, calls = _app([400, 409, 422, 429, 201])
+    responses = [_post(app, "k", json={"items": [1]}) for _ in range(5)]
+
+    assert [response.status_code for response in responses] == [400, 409, 422, 429, 201]
+    assert len(calls) == 5
+    assert "idempotent-replayed" not in responses[-1].headers
+
+def test_key_reused_with_another_query_string_is_rejected():
+    app, calls = _app([200])
+    _post(app, "k", params={"payment_mode": "UPI"})
+    reused = _post(app, "k", params={"payment_mode": "COD"})
+
+    assert reused.status_code == 422
+    assert len(calls) == 1
@@ -0,0 +1,19 @@
+import logging
+
+from app.core import log
+from app.core.config import settings
+
+def test_unknown_log_level_falls_back_to_info(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_LEVEL", "VERBOSE")
+    root = logging.getLogger()
+    previous = root.level
+    try:
+        log.setup_logging()
+        assert logging.getLogger("app").level == logging.INFO
+        assert root.level == logging.INFO
+    finally:
+        log.shutdown_logging()
+        for handler in [h for h in root.handlers if isinstance(h, log.NonBlockingQueueHandler)]:
+            root.removeHandler(handler)
+        root.setLevel(previous)
+        logging.getLogger("app").setLevel(logging.NOTSET)
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import create_access_token
+
+def _get_metrics(app, token: str = None) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/user/medicines/categories")
+            return await client.get("/metrics", headers=headers)
+
+    return asyncio.run(get())
+
+def test_metrics_need_admin_or_scrape_token(app, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-token")
+    admin = create_access_token({"sub": "admin@example.com", "uid": 0, "role": "admin"})
+    shopper = create_access_token({"sub": "shopper@example.com", "uid": 0, "role": "user"})
+
+    assert _get_metrics(app).status_code in (401, 403)
+    assert _get_metrics(app, "wrong-token").status_code == 401
+    assert _get_metrics(app, shopper).status_code == 403
+    assert _get_metrics(app, admin).status_code == 200
+
+    scraped = _get_metrics(app, "scrape-token")
+    assert scraped.status_code == 200
+    assert 'http_request_db_queries_count{method="GET",route="/user/medicines/categories"}' in scraped.text
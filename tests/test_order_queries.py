@@ -0,0 +1,66 @@
+"""
+Order list endpoints must run a fixed number of SQL statements per page,
+however many orders and items the page holds (no N+1 on order items).
+"""
+import asyncio
+import itertools
+
+import httpx
+
+from app.core.query_counter import QueryCounter
+from app.core.security import create_access_token
+from app.models.medicine import Medicine
+from app.models.order import Order, OrderItem
+from app.models.user import User
+
+_order_numbers = itertools.count(1)
+
+def _auth(user: User) -> dict:
+    token = create_access_token({"sub": user.email, "uid": user.id, "role": user.role})
+    return {"Authorization": f"Bearer {token}"}
+
+def _add_orders(db, user: User, medicine: Medicine, orders: int, items_per_order: int) -> None:
+    for _ in range(orders):
+        order = Order(
+            user_id=user.id, order_number=f"TEST-{next(_order_numbers)}", total_amount=10.0 * items_per_order,
+            payment_mode="COD", shipping_address="Test street",
+        )
+        order.items = [
+            OrderItem(medicine_id=medicine.id, medicine_name=medicine.name, quantity=1, price=10.0, subtotal=10.0)
+            for _ in range(items_per_order)
+        ]
+        db.add(order)
+    db.commit()
+
+def _count_queries(app, path: str, headers: dict) -> tuple:
+    """Statements run by one request, and the number of orders it returned"""
+    async def get():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+
+    with QueryCounter() as counter:
+        response = asyncio.run(get())
+    assert response.status_code == 200, response.text
+    return counter.count, len(response.json())
+
+def test_order_lists_run_constant_queries(app, db):
+    user = User(email="shopper@example.com", role="user")
+    admin = User(email="admin@example.com", role="admin")
+    medicine = Medicine(name="Test tablet", category="Test", price=10.0, stock=1000)
+    db.add_all([user, admin, medicine])
+    db.commit()
+
+    endpoints = [("/user/orders", _auth(user)), ("/admin/orders", _auth(admin))]
+    _add_orders(db, user, medicine, orders=3, items_per_order=1)
+    for path, headers in endpoints:
+        _count_queries(app, path, headers)  # warm the identity and connection caches
+
+    small = {path: _count_queries(app, path, headers) for path, headers in endpoints}
+    _add_orders(db, user, medicine, orders=27, items_per_order=1)
+    _add_orders(db, user, medicine, orders=30, items_per_order=9)
+    large = {path: _count_queries(app, path, headers) for path, headers in endpoints}
+
+    for path, _ in endpoints:
+        (small_queries, small_orders), (large_queries, large_orders) = small[path], large[path]
+        assert (small_orders, large_orders) == (3, 60)
+        assert large_queries == small_queries, f"{path}: {small_queries} queries for 3 orders, {large_queries} for 60"
@@ -0,0 +1,37 @@
+import asyncio
+
+import httpx
+from starlette.responses import PlainTextResponse
+
+from app.core import asgi
+from app.core.rate_limit import MemoryBucketStore, RateLimitMiddleware, RateLimitRule
+
+def _limited_app():
+    rules = [RateLimitRule("POST", "/auth/request-otp", "1/minute", "ip")]
+    return RateLimitMiddleware(PlainTextResponse("ok"), rules, MemoryBucketStore())
+
+def _statuses(app, forwarded_for: list, client=("127.0.0.1", 50000)) -> list:
+    """Status of one OTP request per X-Forwarded-For value, in order, from `client`"""
+    async def call():
+        transport = httpx.ASGITransport(app=app, client=client)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return [
+                (await http.post("/auth/request-otp", headers={"X-Forwarded-For": value})).status_code
+                for value in forwarded_for
+            ]
+
+    return asyncio.run(call())
+
+def test_clients_behind_a_trusted_proxy_get_their_own_buckets():
+    app = _limited_app()
+    assert _statuses(app, ["203.0.113.1", "203.0.113.2", "203.0.113.1"]) == [200, 200, 429]
+
+def test_the_nearest_untrusted_hop_is_the_client(monkeypatch):
+    monkeypatch.setattr(asgi, "_trusted_proxies", asgi.trusted_networks("*, 10.0.0.0/8"))
+    app = _limited_app()
+    # A client-supplied first entry does not escape its bucket
+    assert _statuses(app, ["1.1.1.1, 203.0.113.5", "2.2.2.2, 203.0.113.5, 10.1.2.3"], client=("10.9.9.9", 443)) == [200, 429]
+
+def test_forwarded_header_from_an_untrusted_peer_is_ignored():
+    app = _limited_app()
+    assert _statuses(app, ["203.0.113.1", "203.0.113.2"], client=("198.51.100.7", 50000)) == [200, 429]
@@ -0,0 +1,19 @@
+from sqlalchemy import func
+
+from app.models.doctor import Doctor
+from app.models.medicine import Medicine, StockBatch
+from app.services.seed_service import generate_synthetic
+
+def test_synthetic_medicines_only(db):
+    before = db.query(func.count(Medicine.id)).scalar()
+
+    assert generate_synthetic(db, medicines=5)["medicines"] == 5
+    assert db.query(func.count(Medicine.id)).scalar() == before + 5
+    # Bulk-inserted stock still gets its opening batches
+    assert db.query(StockBatch).join(Medicine).filter(Medicine.stock > 0).count() > 0
+
+def test_synthetic_doctors_only(db):
+    before = db.query(func.count(Doctor.id)).scalar()
+
+    assert generate_synthetic(db, doctors=3)["doctors"] == 3
+    assert db.query(func.count(Doctor.id)).scalar() == before + 3
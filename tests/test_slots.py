@@ -0,0 +1,18 @@
+import pytest
+
+from app.services.slot_service import parse_days, parse_schedule
+
+@pytest.mark.parametrize("available_days, weekdays", [
+    ("Mon,Wed,Fri", {0, 2, 4}),
+    ("Mon-Fri", {0, 1, 2, 3, 4}),
+    ("Monday to Friday", {0, 1, 2, 3, 4}),
+    ("Tues, Thurs", {1, 3}),
+    ("Sat-Mon", {5, 6, 0}),
+])
+def test_parse_days(available_days, weekdays):
+    assert parse_days(available_days) == weekdays
+
+@pytest.mark.parametrize("available_days", ["", "Everyday", "Mo", "Mon-Fri-Sun"])
+def test_unparseable_days_are_rejected(available_days):
+    with pytest.raises(ValueError):
+        parse_schedule(available_days, "9:00 AM - 5:00 PM")
@@ -0,0 +1,34 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.core.database import engine
+from app.models.startup_lock import StartupLock
+from app.services.schema_service import startup_lock
+
+def test_startup_lock_lets_one_worker_in_at_a_time(app):
+    inside, overlaps = [], []
+
+    def worker():
+        with startup_lock(engine, "test-init", lease_seconds=60, poll_interval=0.01):
+            inside.append(1)
+            if len(inside) > 1:
+                overlaps.append(1)
+            time.sleep(0.05)
+            inside.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not overlaps
+
+def test_stale_startup_lock_is_taken_over(app, db):
+    db.add(StartupLock(name="test-crashed", locked_at=datetime.utcnow() - timedelta(minutes=10)))
+    db.commit()
+
+    with startup_lock(engine, "test-crashed", lease_seconds=60, poll_interval=0.01):
+        pass
+    db.expire_all()
+    assert db.get(StartupLock, "test-crashed") is None
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.core.security import create_access_token
+from app.models.medicine import Medicine, StockBatch
+from app.models.user import User
+from app.services.inventory_service import write_off_expired
+
+def _request(app, method: str, path: str, user: User, headers: dict = None, **options) -> httpx.Response:
+    token = create_access_token({"sub": user.email, "uid": user.id, "role": user.role})
+    headers = {**(headers or {}), "Authorization": f"Bearer {token}"}
+
+    async def call():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.request(method, path, headers=headers, **options)
+
+    return asyncio.run(call())
+
+def _medicine(db, name: str, lots: list) -> Medicine:
+    """A medicine stocked with `lots` of (quantity, days until expiry)"""
+    now = datetime.utcnow()
+    medicine = Medicine(name=name, category="Test", price=5.0, stock=sum(quantity for quantity, _ in lots))
+    medicine.batches = [
+        StockBatch(lot_number=f"LOT-{index}", quantity=quantity, expiry_date=now + timedelta(days=days))
+        for index, (quantity, days) in enumerate(lots)
+    ]
+    db.add(medicine)
+    db.commit()
+    return medicine
+
+def _lots(db, medicine: Medicine) -> dict:
+    db.expire_all()
+    return {batch.lot_number: batch.quantity for batch in db.query(StockBatch).filter(StockBatch.medicine_id == medicine.id)}
+
+def test_expired_batches_are_written_off(db):
+    medicine = _medicine(db, "Expiry cream", [(5, -1), (3, 30)])
+
+    assert write_off_expired(db) == {medicine.id: 5}
+    db.commit()
+    assert _lots(db, medicine) == {"LOT-0": 0, "LOT-1": 3}
+    assert db.get(Medicine, medicine.id).stock == 3
+    assert write_off_expired(db) == {}
+
+def test_checkout_of_expired_stock_is_not_retryable(app, db):
+    shopper = User(email="expiry-shopper@example.com", role="user")
+    db.add(shopper)
+    medicine = _medicine(db, "Expired syrup", [(5, -1)])
+
+    response = _request(app, "POST", "/user/orders", shopper, json={
+        "items": [{"medicine_id": medicine.id, "quantity": 2}], "shipping_address": "Test street", "payment_mode": "COD",
+    })
+    assert response.status_code == 400, response.text
+    assert db.get(Medicine, medicine.id).stock == 5
+
+def test_bulk_import_keeps_stock_in_batches(app, db):
+    admin = db.query(User).filter(User.email == "admin@example.com").first()
+    if admin is None:
+        admin = User(email="admin@example.com", role="admin")
+        db.add(admin)
+        db.commit()
+
+    def upload(rows: str) -> dict:
+        response = _request(app, "POST", "/admin/medicines/bulk", admin, content=rows, headers={"Content-Type": "text/csv"})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    header = "name,manufacturer,category,price,stock,expiry_date\n"
+    assert upload(header + "Import drops,Acme,Test,4.5,40,2099-01-01\n")["inserted"] == 1
+    medicine = db.query(Medicine).filter(Medicine.name == "Import drops").one()
+    assert _lots(db, medicine) == {"OPENING": 40}
+
+    assert upload(header + "Import drops,Acme,Test,4.5,25,2099-01-01\n")["updated"] == 1
+    assert _lots(db, medicine) == {"OPENING": 25}